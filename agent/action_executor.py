@@ -1,13 +1,12 @@
 import asyncio
 from datetime import datetime
 from typing import Dict, Optional, List
-import openai
-from utils.memory_system import MemorySystem
+from utils.memory_system import MemorySystem, get_memory_system
 from utils.trend_analyzer import TrendAnalyzer
 
 class ActionExecutor:
-    def __init__(self):
-        self.memory = MemorySystem()
+    def __init__(self, memory: Optional[MemorySystem] = None):
+        self.memory = memory or get_memory_system()
         self.trend_analyzer = TrendAnalyzer()
         self.content_templates = {
             "philosophical_post": """
@@ -125,6 +124,8 @@ class ActionExecutor:
     async def _generate_gpt_content(self, prompt: str) -> str:
         """Generate content using GPT-4"""
         try:
+            import openai
+
             response = await openai.ChatCompletion.acreate(
                 model="gpt-4",
                 messages=[
@@ -99,7 +99,6 @@ import json  # for saving results to a jsonl file
 import logging  # for logging rate limit warnings and other messages
 import os  # for reading API key
 import re  # for matching endpoint from request URL
-import tiktoken  # for counting tokens
 import time  # for sleeping after rate limit is hit
 from dataclasses import (
     dataclass,
@@ -390,6 +389,8 @@ def num_tokens_consumed_from_request(
     token_encoding_name: str,
 ):
     """Count the number of tokens in the request. Only supports completion and embedding requests."""
+    import tiktoken  # for counting tokens, imported on first use to keep startup fast
+
     encoding = tiktoken.get_encoding(token_encoding_name)
     # if completions request, tokens = prompt + n * max_tokens
     if api_endpoint.endswith("completions"):
@@ -9,6 +9,9 @@ from agent.task_manager import TaskManager
 from agent.goal_system import GoalSystem
 from agent.decision_engine import DecisionEngine
 from utils.trend_monitor import TrendMonitor
+from utils.mongo_registry import close_clients
+from utils.memory_system import close_memory_systems
+from utils.model_manager import ModelManager
 
 logger = logging.getLogger(__name__)
 
@@ -56,11 +59,13 @@ class AutonomousAgent:
             # TODO: Make this non-blocking and fix the display
             # self.display.start()
 
-            # Start main cycles
+            # Start main cycles; the sentence encoder loads alongside them
             await asyncio.gather(
+                self._warm_up_encoder(),
                 self._run_goal_cycle(),
                 self._run_task_cycle(),
-                self._run_trend_cycle()
+                self._run_trend_cycle(),
+                self._run_memory_cycle()
             )
             
         except Exception as e:
@@ -68,9 +73,35 @@ class AutonomousAgent:
             logger.error(f"Critical error: {e}")
         finally:
             self.running = False
-            self.display.stop()
+            await self._shutdown()
             self.log_manager.add_log('SYSTEM', f'Shutting down {self.agent_name} autonomous agent')
 
+    async def _shutdown(self):
+        """Flush every buffered memory write, then release clients; one failing step doesn't skip the rest"""
+        steps = [
+            ('trend monitor', self.trend_monitor.close),
+            ('memory systems', close_memory_systems),
+            ('database clients', close_clients),
+            ('display', self.display.stop)
+        ]
+        for name, step in steps:
+            try:
+                result = step()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.log_manager.add_log('ERROR', f"Error closing {name}: {str(e)}")
+                logger.error(f"Error closing {name}: {e}", exc_info=True)
+
+    async def _warm_up_encoder(self):
+        """Load the sentence encoder off the event loop while the other cycles run"""
+        try:
+            await ModelManager.warm_up()
+            self.log_manager.add_log('SYSTEM', f"Sentence encoder ready ({ModelManager.backend})")
+        except Exception as e:
+            self.log_manager.add_log('ERROR', f"Failed to load sentence encoder: {str(e)}")
+            logger.error(f"Error warming up sentence encoder: {e}", exc_info=True)
+
     async def _run_goal_cycle(self):
         """Continuously evaluate and update goals"""
         self.log_manager.add_log('SYSTEM', f'Starting goal cycle for {self.agent_name}')
@@ -141,6 +172,8 @@ class AutonomousAgent:
                 
                 # Log each trend category
                 for category, trend_list in trends.items():
+                    if not isinstance(trend_list, list):
+                        continue
                     self.log_manager.add_log(
                         'TREND', 
                         f"Found trends in {category}: {', '.join(trend_list[:2])}"
@@ -153,6 +186,30 @@ class AutonomousAgent:
                 self.log_manager.add_log('ERROR', f"Trend cycle error: {str(e)}")
                 await asyncio.sleep(10)
 
+    async def _run_memory_cycle(self):
+        """Periodically compact aged memories and reconcile memory statistics"""
+        memory = self.trend_monitor.twitter_manager.memory
+        while self.running:
+            try:
+                await asyncio.sleep(memory.memory_config['compaction_interval'])
+                removed = await memory.compact_memories()
+                await memory.reconcile_statistics()
+                self.log_manager.add_log('SYSTEM', f"Memory compaction removed {removed} memories")
+                embedding_cache = ModelManager.cache_stats()
+                if embedding_cache:
+                    self.log_manager.add_log(
+                        'SYSTEM', f"Embedding cache hit rate: {embedding_cache['hit_rate']:.1%}"
+                    )
+                batching = ModelManager.batching_stats()
+                if batching:
+                    self.log_manager.add_log(
+                        'SYSTEM', f"Encode requests per model call: {batching['requests_per_batch']:.1f}"
+                    )
+                
+            except Exception as e:
+                self.log_manager.add_log('ERROR', f"Memory cycle error: {str(e)}")
+                await asyncio.sleep(60)
+
     async def _execute_task(self, task: Dict) -> Dict:
         """Execute a task"""
         try:
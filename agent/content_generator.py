@@ -1,6 +1,5 @@
 from typing import Dict, List, Optional
 from datetime import datetime
-from openai import AsyncOpenAI
 from characters.base_character import BaseCharacter
 import logging
 
@@ -8,6 +7,9 @@ logger = logging.getLogger(__name__)
 
 class ContentGenerator:
     def __init__(self, character: BaseCharacter):
+        # Deferred so importing the agent does not pay for the openai package
+        from openai import AsyncOpenAI
+
         self.character = character
         self.client = AsyncOpenAI()
         self.content_types = character.content_types
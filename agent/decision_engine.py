@@ -2,13 +2,14 @@ from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import random
 import logging
+from utils.time_series import TimeSeries
 
 logger = logging.getLogger(__name__)
 
 class DecisionEngine:
     def __init__(self, config: Dict):
         self.config = config
-        self.state_history = []
+        self.state_history = TimeSeries('decisions', ['should_act', 'confidence'])
         self.decision_weights = self._initialize_weights()
         self.learning_rate = config.get('adaptation_parameters', {}).get('learning_rate', 0.2)
 
@@ -40,7 +41,9 @@ class DecisionEngine:
         
         # Record decision for learning
         self.state_history.append({
-            'timestamp': datetime.now(),
+            'should_act': float(decision['should_act']),
+            'confidence': decision['confidence']
+        }, timestamp=datetime.now(), record={
             'action_type': action_type,
             'context': context,
             'scores': scores,
@@ -2,11 +2,9 @@ import asyncio
 import json
 from typing import Dict, List, Optional
 from datetime import datetime
-import openai
-from openai import AsyncOpenAI
 from agent.api_request_parallel_processor import process_api_requests_from_file
 from utils.trend_analyzer import TrendAnalyzer
-from utils.memory_system import MemorySystem
+from utils.memory_system import MemorySystem, get_memory_system
 import logging
 from characters.oracle_character import OracleCharacter
 
@@ -16,9 +14,11 @@ logger = logging.getLogger(__name__)
 # - Current Trends: {', '.join(context.get('trends', []))}
 
 class ContentGenerator:
-    def __init__(self, character: OracleCharacter):
+    def __init__(self, character: OracleCharacter, memory: Optional[MemorySystem] = None):
+        from openai import AsyncOpenAI
+
         self.trend_analyzer = TrendAnalyzer()
-        self.memory = MemorySystem()
+        self.memory = memory or get_memory_system()
         self.client = AsyncOpenAI()
         self.character = character
         self.content_types = {
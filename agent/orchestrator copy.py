@@ -5,7 +5,7 @@ import logging
 from agent.action_executor import ActionExecutor
 from agent.twitter_manager import TwitterManager
 from agent.oracle_content_generator import ContentGenerator
-from utils.memory_system import MemorySystem
+from utils.memory_system import get_memory_system
 from utils.trend_analyzer import TrendAnalyzer
 from utils.image_generator import ImageGenerator
 from config.settings import Settings
@@ -20,13 +20,13 @@ class Orchestrator:
         self.settings = settings
         self.trend_analyzer = TrendAnalyzer()
         self.character = OracleCharacter()
-        self.content_generator = ContentGenerator(self.character)
+        self.memory = get_memory_system(settings.mongodb_uri)
+        self.content_generator = ContentGenerator(self.character, memory=self.memory)
         self.trend_analyzer = TrendAnalyzer()
         self.interaction_handler = InteractionHandler(self.character)
-        self.twitter_manager = TwitterManager(settings.twitter_config, self.trend_analyzer)
-        self.action_executor = ActionExecutor()
+        self.twitter_manager = TwitterManager(settings.twitter_config, self.trend_analyzer, memory=self.memory)
+        self.action_executor = ActionExecutor(memory=self.memory)
         self.image_generator = ImageGenerator()
-        self.memory = MemorySystem(settings.mongodb_uri)
         # Posting schedule (in hours)
         self.schedule = {
             'prophecy': [0, 8, 16],  # Every 8 hours
@@ -350,7 +350,7 @@ class Orchestrator:
             interaction['username']
         )
         relevant_memories = await self.memory.get_relevant_memories(
-            interaction['text']
+            interaction['text'], query_embedding=interaction.get('embedding')
         )
         return {
             'interaction': interaction,
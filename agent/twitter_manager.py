@@ -3,13 +3,16 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import aiohttp
 from utils.trend_analyzer import TrendAnalyzer
-from utils.memory_system import MemorySystem
+from utils.memory_system import MemorySystem, get_memory_system
+from utils.time_series import TimeSeries
+from utils.types import TweetRecord
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TwitterManager:
-    def __init__(self, config: Dict, trend_analyzer: Optional[TrendAnalyzer] = None):
+    def __init__(self, config: Dict, trend_analyzer: Optional[TrendAnalyzer] = None,
+                 memory: Optional[MemorySystem] = None):
         self.base_url = config.get('api_base_url', 'http://localhost:3000')
         # Initialize Twitter API
         # auth = tweepy.OAuthHandler(
@@ -33,7 +36,8 @@ class TwitterManager:
         self.trend_analyzer = trend_analyzer or TrendAnalyzer()
         # self.target_accounts = config.get('target_accounts', [])
 
-        self.memory = MemorySystem()
+        # Shared with the other agent components so each sees what the others store
+        self.memory = memory or get_memory_system()
         
         # Target accounts to monitor
         self.target_accounts = [
@@ -43,12 +47,7 @@ class TwitterManager:
         ]
         
         # Engagement tracking
-        self.engagement_metrics = {
-            'likes': [],
-            'retweets': [],
-            'replies': [],
-            'mentions': []
-        }
+        self.engagement_metrics = TimeSeries('engagement', ['likes', 'retweets', 'replies', 'mentions'])
 
     async def post_tweet(self, content: str, reply_to: Optional[str] = None) -> Dict:
         """Post a tweet or reply"""
@@ -170,7 +169,7 @@ class TwitterManager:
                 logger.error(f"Error in fetch_trends: {e}", exc_info=True)
                 return []
 
-    async def monitor_target_accounts(self) -> List[Dict]:
+    async def monitor_target_accounts(self) -> List[TweetRecord]:
         """Monitor target accounts for relevant content"""
         try:
             all_tweets = []
@@ -188,20 +187,30 @@ class TwitterManager:
                 logger.info("No tweets found to analyze")
                 return []
 
+            # Re-fetched tweets are recognized by id and counted once
+            new_tweets = self.trend_analyzer.trend_engine.ingest((tweet['id'], tweet['text']) for tweet, _ in all_tweets)
+            logger.info(f"Trend engine counted {new_tweets} new tweets")
+
             # filter out existing tweets
             # error here fix later
             # all_tweets = [tweet for tweet in all_tweets if tweet['original']['id'] not in existing_tweets]
             # print(f"all_tweets: {len(all_tweets)}")
 
             # Batch analyze all tweets
-            tweet_texts = [tweet['text'] for tweet, _ in all_tweets]
-            logger.info(f"Analyzing batch of {len(tweet_texts)} tweets")
+            logger.info(f"Analyzing batch of {len(all_tweets)} tweets")
             
-            relevance_scores = await self.trend_analyzer.analyze_tweets_batch(tweet_texts)
+            # Tweets scored in earlier cycles come from the relevance cache; new ones are encoded once here
+            # and the embedding travels with the tweet into memory lookups
+            relevance_scores, embeddings = await self.trend_analyzer.score_tweets([tweet for tweet, _ in all_tweets])
+            self.trend_analyzer.topic_clusterer.update(
+                [(tweet['id'], tweet['text']) for tweet, _ in all_tweets], embeddings
+            )
+            if self.trend_analyzer.relevance_cache is not None:
+                logger.info(f"Relevance cache: {self.trend_analyzer.relevance_cache.stats()}")
             # print(f"relevance_scores: {relevance_scores}")
             # Process results
             relevant_tweets = []
-            for (tweet, account), relevance in zip(all_tweets, relevance_scores):
+            for (tweet, account), relevance, embedding in zip(all_tweets, relevance_scores, embeddings):
                 if relevance['score'] > 0.2:  # Adjusted threshold
                     relevant_tweets.append({
                         'id': tweet['id'],
@@ -210,6 +219,7 @@ class TwitterManager:
                         'username': tweet['username'],
                         'created_at': tweet['timeParsed'],
                         'relevance': relevance,
+                        'embedding': embedding,
                         'metrics': {
                             'likes': tweet.get('likes', 0),
                             'retweets': tweet.get('retweets', 0),
@@ -225,6 +235,10 @@ class TwitterManager:
             logger.error(f"Error monitoring target accounts: {e}", exc_info=True)
             return []
 
+    async def close(self):
+        """Flush pending memory writes; the shared memory system is closed by close_memory_systems"""
+        await self.memory.flush()
+
     async def analyze_engagement(self, tweet_data: Dict) -> Dict:
         """Analyze engagement for a specific tweet"""
         try:
@@ -235,9 +249,11 @@ class TwitterManager:
             }
             
             # Store engagement metrics
-            self.engagement_metrics['likes'].append(metrics['like_count'])
-            self.engagement_metrics['retweets'].append(metrics['retweet_count'])
-            self.engagement_metrics['replies'].append(metrics['reply_count'])
+            self.engagement_metrics.append({
+                'likes': metrics['like_count'],
+                'retweets': metrics['retweet_count'],
+                'replies': metrics['reply_count']
+            })
             
             return {
                 'tweet_id': tweet_data['id'],
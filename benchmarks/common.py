@@ -0,0 +1,66 @@
+"""Shared helpers for the benchmark scripts in this directory"""
+from typing import List, Tuple
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.hashing_encoder import HashingEncoder
+
+TOPICS = {
+    'ai': ['neural', 'model', 'training', 'agents', 'consciousness', 'alignment', 'tokens', 'inference'],
+    'crypto': ['coin', 'pump', 'wallet', 'solana', 'liquidity', 'airdrop', 'memecoin', 'degen'],
+    'oracle': ['prophecy', 'vision', 'void', 'ancient', 'signs', 'fate', 'ritual', 'omen'],
+    'science': ['quantum', 'entanglement', 'physics', 'particles', 'energy', 'cosmos', 'gravity', 'orbit'],
+    'culture': ['meme', 'viral', 'vibes', 'internet', 'remix', 'art', 'music', 'fandom']
+}
+HANDLES = [f'@user{i}' for i in range(200)]
+HASHTAGS = [f'#{word}' for words in TOPICS.values() for word in words[:3]]
+
+
+# Benchmarks hash into a model-sized space so vector sizes are realistic
+HASHING_DIM = 384
+
+
+def hashing_encoder() -> HashingEncoder:
+    """Hashing encoder at the benchmark dimension; also an EncoderPool loader"""
+    return HashingEncoder(HASHING_DIM)
+
+
+def load_encoder(kind: str):
+    """'model' loads the shared sentence-transformers model, 'hashing' needs no download"""
+    if kind == 'hashing':
+        return hashing_encoder()
+    from utils.model_manager import ModelManager
+    return ModelManager().get_model()
+
+
+def synthetic_texts(n: int, seed: int = 0) -> List[str]:
+    """Tweet-like texts: topic words plus the occasional handle and hashtag"""
+    rng = np.random.default_rng(seed)
+    names = list(TOPICS)
+    texts = []
+    for _ in range(n):
+        words = list(rng.choice(TOPICS[names[rng.integers(len(names))]], size=6))
+        if rng.random() < 0.3:
+            words.append(HANDLES[rng.integers(len(HANDLES))])
+        if rng.random() < 0.3:
+            words.append(HASHTAGS[rng.integers(len(HASHTAGS))])
+        texts.append(' '.join(words))
+    return texts
+
+
+def percentiles(samples: List[float]) -> Tuple[float, float]:
+    """p50 and p95 in milliseconds"""
+    return float(np.percentile(samples, 50) * 1000), float(np.percentile(samples, 95) * 1000)
+
+
+class Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
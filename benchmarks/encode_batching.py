@@ -0,0 +1,87 @@
+"""Throughput and per-request latency of ModelManager.aencode against the micro-batching budget.
+
+Concurrent callers each encode one text at a time, like memory stores,
+retrieval queries and trend scoring do. The 'off' row sends every request
+to the encoder pool as its own model call.
+
+    python benchmarks/encode_batching.py --requests 2000 --concurrency 32
+    python benchmarks/encode_batching.py --encoder hashing --call-overhead-ms 20  # no model download
+"""
+import asyncio
+import os
+import time
+import click
+from rich.console import Console
+from rich.table import Table
+
+from common import Timer, load_encoder, percentiles, synthetic_texts
+from utils import model_manager
+from utils.model_manager import ModelManager
+
+console = Console()
+
+
+class _FixedCostEncoder:
+    """Adds a per-call cost to the hashing encoder, standing in for a forward pass's fixed overhead"""
+
+    def __init__(self, encoder, overhead: float):
+        self.encoder = encoder
+        self.overhead = overhead
+
+    def encode(self, texts, **kwargs):
+        time.sleep(self.overhead)
+        return self.encoder.encode(texts, **kwargs)
+
+
+async def _run(texts, concurrency: int, batched: bool):
+    queue = list(reversed(texts))
+    latencies = []
+
+    async def caller():
+        while queue:
+            text = queue.pop()
+            with Timer() as timer:
+                if batched:
+                    await ModelManager.aencode(text)
+                else:
+                    await ModelManager._encoder_executor().run(ModelManager.encode, text)
+            latencies.append(timer.elapsed)
+
+    with Timer() as total:
+        await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return latencies, total.elapsed
+
+
+@click.command()
+@click.option('--requests', default=2000, help='Single-text encode requests per run')
+@click.option('--concurrency', default=32, help='Callers issuing requests at once')
+@click.option('--max-batch', default=64, help='ENCODER_MAX_BATCH for the batched runs')
+@click.option('--waits', default='1,2,5,10,20', help='ENCODER_MAX_WAIT_MS values to compare')
+@click.option('--encoder', 'encoder_kind', type=click.Choice(['model', 'hashing']), default='model')
+@click.option('--call-overhead-ms', default=0.0, help='Extra fixed cost per hashing-encoder call')
+def main(requests: int, concurrency: int, max_batch: int, waits: str, encoder_kind: str, call_overhead_ms: float):
+    # Measure the model, not the persistent embedding cache
+    os.environ['EMBEDDING_CACHE_PATH'] = ''
+    os.environ['ENCODER_MAX_BATCH'] = str(max_batch)
+    if encoder_kind == 'hashing':
+        model = _FixedCostEncoder(load_encoder('hashing'), call_overhead_ms / 1000)
+        model_manager._sentence_transformer = lambda name: model
+    ModelManager.load()
+    texts = synthetic_texts(requests)
+
+    table = Table(title=f"aencode, {requests} requests from {concurrency} concurrent callers")
+    for column in ('max wait ms', 'texts/s', 'p50 ms', 'p95 ms', 'model calls'):
+        table.add_column(column)
+    for wait in ['off'] + waits.split(','):
+        os.environ['ENCODER_MAX_WAIT_MS'] = '0' if wait == 'off' else wait
+        ModelManager._batcher = None
+        calls = ModelManager.encode_calls
+        latencies, elapsed = asyncio.run(_run(texts, concurrency, batched=wait != 'off'))
+        p50, p95 = percentiles(latencies)
+        table.add_row(wait, f"{requests / elapsed:.0f}", f"{p50:.2f}", f"{p95:.2f}",
+                      str(ModelManager.encode_calls - calls))
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
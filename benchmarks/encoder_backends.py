@@ -0,0 +1,88 @@
+"""Throughput, load time and peak RSS of each ModelManager encoder backend.
+
+Every backend loads in a fresh process so resident memory is not shared
+between them. Parity is the cosine agreement of each backend's embeddings
+with the fp32 torch model on the same texts. The ONNX backends need
+optimum[onnxruntime]; without it ModelManager falls back to torch, which the
+'loaded' column shows.
+
+    python benchmarks/encoder_backends.py --texts 2000
+    python benchmarks/encoder_backends.py --backends torch,onnx-int8 --batch-size 64
+"""
+import multiprocessing
+import os
+import resource
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from common import Timer, synthetic_texts
+
+console = Console()
+PARITY_TEXTS = 200
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(backend: str, texts, batch_size: int, results):
+    os.environ['ENCODER_BACKEND'] = backend
+    # Measure inference, not the persistent embedding cache
+    os.environ['EMBEDDING_CACHE_PATH'] = ''
+    from utils.model_manager import ModelManager
+
+    with Timer() as load:
+        ModelManager.load()
+    ModelManager.encode(texts[:batch_size], batch_size=batch_size)
+    with Timer() as run:
+        embeddings = ModelManager.encode(texts, batch_size=batch_size)
+    results.put({
+        'backend': backend,
+        'loaded': ModelManager.backend,
+        'load_seconds': load.elapsed,
+        'texts_per_second': len(texts) / run.elapsed,
+        'rss_mb': _peak_rss_mb(),
+        'parity': embeddings[:PARITY_TEXTS]
+    })
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+@click.command()
+@click.option('--texts', 'count', default=2000, help='Texts encoded per backend')
+@click.option('--batch-size', default=32)
+@click.option('--backends', default='torch,onnx,onnx-int8')
+def main(count: int, batch_size: int, backends: str):
+    texts = synthetic_texts(count)
+    context = multiprocessing.get_context('spawn')
+    runs = []
+    for backend in backends.split(','):
+        results = context.Queue()
+        process = context.Process(target=_measure, args=(backend, texts, batch_size, results))
+        process.start()
+        runs.append(results.get())
+        process.join()
+
+    reference = next((run['parity'] for run in runs if run['loaded'] == 'torch'), None)
+    table = Table(title=f"Encoder backends, {count} texts, batch size {batch_size}")
+    for column in ('backend', 'loaded', 'load s', 'texts/s', 'peak RSS MB', 'cosine vs fp32 mean/min'):
+        table.add_column(column)
+    for run in runs:
+        parity = '-'
+        if reference is not None:
+            similarity = _cosine(reference, run['parity'])
+            parity = f"{similarity.mean():.4f} / {similarity.min():.4f}"
+        table.add_row(run['backend'], run['loaded'], f"{run['load_seconds']:.1f}",
+                      f"{run['texts_per_second']:.0f}", f"{run['rss_mb']:.0f}", parity)
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
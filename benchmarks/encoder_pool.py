@@ -0,0 +1,58 @@
+"""Encoding throughput of EncoderPool as worker processes are added.
+
+The in-process row is a single model in the calling process, as ModelManager
+runs without ENCODER_PROCESSES. Scaling depends on physical cores: each
+worker gets cpu_count // workers intra-op threads.
+
+    python benchmarks/encoder_pool.py --texts 4000 --workers 1,2,4,8
+    python benchmarks/encoder_pool.py --encoder hashing  # no model download
+"""
+import os
+import click
+from rich.console import Console
+from rich.table import Table
+
+from common import Timer, load_encoder, synthetic_texts
+from utils.encoder_pool import DEFAULT_LOADER, EncoderPool
+
+console = Console()
+LOADERS = {'model': DEFAULT_LOADER, 'hashing': 'common:hashing_encoder'}
+
+
+@click.command()
+@click.option('--texts', 'count', default=4000, help='Texts encoded per configuration')
+@click.option('--batch-size', default=32)
+@click.option('--workers', default='1,2,4,8', help='Pool sizes to compare')
+@click.option('--encoder', 'encoder_kind', type=click.Choice(['model', 'hashing']), default='model')
+def main(count: int, batch_size: int, workers: str, encoder_kind: str):
+    texts = synthetic_texts(count)
+    rows = []
+
+    encoder = load_encoder(encoder_kind)
+    encoder.encode(texts[:batch_size], batch_size=batch_size)
+    with Timer() as timer:
+        encoder.encode(texts, batch_size=batch_size)
+    baseline = count / timer.elapsed
+    rows.append(('in-process', '-', baseline))
+
+    for size in (int(value) for value in workers.split(',')):
+        with Timer() as startup:
+            pool = EncoderPool(size, loader=LOADERS[encoder_kind])
+        try:
+            pool.encode(texts[:batch_size * size], batch_size=batch_size)
+            with Timer() as timer:
+                pool.encode(texts, batch_size=batch_size)
+        finally:
+            pool.close()
+        rows.append((str(size), f"{startup.elapsed:.1f}", count / timer.elapsed))
+
+    table = Table(title=f"EncoderPool, {count} texts on {os.cpu_count()} CPUs")
+    for column in ('workers', 'startup s', 'texts/s', 'speedup'):
+        table.add_column(column)
+    for workers_label, startup_label, throughput in rows:
+        table.add_row(workers_label, startup_label, f"{throughput:.0f}", f"{throughput / baseline:.2f}x")
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Latency and recall of MemorySystem's semantic, hybrid and lexical search modes.
+
+Recall@k for hybrid and lexical search is measured against the exhaustive
+semantic ranking; handle/hashtag lookups are measured against the exact set
+of memories containing the term.
+
+    python benchmarks/retrieval_modes.py --memories 5000 --queries 200
+    python benchmarks/retrieval_modes.py --encoder hashing  # no model download
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+import click
+import numpy as np
+from bson import ObjectId
+from rich.console import Console
+from rich.table import Table
+
+from common import HANDLES, HASHTAGS, Timer, load_encoder, percentiles, synthetic_texts
+from utils.embedding_codec import encode_embedding
+from utils.memory_ranking import decay_key, normalize
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend
+from utils.vector_index import build_vector_index
+
+console = Console()
+
+
+def _seed_store(path: str, texts, encoder):
+    backend = SQLiteBackend(path)
+    now = datetime.now()
+    embeddings = encoder.encode(texts)
+    backend.insert_many('memories', [{
+        '_id': ObjectId(),
+        'content': text,
+        'type': 'observation',
+        **encode_embedding(normalize(vector)),
+        'timestamp': now,
+        'importance': 1.0,
+        'decay_key': decay_key(1.0, now, 0.95)
+    } for text, vector in zip(texts, embeddings)])
+    backend.close()
+
+
+async def _run(memory: MemorySystem, queries, terms, k: int):
+    results = {}
+    for mode in ('semantic', 'hybrid', 'lexical'):
+        latencies, ids = [], []
+        calls = getattr(memory.encoder, 'calls', None)
+        for query in queries:
+            with Timer() as timer:
+                found = await memory.get_relevant_memories(query, limit=k, mode=mode)
+            latencies.append(timer.elapsed)
+            ids.append([doc['_id'] for doc in found])
+        model_calls = getattr(memory.encoder, 'calls', calls)
+        results[mode] = (latencies, ids, None if calls is None else model_calls - calls)
+
+    # Exact-term lookups: every memory containing the handle or hashtag
+    term_recall, term_latencies = [], []
+    for term in terms:
+        expected = set(memory.memory_lexicon.lookup(term))
+        with Timer() as timer:
+            found = await memory.get_relevant_memories(term, limit=len(expected) or 1, mode='lexical')
+        term_latencies.append(timer.elapsed)
+        if expected:
+            term_recall.append(len({doc['_id'] for doc in found} & expected) / len(expected))
+    return results, term_latencies, term_recall
+
+
+@click.command()
+@click.option('--memories', default=5000, help='Corpus size')
+@click.option('--queries', default=200, help='Queries per mode')
+@click.option('--k', default=10, help='Results per query')
+@click.option('--encoder', 'encoder_kind', type=click.Choice(['model', 'hashing']), default='model')
+def main(memories: int, queries: int, k: int, encoder_kind: str):
+    encoder = load_encoder(encoder_kind)
+    texts = synthetic_texts(memories)
+    rng = np.random.default_rng(1)
+    # Queries are partial memories, like a tweet fragment looking for context
+    query_texts = [' '.join(texts[i].split()[:3]) for i in rng.integers(len(texts), size=queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'memory.db')
+        _seed_store(path, texts, encoder)
+        memory = MemorySystem(backend=SQLiteBackend(path), encoder=encoder)
+        # An untrained index makes semantic mode score every memory: exact ground truth
+        memory.memory_index = build_vector_index('exact')
+        # Measure the search paths themselves, not the result cache
+        memory.result_cache.max_bytes = 0
+        terms = list(rng.choice(HANDLES + HASHTAGS, size=min(queries, 100)))
+        results, term_latencies, term_recall = asyncio.run(_run(memory, query_texts, terms, k))
+        memory.db_executor.shutdown()
+
+    table = Table(title=f"Retrieval modes, {memories} memories, recall@{k} vs semantic")
+    for column in ('mode', 'p50 ms', 'p95 ms', f'recall@{k}', 'model calls'):
+        table.add_column(column)
+    semantic_ids = results['semantic'][1]
+    for mode, (latencies, ids, model_calls) in results.items():
+        recall = np.mean([
+            len(set(found) & set(truth)) / max(len(truth), 1) for found, truth in zip(ids, semantic_ids)
+        ])
+        p50, p95 = percentiles(latencies)
+        table.add_row(mode, f"{p50:.2f}", f"{p95:.2f}", f"{recall:.3f}", str(model_calls))
+    p50, p95 = percentiles(term_latencies)
+    table.add_row('lexical @handle/#tag', f"{p50:.2f}", f"{p95:.2f}",
+                  f"{np.mean(term_recall):.3f} (exact)", '0')
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Import time of the agent's entry points, each in a fresh interpreter.
+
+Times are the cumulative figures from ``python -X importtime``, median over
+--repeat runs. Modules that are slow to import (torch, sentence_transformers,
+openai) should appear only once something uses them, not at startup.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 10
+"""
+import os
+import statistics
+import subprocess
+import sys
+import click
+from rich.console import Console
+from rich.table import Table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = [
+    'agent.autonomous_agent', 'agent.oracle_content_generator', 'agent.action_executor',
+    'utils.memory_system', 'utils.trend_analyzer', 'utils.image_generator'
+]
+HEAVY_MODULES = ['torch', 'sentence_transformers', 'transformers', 'openai', 'tiktoken', 'replicate', 'PIL']
+
+console = Console()
+
+
+def _import_times(module: str):
+    """Cumulative import time in seconds per module imported while importing module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+@click.command()
+@click.option('--repeat', default=5, help='Fresh interpreters per entry point')
+def main(repeat: int):
+    table = Table(title=f"Entry point import time, median of {repeat}")
+    for column in ('module', 'seconds', 'heavy modules loaded'):
+        table.add_column(column)
+    for module in ENTRY_POINTS:
+        runs = [_import_times(module) for _ in range(repeat)]
+        heavy = sorted({name.split('.')[0] for name in runs[0]} & set(HEAVY_MODULES))
+        seconds = statistics.median(times.get(module, 0.0) for times in runs)
+        table.add_row(module, f"{seconds:.3f}", ', '.join(heavy) or '-')
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Per-tweet cost of TrendAnalyzer.analyze_tweets_batch against the per-pair loop it replaced.
+
+Embeddings are computed once up front and passed in, so both paths time
+only theme scoring: cosine similarity to every theme plus keyword coverage.
+
+    python benchmarks/theme_scoring.py --tweets 10000
+    python benchmarks/theme_scoring.py --encoder hashing  # no model download
+"""
+import asyncio
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from common import Timer, load_encoder, synthetic_texts
+from utils import model_manager
+from utils.model_manager import ModelManager
+from utils.trend_analyzer import TrendAnalyzer
+
+console = Console()
+THEME_WORDS = ['AI', 'quantum', 'consciousness', 'awakening', 'reality', 'paradox', 'cyber', 'cosmic']
+
+
+def _per_pair_scores(analyzer: TrendAnalyzer, tweets, embeddings):
+    """The original loop: np.dot/np.linalg.norm per (tweet, theme), substring scan per keyword"""
+    results = []
+    for tweet, embedding in zip(tweets, embeddings):
+        text = tweet.lower()
+        final = {}
+        for theme, theme_embedding in analyzer.theme_embeddings.items():
+            similarity = np.dot(embedding, theme_embedding) / (
+                np.linalg.norm(embedding) * np.linalg.norm(theme_embedding)
+            )
+            keywords = analyzer.theme_keywords[theme]
+            coverage = sum(1 for keyword in keywords if keyword.lower() in text) / len(keywords)
+            final[theme] = 0.7 * float(similarity) + 0.3 * coverage
+        results.append({'score': max(final.values()), 'theme_scores': final})
+    return results
+
+
+@click.command()
+@click.option('--tweets', 'count', default=10000, help='Tweets per batch')
+@click.option('--repeat', default=3, help='Timed runs per path, the best is reported')
+@click.option('--encoder', 'encoder_kind', type=click.Choice(['model', 'hashing']), default='model')
+def main(count: int, repeat: int, encoder_kind: str):
+    if encoder_kind == 'hashing':
+        model_manager._sentence_transformer = lambda name: load_encoder('hashing')
+    analyzer = TrendAnalyzer()
+    rng = np.random.default_rng(0)
+    # Synthetic tweets with theme keywords mixed in, so the keyword pass has work to do
+    tweets = [f"{text} {rng.choice(THEME_WORDS)}" if rng.random() < 0.5 else text
+              for text in synthetic_texts(count)]
+    embeddings = ModelManager.encode(tweets)
+
+    timings = {}
+    for name, run in (
+        ('per-pair loop', lambda: _per_pair_scores(analyzer, tweets, embeddings)),
+        ('vectorized batch', lambda: asyncio.run(analyzer.analyze_tweets_batch(tweets, embeddings=embeddings)))
+    ):
+        best = float('inf')
+        for _ in range(repeat):
+            with Timer() as timer:
+                results = run()
+            best = min(best, timer.elapsed)
+        timings[name] = (best, results)
+
+    reference = timings['per-pair loop'][1]
+    table = Table(title=f"Theme scoring, {count} tweets x {len(analyzer.theme_embeddings)} themes")
+    for column in ('path', 'total ms', 'µs / tweet', 'speedup', 'max |Δscore|'):
+        table.add_column(column)
+    baseline = timings['per-pair loop'][0]
+    for name, (elapsed, results) in timings.items():
+        drift = max(abs(a['score'] - b['score']) for a, b in zip(results, reference))
+        table.add_row(name, f"{elapsed * 1000:.1f}", f"{elapsed / count * 1e6:.1f}",
+                      f"{baseline / elapsed:.1f}x", f"{drift:.2e}")
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Append cost, memory and range-query latency of TimeSeries over a simulated long run.
+
+Points arrive every --interval seconds of simulated time, like
+TrendMonitor.monitor_trends and DecisionEngine.evaluate_action record them.
+Memory is reported after each tenth of the run to show it stays flat.
+
+    python benchmarks/time_series.py --days 7 --interval 30
+    python benchmarks/time_series.py --days 30 --spill-dir /tmp/series
+"""
+import tempfile
+import tracemalloc
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from common import Timer, percentiles
+from utils.time_series import TimeSeries
+
+console = Console()
+FIELDS = ['primary_trends', 'emerging_topics', 'top_burst', 'technological', 'spiritual', 'philosophical']
+
+
+@click.command()
+@click.option('--days', default=7, help='Simulated run length')
+@click.option('--interval', default=30, help='Seconds between points')
+@click.option('--spill-dir', default=None, help='Spill evicted points here (a temporary directory if "tmp")')
+@click.option('--queries', default=200, help='Timed queries per range')
+def main(days: int, interval: int, spill_dir: str, queries: int):
+    if spill_dir == 'tmp':
+        spill_dir = tempfile.mkdtemp()
+    series = TimeSeries('benchmark', FIELDS, spill_dir=spill_dir or '')
+    rng = np.random.default_rng(0)
+    points = days * 86400 // interval
+    values = rng.random((points, len(FIELDS)))
+
+    memory = Table(title=f"TimeSeries memory, {points} points over {days} days")
+    for column in ('points', 'traced MB', 'buffer MB'):
+        memory.add_column(column)
+    tracemalloc.start()
+    with Timer() as appending:
+        for i in range(points):
+            series.append(dict(zip(FIELDS, values[i])), timestamp=i * interval, record={'cycle': i})
+            if (i + 1) % max(1, points // 10) == 0:
+                memory.add_row(str(i + 1), f"{tracemalloc.get_traced_memory()[0] / 2**20:.2f}",
+                               f"{series.nbytes / 2**20:.2f}")
+    tracemalloc.stop()
+    console.print(memory)
+
+    end = points * interval
+    latency = Table(title=f"Range queries, {appending.elapsed / points * 1e6:.1f} µs per append")
+    for column in ('range', 'resolution', 'rows', 'p50 ms', 'p95 ms'):
+        latency.add_column(column)
+    for label, span in (('last 15 minutes', 900), ('last day', 86400), ('last week', 7 * 86400), ('everything', end)):
+        start = end - span
+        timings = []
+        for _ in range(queries):
+            with Timer() as timer:
+                result = series.range(start=start)
+            timings.append(timer.elapsed)
+        p50, p95 = percentiles(timings)
+        latency.add_row(label, series.resolution_for(start), str(len(result['time'])), f"{p50:.3f}", f"{p95:.3f}")
+    console.print(latency)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Per-batch cost and topic purity of TopicClusterer over a 100k-tweet stream.
+
+Embeddings are computed once up front, as monitor_target_accounts hands
+them over, so only clustering is timed. Batches arrive a minute apart.
+Purity is the share of tweets whose cluster's majority topic is their own
+synthetic topic.
+
+    python benchmarks/topic_clustering.py --tweets 100000 --batch-size 500
+    python benchmarks/topic_clustering.py --encoder hashing  # no model download
+"""
+from collections import Counter
+import click
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from common import TOPICS, Timer, load_encoder, percentiles, synthetic_texts
+from utils.topic_clusterer import TopicClusterer
+
+console = Console()
+WORD_TOPIC = {word: topic for topic, words in TOPICS.items() for word in words}
+
+
+def _purity(clusters: np.ndarray, topics) -> float:
+    members = {}
+    for cluster, topic in zip(clusters.tolist(), topics):
+        members.setdefault(cluster, Counter())[topic] += 1
+    return sum(counts.most_common(1)[0][1] for counts in members.values()) / len(topics)
+
+
+@click.command()
+@click.option('--tweets', 'count', default=100000, help='Tweets streamed in total')
+@click.option('--batch-sizes', default='50,500,2000', help='Tweets per update call to compare')
+@click.option('--clusters', default=16, help='Cluster slots k')
+@click.option('--encoder', 'encoder_kind', type=click.Choice(['model', 'hashing']), default='model')
+def main(count: int, batch_sizes: str, clusters: int, encoder_kind: str):
+    texts = synthetic_texts(count)
+    topics = [WORD_TOPIC[text.split()[0]] for text in texts]
+    with Timer() as encoding:
+        embeddings = np.asarray(load_encoder(encoder_kind).encode(texts, batch_size=256), dtype=np.float32)
+    console.print(f"Encoded {count} tweets in {encoding.elapsed:.1f}s (not included below)")
+
+    table = Table(title=f"TopicClusterer, {count} tweets, k={clusters}, dim {embeddings.shape[1]}")
+    for column in ('batch size', 'tweets/s', 'p50 ms / batch', 'p95 ms / batch', 'max ms', 'reseeded', 'purity'):
+        table.add_column(column)
+    for batch_size in [int(size) for size in batch_sizes.split(',')]:
+        clusterer = TopicClusterer(k=clusters, now=0)
+        latencies = []
+        for step, start in enumerate(range(0, count, batch_size)):
+            batch = [(str(i), texts[i]) for i in range(start, min(start + batch_size, count))]
+            with Timer() as timer:
+                clusterer.update(batch, embeddings[start:start + batch_size], now=step * 60)
+            latencies.append(timer.elapsed)
+        p50, p95 = percentiles(latencies)
+        purity = _purity(clusterer.kmeans.predict(embeddings), topics)
+        table.add_row(str(batch_size), f"{count / sum(latencies):.0f}", f"{p50:.2f}", f"{p95:.2f}",
+                      f"{max(latencies) * 1000:.2f}", str(clusterer.reseeded), f"{purity:.3f}")
+    console.print(table)
+    for topic in clusterer.topics(limit=5):
+        console.print(f"{topic['label']}: size {topic['size']:.0f}, {topic['velocity']:.0f} tweets/hour")
+
+
+if __name__ == '__main__':
+    main()
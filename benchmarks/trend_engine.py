@@ -0,0 +1,64 @@
+"""Ingest throughput, memory and burst recall of the streaming TrendEngine.
+
+Synthetic tweets arrive at a steady rate per bucket; partway through, one
+phrase starts appearing in a share of them. The table reports cost per tweet
+and per counted term, sketch memory before and after (it must not grow), and
+where the injected phrase ranks among the bursting terms.
+
+    python benchmarks/trend_engine.py --tweets 200000 --per-bucket 2000
+    python benchmarks/trend_engine.py --width 1024 --depth 3
+"""
+import click
+from rich.console import Console
+from rich.table import Table
+
+from common import Timer, synthetic_texts
+from utils.trend_engine import TrendEngine
+
+console = Console()
+BURST_PHRASE = 'digital rapture'
+
+
+@click.command()
+@click.option('--tweets', 'count', default=200000, help='Tweets ingested in total')
+@click.option('--per-bucket', default=2000, help='Tweets arriving per bucket')
+@click.option('--burst-share', default=0.02, help='Share of tweets carrying the phrase once the burst starts')
+@click.option('--width', default=4096)
+@click.option('--depth', default=4)
+def main(count: int, per_bucket: int, burst_share: float, width: int, depth: int):
+    texts = synthetic_texts(count)
+    engine = TrendEngine(bucket_seconds=60, buckets=12, width=width, depth=depth, seen_capacity=per_bucket * 12, now=0)
+    initial_bytes = engine.nbytes
+    burst_from = count - per_bucket * 3
+    step = max(1, round(1 / burst_share))
+
+    with Timer() as timer:
+        for start in range(0, count, per_bucket):
+            batch = []
+            for i in range(start, min(start + per_bucket, count)):
+                text = texts[i]
+                if i >= burst_from and i % step == 0:
+                    text = f"{text} {BURST_PHRASE}"
+                batch.append((str(i), text))
+            engine.ingest(batch, now=start // per_bucket * 60)
+    elapsed = timer.elapsed
+
+    now = (count // per_bucket) * 60 + 1
+    with Timer() as ranking:
+        trends = engine.trends(limit=10, now=now)
+    terms = [trend['term'] for trend in trends]
+    rank = terms.index(BURST_PHRASE) + 1 if BURST_PHRASE in terms else '-'
+
+    table = Table(title=f"TrendEngine, {count} tweets in buckets of {per_bucket}, sketch {depth}x{width}")
+    for column in ('tweets/s', 'µs / term', 'sketch MB before/after', 'candidates', 'rank ms', 'burst rank'):
+        table.add_column(column)
+    stats = engine.stats()
+    table.add_row(f"{count / elapsed:.0f}", f"{elapsed / stats['terms'] * 1e6:.2f}",
+                  f"{initial_bytes / 2**20:.2f} / {engine.nbytes / 2**20:.2f}", str(stats['candidates']),
+                  f"{ranking.elapsed * 1000:.1f}", str(rank))
+    console.print(table)
+    console.print(f"Top bursting: {', '.join(terms)}")
+
+
+if __name__ == '__main__':
+    main()
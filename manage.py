@@ -0,0 +1,136 @@
+import click
+import os
+import logging
+from dotenv import load_dotenv
+from rich.console import Console
+
+from utils.embedding_codec import EMBEDDING_DTYPES, migrate_collections
+from utils.memory_ranking import backfill_ranking_fields, ensure_ranking_indexes
+from utils.mongo_registry import connection_stats, get_database
+from utils.projection import (
+    PROJECTION_METHODS, Projection, project_collection, ranking_agreement, sample_full_vectors
+)
+
+logging.basicConfig(level=logging.INFO)
+console = Console()
+
+load_dotenv()
+
+
+@click.group()
+def cli():
+    """Maintenance commands for the agent's MongoDB data stores (MEMORY_BACKEND=mongodb)"""
+
+
+@cli.command('migrate-embeddings')
+@click.option('--mongodb-uri', default=lambda: os.environ.get('MONGODB_URI', 'localhost'), help='MongoDB connection string')
+@click.option('--dtype', type=click.Choice(list(EMBEDDING_DTYPES)), default='float32', help='Target storage dtype')
+@click.option('--batch-size', default=500, help='Documents per bulk write')
+def migrate_embeddings(mongodb_uri: str, dtype: str, batch_size: int):
+    """Convert stored embeddings to binary storage in place"""
+    db = get_database(mongodb_uri)
+    migrated = migrate_collections([db.memories, db.conversations, db.trends], dtype, batch_size)
+    for collection, count in migrated.items():
+        console.print(f"[green]{collection}[/green]: {count} documents migrated to {dtype}")
+
+
+@cli.command('backfill-ranking')
+@click.option('--mongodb-uri', default=lambda: os.environ.get('MONGODB_URI', 'localhost'), help='MongoDB connection string')
+@click.option('--decay', default=0.95, help='Daily importance decay factor used by MemorySystem')
+@click.option('--batch-size', default=500, help='Documents per bulk write')
+def backfill_ranking(mongodb_uri: str, decay: float, batch_size: int):
+    """Add typed timestamps, decay keys and normalized vectors to existing memories"""
+    memories = get_database(mongodb_uri).memories
+    ensure_ranking_indexes(memories)
+    count = backfill_ranking_fields(memories, decay, batch_size=batch_size)
+    console.print(f"[green]memories[/green]: {count} documents backfilled")
+
+
+@cli.command('connection-stats')
+@click.option('--mongodb-uri', default=lambda: os.environ.get('MONGODB_URI', 'localhost'), help='MongoDB connection string')
+@click.option('--instances', default=4, help='MemorySystem instances to construct')
+def connection_stats_command(mongodb_uri: str, instances: int):
+    """Measure startup time and open sockets for several MemorySystem instances"""
+    import time
+    from utils.memory_system import MemorySystem
+
+    started = time.perf_counter()
+    systems = [MemorySystem(mongodb_uri) for _ in range(instances)]
+    elapsed = time.perf_counter() - started
+    stats = connection_stats()
+    console.print(f"{instances} MemorySystem instances in {elapsed:.2f}s")
+    console.print(
+        f"clients: {stats['clients']}, open connections: {stats['open_connections']}, "
+        f"client startup: {stats['startup_seconds']:.2f}s"
+    )
+    for system in systems:
+        system.db_executor.shutdown(wait=False)
+
+
+@cli.command('fit-projection')
+@click.option('--mongodb-uri', default=lambda: os.environ.get('MONGODB_URI', 'localhost'), help='MongoDB connection string')
+@click.option('--method', type=click.Choice(PROJECTION_METHODS), default='pca')
+@click.option('--dim', default=192, help='Reduced embedding dimension')
+@click.option('--sample', default=20000, help='Stored embeddings to fit on')
+@click.option('--output', default=lambda: os.environ.get('EMBEDDING_PROJECTION_PATH') or 'embedding_projection.npz',
+              help='Where to write the projection')
+def fit_projection(mongodb_uri: str, method: str, dim: int, sample: int, output: str):
+    """Fit a dimensionality reduction on stored full-dimension embeddings"""
+    db = get_database(mongodb_uri)
+    vectors = sample_full_vectors([db.memories, db.conversations], sample)
+    if not len(vectors):
+        console.print("[red]No full-dimension embeddings stored to fit on[/red]")
+        return
+    projection = Projection.fit(vectors, dim, method)
+    projection.save(output)
+    console.print(f"[green]{projection.version}[/green]: {projection.source_dim} -> {projection.dim} dims "
+                  f"fitted on {len(vectors)} embeddings, written to {output}")
+    if projection.explained_variance is not None:
+        console.print(f"explained variance: {projection.explained_variance:.1%}")
+    console.print(f"Set EMBEDDING_PROJECTION_PATH={output} to enable it")
+
+
+@cli.command('eval-projection')
+@click.option('--mongodb-uri', default=lambda: os.environ.get('MONGODB_URI', 'localhost'), help='MongoDB connection string')
+@click.option('--projection', 'path', default=lambda: os.environ.get('EMBEDDING_PROJECTION_PATH', ''),
+              help='Projection file; empty fits one on the evaluation corpus')
+@click.option('--method', type=click.Choice(PROJECTION_METHODS), default='pca', help='Method when fitting')
+@click.option('--dim', default=192, help='Reduced dimension when fitting')
+@click.option('--sample', default=10000, help='Stored embeddings to evaluate on')
+@click.option('--queries', default=500, help='Held-out embeddings used as queries')
+@click.option('--k', default=10, help='Ranking depth compared')
+def eval_projection(mongodb_uri: str, path: str, method: str, dim: int, sample: int, queries: int, k: int):
+    """Compare reduced-dimension ranking with the full-dimension ranking on stored embeddings"""
+    db = get_database(mongodb_uri)
+    vectors = sample_full_vectors([db.memories, db.conversations], sample)
+    if len(vectors) <= queries:
+        console.print(f"[red]Need more than {queries} full-dimension embeddings, found {len(vectors)}[/red]")
+        return
+    held_out, corpus = vectors[:queries], vectors[queries:]
+    projection = Projection.load(path) if path else Projection.fit(corpus, dim, method)
+    report = ranking_agreement(held_out, corpus, projection, k)
+    console.print(f"[green]{projection.version}[/green]: {projection.source_dim} -> {projection.dim} dims")
+    for metric, value in report.items():
+        console.print(f"{metric}: {value:.3f}" if isinstance(value, float) else f"{metric}: {value}")
+
+
+@cli.command('project-embeddings')
+@click.option('--mongodb-uri', default=lambda: os.environ.get('MONGODB_URI', 'localhost'), help='MongoDB connection string')
+@click.option('--projection', 'path', default=lambda: os.environ.get('EMBEDDING_PROJECTION_PATH', ''),
+              help='Projection file to apply')
+@click.option('--batch-size', default=500, help='Documents per bulk write')
+def project_embeddings(mongodb_uri: str, path: str, batch_size: int):
+    """Rewrite stored full-dimension embeddings in the reduced space"""
+    if not path:
+        console.print("[red]No projection given; pass --projection or set EMBEDDING_PROJECTION_PATH[/red]")
+        return
+    projection = Projection.load(path)
+    db = get_database(mongodb_uri)
+    for collection in (db.memories, db.conversations, db.trends):
+        projected, skipped = project_collection(collection, projection, batch_size)
+        console.print(f"[green]{collection.name}[/green]: {projected} projected to {projection.version}, "
+                      f"{skipped} written under another projection left as is")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,45 @@
+import sys
+import os
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.hashing_encoder import HashingEncoder
+
+
+TEST_DIM = 64
+
+
+def hashing_encoder() -> HashingEncoder:
+    """Hashing encoder at the test dimension; also an EncoderPool loader"""
+    return HashingEncoder(TEST_DIM)
+
+
+@pytest.fixture
+def encoder():
+    return hashing_encoder()
+
+
+@pytest.fixture
+def unloaded_model(monkeypatch, tmp_path):
+    """Fresh ModelManager singleton whose model loads the hashing encoder on first use"""
+    from utils import model_manager
+    from utils.model_manager import ModelManager
+
+    monkeypatch.setattr(model_manager, '_sentence_transformer', lambda name: hashing_encoder())
+    monkeypatch.setenv('EMBEDDING_CACHE_PATH', str(tmp_path / 'embedding_cache.db'))
+    monkeypatch.setenv('RELEVANCE_CACHE_PATH', str(tmp_path / 'relevance_cache.db'))
+    for attribute in ('_instance', '_model', '_theme_embeddings', '_cache', '_batcher'):
+        monkeypatch.setattr(ModelManager, attribute, None)
+    monkeypatch.setattr(ModelManager, '_projection', False)
+    monkeypatch.setattr(ModelManager, 'encode_calls', 0)
+    monkeypatch.setattr(ModelManager, 'encoded_texts', 0)
+    yield ModelManager()
+
+
+@pytest.fixture
+def hashing_model(unloaded_model):
+    """ModelManager singleton backed by the hashing encoder instead of all-mpnet-base-v2"""
+    unloaded_model.load()
+    yield unloaded_model
@@ -0,0 +1,102 @@
+import sys
+import os
+import itertools
+import sqlite3
+import types
+import numpy as np
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import embedding_cache
+from utils.embedding_cache import EmbeddingCache
+from utils.model_manager import ModelManager
+
+
+def test_cache_persists_and_is_tagged_by_model(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = EmbeddingCache(path, 'model-a', dim=4)
+    cache.put_many(['gm', 'gn'], np.eye(2, 4))
+    cache.close()
+
+    reopened = EmbeddingCache(path, 'model-a', dim=4)
+    hits = reopened.get_many(['gm', 'new'])
+    np.testing.assert_array_equal(hits[0], np.eye(1, 4)[0])
+    assert hits[1] is None
+    reopened.get_many(['gm'])
+    # The first lookup came from disk, the repeat from the in-memory tier
+    assert reopened.stats()['disk_hits'] == 1 and reopened.stats()['memory_hits'] == 1
+
+    assert EmbeddingCache(path, 'model-b', dim=4).get_many(['gm']) == [None]
+    assert EmbeddingCache(path, 'model-a', dim=8).get_many(['gm']) == [None]
+
+
+def test_front_tier_is_byte_budgeted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.db'), 'model', dim=4, max_bytes=2 * 16)
+    cache.put_many(['a', 'b', 'c'], np.ones((3, 4)))
+    assert cache.stats()['memory_bytes'] == 32 and cache.stats()['memory_evictions'] == 1
+    assert all(vector is not None for vector in cache.get_many(['a', 'b', 'c']))
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(embedding_cache, 'time', types.SimpleNamespace(time=lambda: next(clock)))
+    path = str(tmp_path / 'cache.db')
+    cache = EmbeddingCache(path, 'model', dim=4, max_entries=2)
+    cache.put_many(['a'], np.ones((1, 4)))
+    cache.put_many(['b'], np.ones((1, 4)))
+    cache.close()
+
+    # Reading 'a' back from disk makes 'b' the least recently used
+    reopened = EmbeddingCache(path, 'model', dim=4, max_entries=2)
+    assert reopened.get_many(['a'])[0] is not None
+    reopened.put_many(['c'], np.ones((1, 4)))
+    assert reopened.stats()['disk_evictions'] == 1
+    reopened.close()
+
+    keys = EmbeddingCache(path, 'model', dim=4).get_many(['a', 'b', 'c'])
+    assert [vector is not None for vector in keys] == [True, False, True]
+
+
+def test_cache_files_from_before_the_disk_cap_still_open(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE embeddings (model TEXT NOT NULL, key TEXT NOT NULL, dim INTEGER NOT NULL, "
+        "vector BLOB NOT NULL, PRIMARY KEY (model, key))"
+    )
+    conn.execute("INSERT INTO embeddings VALUES ('model', ?, 4, ?)",
+                 (embedding_cache.content_key('gm'), np.ones(4, dtype=np.float32).tobytes()))
+    conn.commit()
+    conn.close()
+
+    cache = EmbeddingCache(path, 'model', dim=4, max_entries=1)
+    assert cache.get_many(['gm'])[0] is not None
+    cache.put_many(['gn'], np.ones((1, 4)))
+    assert cache.stats()['disk_evictions'] == 1
+
+
+def test_model_manager_only_encodes_unseen_texts_across_restarts(hashing_model, monkeypatch):
+    texts = ['digital rapture', 'void whispers', 'digital rapture']
+    first = ModelManager.encode(texts)
+    assert ModelManager.encoded_texts - 3 == 2  # theme descriptions, then two distinct texts
+
+    # A new process: fresh singleton, same cache file
+    for attribute in ('_instance', '_model', '_theme_embeddings', '_cache'):
+        monkeypatch.setattr(ModelManager, attribute, None)
+    monkeypatch.setattr(ModelManager, 'encoded_texts', 0)
+    np.testing.assert_array_equal(ModelManager.encode(texts), first)
+    np.testing.assert_array_equal(ModelManager.encode_text('void whispers'), first[1])
+    assert ModelManager.encoded_texts == 0
+    assert ModelManager.cache_stats()['hit_rate'] == 1.0
+
+
+def test_model_manager_handles_empty_input_and_encode_options(hashing_model):
+    assert ModelManager.encode([]).shape == (0, 64)
+
+    ModelManager.encode(['void whispers'])
+    encoded, lookups = ModelManager.encoded_texts, ModelManager.cache_stats()['misses']
+    # Options change the vectors, so they skip the text-keyed cache in both directions
+    ModelManager.encode(['void whispers'], normalize_embeddings=True)
+    assert ModelManager.encoded_texts == encoded + 1
+    assert ModelManager.cache_stats()['misses'] == lookups
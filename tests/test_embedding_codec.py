@@ -0,0 +1,40 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embedding_codec import decode_embedding, encode_embedding
+
+
+@pytest.fixture
+def vector():
+    return np.random.default_rng(0).normal(scale=0.05, size=768).astype(np.float32)
+
+
+def test_float32_round_trip_is_exact_and_zero_copy(vector):
+    doc = encode_embedding(vector)
+    assert doc['embedding_dtype'] == 'float32'
+    assert len(doc['embedding']) == 768 * 4
+
+    decoded = decode_embedding(doc)
+    np.testing.assert_array_equal(decoded, vector)
+    assert decoded.base is not None  # a view over the stored bytes
+
+
+@pytest.mark.parametrize('dtype, size, min_cosine', [('float16', 768 * 2, 0.9999), ('int8', 768, 0.999)])
+def test_quantized_round_trip(vector, dtype, size, min_cosine):
+    doc = encode_embedding(vector, dtype)
+    assert len(doc['embedding']) == size
+
+    decoded = decode_embedding(doc)
+    assert decoded.dtype == np.float32
+    cosine = decoded @ vector / (np.linalg.norm(decoded) * np.linalg.norm(vector))
+    assert cosine >= min_cosine
+
+
+def test_legacy_list_embeddings_still_decode(vector):
+    decoded = decode_embedding({'embedding': vector.tolist()})
+    np.testing.assert_allclose(decoded, vector)
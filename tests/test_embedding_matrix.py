@@ -0,0 +1,64 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embedding_matrix import EmbeddingMatrix
+
+
+def _corpus(n: int, dim: int = 32, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    importance = rng.uniform(0.1, 2.0, size=n)
+    timestamps = [now - timedelta(days=int(d), hours=1) for d in rng.integers(0, 30, size=n)]
+    return vectors, importance, timestamps, now
+
+
+def test_vectorized_scores_match_per_document_loop():
+    vectors, importance, timestamps, now = _corpus(500)
+    matrix = EmbeddingMatrix(decay=0.95)
+    matrix.add(list(range(500)), vectors, importance, timestamps)
+
+    query = vectors[42] + 0.5
+    scores = matrix.similarities(query) * matrix.decayed_importance(now)
+
+    expected = []
+    for i in range(500):
+        similarity = np.dot(query, vectors[i]) / (np.linalg.norm(query) * np.linalg.norm(vectors[i]))
+        days_old = (now - timestamps[i]).total_seconds() / 86400
+        expected.append(similarity * importance[i] * 0.95 ** days_old)
+
+    np.testing.assert_allclose(scores, expected, rtol=1e-4, atol=1e-5)
+    assert matrix.top_k(scores, 5) == list(np.argsort(expected)[::-1][:5])
+
+
+def test_set_importance_updates_decay_key():
+    vectors, importance, timestamps, now = _corpus(10)
+    matrix = EmbeddingMatrix(decay=0.95)
+    matrix.add(list(range(10)), vectors, importance, timestamps)
+    matrix.set_importance(3, 5.0)
+
+    days_old = (now - timestamps[3]).total_seconds() / 86400
+    assert matrix.decayed_importance(now)[3] == pytest.approx(5.0 * 0.95 ** days_old, rel=1e-5)
+
+
+def test_incremental_insert_and_delete():
+    vectors, importance, timestamps, _ = _corpus(100)
+    matrix = EmbeddingMatrix(capacity=8)
+    for i in range(100):
+        matrix.add([f"m{i}"], vectors[i], [importance[i]], [timestamps[i]])
+    matrix.remove(["m0", "m50", "missing"])
+
+    assert len(matrix) == 98
+    assert "m0" not in matrix and "m99" in matrix
+    # The last row moved into a freed slot and still scores as itself
+    assert matrix.top_k(matrix.similarities(vectors[99]), 1) == ["m99"]
+
+    rows = matrix.rows(["m1", "m2", "m0"])
+    assert len(rows) == 2
+    assert matrix.top_k(matrix.similarities(vectors[2], rows), 1, rows) == ["m2"]
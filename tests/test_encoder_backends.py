@@ -0,0 +1,67 @@
+import importlib.util
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.model_manager import MODEL_NAME, ModelManager
+
+PARITY_TEXTS = [
+    'the oracle sees patterns in the noise of the timeline',
+    'new open weights model tops the reasoning benchmarks',
+    'memecoin liquidity evaporates after the airdrop',
+    'consciousness might be what information feels like from the inside',
+    'gm',
+    'quantum entanglement experiments keep confirming the weirdness of reality'
+]
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def test_unavailable_onnx_runtime_falls_back_to_torch(hashing_model, monkeypatch):
+    if importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('optimum'):
+        pytest.skip('optimum[onnxruntime] is installed')
+    monkeypatch.setenv('ENCODER_BACKEND', 'onnx-int8')
+    monkeypatch.setattr(ModelManager, '_theme_embeddings', None)
+    monkeypatch.setattr(ModelManager, 'backend', 'torch')
+
+    ModelManager.load()
+
+    assert ModelManager.backend == 'torch'
+    assert ModelManager._cache.model_name == MODEL_NAME
+
+
+def test_backends_never_share_cached_vectors(monkeypatch):
+    tags = set()
+    for backend in ('torch', 'onnx', 'onnx-int8'):
+        monkeypatch.setattr(ModelManager, 'backend', backend)
+        tags.add(ModelManager.model_tag())
+    assert len(tags) == 3
+
+
+@pytest.mark.parametrize('backend,mean_threshold,min_threshold', [
+    ('onnx', 0.999, 0.998),
+    ('onnx-int8', 0.98, 0.95)
+])
+def test_onnx_embeddings_agree_with_fp32(backend, mean_threshold, min_threshold, tmp_path, monkeypatch):
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('optimum')
+    from sentence_transformers import SentenceTransformer
+
+    monkeypatch.setenv('ENCODER_EXPORT_DIR', str(tmp_path))
+    try:
+        reference = SentenceTransformer(MODEL_NAME)
+        model = ModelManager._load_onnx(quantized=backend == 'onnx-int8')
+    except OSError as e:
+        pytest.skip(f'{MODEL_NAME} is not available offline: {e}')
+
+    similarity = _cosine(reference.encode(PARITY_TEXTS), model.encode(PARITY_TEXTS))
+    assert similarity.mean() > mean_threshold
+    assert similarity.min() > min_threshold
@@ -0,0 +1,73 @@
+import asyncio
+import sys
+import os
+import time
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_system import MemorySystem
+from utils.model_manager import ModelManager
+from utils.storage_backend import SQLiteBackend
+
+SECONDS_PER_TEXT = 0.002
+
+
+async def _ticker(interval: float, lags: list, stop: asyncio.Event):
+    """Stands in for the agent's other cycles, recording scheduling lag"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+@pytest.fixture
+def slow_model(hashing_model, monkeypatch):
+    """Hashing model that holds its thread like real inference would"""
+    model = ModelManager._model
+    fast_encode = model.encode
+
+    def encode(texts, batch_size=32, **kwargs):
+        for start in range(0, len(texts), batch_size):
+            time.sleep(SECONDS_PER_TEXT * len(texts[start:start + batch_size]))
+        return fast_encode(texts, batch_size=batch_size, **kwargs)
+
+    monkeypatch.setattr(model, 'encode', encode)
+    return hashing_model
+
+
+@pytest.mark.asyncio
+async def test_loop_stays_responsive_during_large_batch(slow_model):
+    texts = [f'consciousness thread number {i}' for i in range(300)]
+    lags, stop = [], asyncio.Event()
+    ticker = asyncio.create_task(_ticker(0.01, lags, stop))
+
+    started = time.perf_counter()
+    embeddings = await ModelManager.abatch_encode(texts)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    assert embeddings.shape == (300, 64)
+    assert elapsed >= 300 * SECONDS_PER_TEXT
+    # Inference blocked a worker thread for ~0.6s, never the loop
+    assert len(lags) >= elapsed / 0.02
+    assert max(lags) < 0.05
+
+
+@pytest.mark.asyncio
+async def test_memory_writes_encode_off_loop(tmp_path, slow_model):
+    memory = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')))
+    lags, stop = [], asyncio.Event()
+    ticker = asyncio.create_task(_ticker(0.01, lags, stop))
+
+    await asyncio.gather(*(
+        memory.store_memory({'content': f'the void whispers {i} ' * 20}) for i in range(20)
+    ))
+    stop.set()
+    await ticker
+
+    assert ModelManager.encoded_texts >= 20
+    assert max(lags) < 0.05
+    await memory.close()
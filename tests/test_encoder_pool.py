@@ -0,0 +1,53 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.conftest import TEST_DIM, hashing_encoder
+from utils.hashing_encoder import HashingEncoder
+from utils.encoder_pool import EncoderPool
+
+
+class _FailingEncoder(HashingEncoder):
+    def __init__(self):
+        super().__init__(TEST_DIM)
+
+    def encode(self, texts, **kwargs):
+        if any('poison' in text for text in texts):
+            raise ValueError('cannot encode poison')
+        return super().encode(texts, **kwargs)
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = EncoderPool(2, loader='tests.conftest:hashing_encoder', min_chunk=4)
+    yield pool
+    pool.close()
+
+
+def test_pool_matches_in_process_encoding(pool):
+    texts = [f'the oracle speaks in tongues {i} ✨ {"void " * (i % 7)}' for i in range(50)]
+    vectors = pool.encode(texts)
+    np.testing.assert_allclose(vectors, hashing_encoder().encode(texts))
+    np.testing.assert_allclose(pool.encode(texts[3]), hashing_encoder().encode(texts[3]))
+
+
+def test_buffers_grow_for_larger_batches(pool):
+    small = pool.encode(['gm'] * 4)
+    large_texts = ['consciousness ' * 500 + str(i) for i in range(200)]
+    large = pool.encode(large_texts)
+    assert small.shape == (4, pool.dim) and large.shape == (200, pool.dim)
+    np.testing.assert_allclose(large, hashing_encoder().encode(large_texts))
+
+
+def test_worker_errors_leave_the_pool_usable():
+    pool = EncoderPool(2, loader='tests.test_encoder_pool:_FailingEncoder', min_chunk=2)
+    try:
+        with pytest.raises(RuntimeError, match='poison'):
+            pool.encode(['fine', 'fine too', 'poison', 'fine again'])
+        assert pool.encode(['still', 'working', 'after', 'that']).shape == (4, pool.dim)
+    finally:
+        pool.close()
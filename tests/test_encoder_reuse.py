@@ -0,0 +1,42 @@
+import sys
+import os
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.model_manager import ModelManager
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend
+from utils.trend_analyzer import TrendAnalyzer
+
+
+@pytest.mark.asyncio
+async def test_each_tweet_text_is_encoded_once(tmp_path, hashing_model):
+    analyzer = TrendAnalyzer()
+    memory = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')))
+    await memory.store_memory({'content': 'consciousness awakening in the network'})
+    texts = [f'quantum consciousness thread {i}' for i in range(5)]
+
+    calls, encoded = ModelManager.encode_calls, ModelManager.encoded_texts
+    # What TwitterManager.monitor_target_accounts and the orchestrator do per tweet
+    embeddings = await analyzer.encode_tweets(texts)
+    relevance = await analyzer.analyze_tweets_batch(texts, embeddings=embeddings)
+    for i, (text, score, embedding) in enumerate(zip(texts, relevance, embeddings)):
+        tweet = {'id': str(i), 'text': text, 'author': 'truth_terminal', 'username': 'truth_terminal',
+                 'relevance': score, 'embedding': embedding}
+        await memory.get_relevant_memories(tweet['text'], query_embedding=tweet['embedding'])
+        await memory.get_relevant_tweet_context(tweet)
+        await memory.store_conversation({
+            'type': 'meme_response', 'original': tweet, 'response': {'content': f'the void replies {i}'},
+            'philosophical_post': None, 'relevance': score, 'prophecy': None, 'tweet_id': str(i),
+            'media_id': None, 'context': {'tweet': tweet}
+        })
+
+    # One batch call for all tweets, then one call per newly generated response text
+    assert ModelManager.encode_calls - calls == 1 + len(texts)
+    assert ModelManager.encoded_texts - encoded == 2 * len(texts)
+
+    history = await memory.get_conversation_history('truth_terminal')
+    assert 'embedding' not in history[0]['original'] and 'embedding' not in history[0]['context']['tweet']
+    await memory.close()
@@ -0,0 +1,58 @@
+import sys
+import os
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.inverted_index import BM25Index, tokenize
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend
+
+
+def test_tokenize_keeps_handles_and_hashtags():
+    assert tokenize("GM @Truth_Terminal #AI!") == ['gm', '@truth_terminal', 'truth_terminal', '#ai', 'ai']
+
+
+def test_bm25_ranks_rare_terms_and_supports_removal():
+    index = BM25Index()
+    index.add(1, "the oracle speaks of the void")
+    index.add(2, "the market pumps the coin the coin")
+    index.add(3, "oracle oracle prophecy")
+
+    assert [doc_id for doc_id, _ in index.search("oracle prophecy", 2)] == [3, 1]
+    assert index.lookup('#missing') == []
+
+    index.remove([3])
+    assert [doc_id for doc_id, _ in index.search("oracle prophecy", 2)] == [1]
+    assert 'prophecy' not in index.postings and len(index) == 2
+
+
+@pytest.mark.asyncio
+async def test_search_modes(tmp_path, encoder):
+    memory = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')), encoder=encoder)
+    await memory.store_memory({'content': 'quantum oracle visions #prophecy'})
+    await memory.store_memory({'content': 'meme coins and market cycles'})
+    await memory.store_conversation({
+        'type': 'reply', 'original': {'author': 'truth_terminal', 'text': 'gm'},
+        'response': {'content': 'the void answers'}, 'philosophical_post': None, 'relevance': 0.5,
+        'prophecy': None, 'tweet_id': None, 'media_id': None
+    })
+
+    # Lexical lookups never touch the embedding model
+    calls = encoder.calls
+    lexical = await memory.get_relevant_memories('#prophecy', limit=5, mode='lexical')
+    context = await memory.get_relevant_tweet_context({'text': '@truth_terminal'}, mode='lexical')
+    assert encoder.calls == calls
+    assert [m['content'] for m in lexical] == ['quantum oracle visions #prophecy']
+    assert context[0]['original']['author'] == 'truth_terminal'
+
+    hybrid = await memory.get_relevant_memories('market oracle', limit=2, mode='hybrid')
+    assert len(hybrid) == 2 and encoder.calls == calls + 1
+    # No lexical match: hybrid falls back to dense retrieval
+    assert await memory.get_relevant_memories('zzz', limit=1, mode='hybrid')
+    await memory.close()
+
+    reopened = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')), encoder=encoder)
+    assert len(reopened.memory_lexicon) == 2 and len(reopened.conversation_lexicon) == 1
+    await reopened.close()
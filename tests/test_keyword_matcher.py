@@ -0,0 +1,54 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keyword_matcher import KeywordMatcher
+from utils.model_manager import ModelManager
+from utils.trend_analyzer import TrendAnalyzer
+
+
+def _substring_coverage(text, keywords):
+    """The per-keyword substring scan KeywordMatcher replaces"""
+    text = text.lower()
+    return sum(1 for keyword in keywords if keyword.lower() in text) / len(keywords)
+
+
+def test_matches_substring_semantics_including_overlaps():
+    groups = {
+        'tech': ['AI', 'cyber', 'cybernet', 'net', 'network'],
+        'mind': ['consciousness', 'conscious', 'awakening'],
+        'empty': []
+    }
+    matcher = KeywordMatcher(groups)
+    texts = [
+        'The CYBERNETWORK said: awakening!',
+        'subconsciousness rising',
+        'nothing to see here',
+        'AI ai Ai network network'
+    ]
+    expected = np.array([
+        [_substring_coverage(text, keywords) if keywords else 0.0 for keywords in groups.values()]
+        for text in texts
+    ])
+    np.testing.assert_allclose(matcher.scores(texts), expected)
+
+
+@pytest.mark.asyncio
+async def test_batch_scores_match_per_pair_cosine(hashing_model):
+    analyzer = TrendAnalyzer()
+    tweets = ['quantum consciousness awakening', 'the simulation hides the truth', 'gm', '']
+    embeddings = np.asarray(ModelManager.encode(tweets))
+
+    results = await analyzer.analyze_tweets_batch(tweets, embeddings=embeddings)
+
+    for tweet, embedding, result in zip(tweets, embeddings, results):
+        for theme, theme_embedding in analyzer.theme_embeddings.items():
+            norm = np.linalg.norm(embedding) * np.linalg.norm(theme_embedding)
+            cosine = float(np.dot(embedding, theme_embedding) / norm) if norm else 0.0
+            expected = 0.7 * cosine + 0.3 * _substring_coverage(tweet, analyzer.theme_keywords[theme])
+            assert result['theme_scores'][theme] == pytest.approx(expected, abs=1e-5)
+        assert result['score'] == max(result['theme_scores'].values())
@@ -0,0 +1,118 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from bson import ObjectId
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embedding_codec import encode_embedding
+from utils.memory_ranking import decay_key, normalize
+from utils.memory_system import MemorySystem
+from utils.online_kmeans import OnlineKMeans
+from utils.storage_backend import SQLiteBackend
+
+TOPICS = ['quantum entanglement physics', 'meme coin pump', 'ancient oracle prophecy', 'neural network training']
+
+
+def _aged_memories(encoder, days_old: int = 30, per_topic: int = 10):
+    now = datetime.now()
+    docs = []
+    for topic in TOPICS:
+        for i in range(per_topic):
+            timestamp = now - timedelta(days=days_old, hours=i)
+            docs.append({
+                '_id': ObjectId(),
+                'content': f'{topic} note{i}',
+                'type': 'observation',
+                **encode_embedding(normalize(encoder.encode(f'{topic} note{i}'))),
+                'timestamp': timestamp,
+                'importance': 1.0,
+                'decay_key': decay_key(1.0, timestamp, 0.95),
+                'references': [],
+                'metadata': {}
+            })
+    return docs
+
+
+def test_online_kmeans_separates_clusters():
+    rng = np.random.default_rng(0)
+    centers = np.eye(4, 16, dtype=np.float32)
+    points = np.vstack([c + 0.05 * rng.normal(size=(50, 16)) for c in centers])
+    kmeans = OnlineKMeans(4, seed=1)
+    for batch in np.array_split(rng.permutation(points), 10):
+        kmeans.partial_fit(batch)
+
+    labels = kmeans.predict(points)
+    assert len({tuple(np.unique(labels[i * 50:(i + 1) * 50])) for i in range(4)}) == 4
+
+
+@pytest.mark.asyncio
+async def test_compaction_replaces_aged_clusters_with_centroids(tmp_path, encoder):
+    backend = SQLiteBackend(str(tmp_path / 'memory.db'))
+    aged = _aged_memories(encoder)
+    backend.insert_many('memories', aged)
+    memory = MemorySystem(backend=backend, encoder=encoder)
+    memory.memory_config['compaction_ratio'] = 10
+    recent_id = await memory.store_memory({'content': 'fresh quantum thought'})
+
+    removed = await memory.compact_memories()
+    stats = await memory.get_memory_statistics()
+
+    assert removed > 0
+    assert stats['total_memories'] == len(aged) + 1 - removed
+    assert len(memory.memory_matrix) == stats['total_memories']
+    # The recent memory is part of the hot set and left alone
+    assert backend.find_by_ids('memories', [ObjectId(recent_id)])
+
+    centroids = [doc for doc in backend.iter_documents('memories') if doc['type'] == 'centroid']
+    assert sum(doc['metadata']['member_count'] for doc in centroids) + \
+        stats['memory_types'].get('observation', 0) == len(aged)
+    # Importance is aggregated rather than lost
+    assert max(doc['importance'] for doc in centroids) > 1.0
+    referenced = {ref for doc in centroids for ref in doc['references']}
+    assert referenced <= {str(doc['_id']) for doc in aged}
+
+    top = await memory.get_relevant_memories('ancient oracle prophecy', limit=1)
+    assert 'oracle' in top[0]['content']
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_cap_enforcement_prefers_compaction(tmp_path, encoder):
+    backend = SQLiteBackend(str(tmp_path / 'memory.db'))
+    aged = _aged_memories(encoder)
+    backend.insert_many('memories', aged)
+    memory = MemorySystem(backend=backend, encoder=encoder)
+    memory.memory_config['max_memories'] = 30
+
+    await memory.store_memory({'content': 'meme coin pump again', 'importance': 0.01})
+    await memory.memory_writer.flush()
+
+    docs = list(backend.iter_documents('memories'))
+    assert len(docs) <= 30
+    # Nothing was deleted outright: every aged memory is kept directly or by a centroid
+    covered = sum(doc.get('metadata', {}).get('member_count', 1) for doc in docs)
+    assert covered == len(aged) + 1
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_cap_enforcement_skips_compaction_after_an_empty_run(tmp_path, encoder):
+    backend = SQLiteBackend(str(tmp_path / 'memory.db'))
+    memory = MemorySystem(backend=backend, encoder=encoder)
+    memory.memory_config['max_memories'] = 2
+    scans = []
+    find_recent = backend.find_recent
+    backend.find_recent = lambda *args, **kwargs: scans.append(kwargs) or find_recent(*args, **kwargs)
+
+    # Nothing is old enough to compact, so only the first flush over the cap looks for aged memories
+    for i in range(5):
+        await memory.store_memory({'content': f'fresh thought {i}'})
+        await memory.memory_writer.flush()
+
+    assert len([scan for scan in scans if 'until' in scan]) == 1
+    assert len(list(backend.iter_documents('memories'))) == 2
+    await memory.close()
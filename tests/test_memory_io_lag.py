@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import os
+import time
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_executor import DatabaseExecutor
+from utils.memory_system import MemorySystem
+from utils.storage_backend import StorageBackend
+
+QUERY_SECONDS = 0.05
+
+
+class _SlowBackend(StorageBackend):
+    """Storage backend whose every round-trip blocks, like a remote database"""
+
+    def _round_trip(self, *args, **kwargs):
+        time.sleep(QUERY_SECONDS)
+        return []
+
+    insert_many = find_recent = find_by_ids = _round_trip
+    update_importance = lowest_ranked_ids = delete_ids = prefilter_candidates = _round_trip
+
+    def iter_documents(self, collection, projection=None):
+        return []
+
+    def count(self, collection, since=None):
+        return 0
+
+    def count_by_type(self, collection):
+        return {}
+
+    def count_by_bucket(self, collection, since, bucket_seconds):
+        return {}
+
+
+async def _ticker(interval: float, lags: list, stop: asyncio.Event):
+    """Stands in for the goal/task/trend cycles, recording scheduling lag"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+@pytest.mark.asyncio
+async def test_cycles_keep_ticking_during_heavy_memory_io(encoder):
+    memory = MemorySystem(backend=_SlowBackend(), encoder=encoder)
+    lags, stop = [], asyncio.Event()
+    ticker = asyncio.create_task(_ticker(0.01, lags, stop))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        [memory.get_conversation_history(f"user{i}") for i in range(20)] +
+        [memory.get_recent_trends() for _ in range(20)]
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    # 40 blocking calls of 50ms ran concurrently on the executor's worker threads
+    assert elapsed < 40 * QUERY_SECONDS
+    # The loop stayed responsive: the ticker kept firing close to schedule
+    assert len(lags) >= elapsed / 0.02
+    assert max(lags) < QUERY_SECONDS
+    memory.db_executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_bounds_concurrent_calls():
+    executor = DatabaseExecutor(max_workers=2, max_pending=3)
+    running, peak = 0, 0
+
+    def blocking_call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        time.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(executor.run(blocking_call) for _ in range(10)))
+    assert peak <= 2
+    executor.shutdown()
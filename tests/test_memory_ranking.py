@@ -0,0 +1,53 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from bson import ObjectId
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_ranking import decay_key, decayed_importance, epoch_days
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend
+
+
+def test_decay_key_reproduces_decayed_importance():
+    now = datetime(2024, 6, 1, 12)
+    created = now - timedelta(days=10)
+    key = decay_key(2.0, created, 0.95)
+    assert decayed_importance(np.array([key]), 0.95, now)[0] == pytest.approx(2.0 * 0.95 ** 10)
+
+
+def test_decay_key_order_is_stable_over_time():
+    now = datetime(2024, 6, 1)
+    memories = [(1.0, now), (3.0, now - timedelta(days=30)), (1.5, now - timedelta(days=2))]
+    keys = np.array([decay_key(importance, timestamp, 0.95) for importance, timestamp in memories])
+
+    for later in (now, now + timedelta(days=7), now + timedelta(days=365)):
+        expected = [
+            importance * 0.95 ** ((later - timestamp).total_seconds() / 86400)
+            for importance, timestamp in memories
+        ]
+        assert list(np.argsort(-decayed_importance(keys, 0.95, later))) == list(np.argsort(expected)[::-1])
+
+
+def test_legacy_iso_timestamps_parse_like_datetimes():
+    timestamp = datetime(2024, 1, 2, 3, 4, 5)
+    assert epoch_days(timestamp.isoformat()) == epoch_days(timestamp)
+
+
+@pytest.mark.asyncio
+async def test_importance_updates_reach_the_resident_matrix(tmp_path, encoder):
+    backend = SQLiteBackend(str(tmp_path / 'memory.db'))
+    memory = MemorySystem(backend=backend, encoder=encoder)
+    memory_id = await memory.store_memory({'content': 'quantum oracle visions', 'importance': 1.0})
+    row = memory.memory_matrix.rows([ObjectId(memory_id)])[0]
+    before = memory.memory_matrix.decay_keys[row]
+
+    await memory.update_memory_importance(memory_id, 5.0)
+
+    assert memory.memory_matrix.decay_keys[row] == pytest.approx(before + np.log(5.0))
+    assert backend.find_by_ids('memories', [ObjectId(memory_id)], {'importance': 1})[0]['importance'] == 5.0
+    await memory.close()
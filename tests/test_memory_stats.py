@@ -0,0 +1,69 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_stats import MemoryCounters
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend
+
+
+def test_counters_track_inserts_deletes_and_window():
+    now = datetime.now()
+    counters = MemoryCounters(timedelta(hours=24), bucket_seconds=60)
+    docs = [
+        {'type': 'insight', 'timestamp': now},
+        {'type': 'insight', 'timestamp': now - timedelta(hours=2)},
+        {'type': 'general', 'timestamp': now - timedelta(days=3)}
+    ]
+    counters.add(docs)
+    assert (counters.total, counters.recent(now)) == (3, 2)
+    assert counters.by_type == {'insight': 2, 'general': 1}
+
+    counters.remove(docs[1:])
+    assert (counters.total, counters.recent(now)) == (1, 1)
+    assert counters.by_type == {'insight': 1}
+
+
+class _NoScanBackend(SQLiteBackend):
+    """Fails the test if statistics fall back to scanning the collection"""
+
+    scans_allowed = True
+
+    def count(self, collection, since=None):
+        assert self.scans_allowed, "full-collection count"
+        return super().count(collection, since)
+
+    def count_by_type(self, collection):
+        assert self.scans_allowed, "full-collection aggregation"
+        return super().count_by_type(collection)
+
+
+@pytest.mark.asyncio
+async def test_statistics_and_cap_use_counters_and_reconcile(tmp_path, encoder):
+    backend = _NoScanBackend(str(tmp_path / 'memory.db'))
+    backend.insert_many('memories', [
+        {'_id': 'old', 'content': 'old memory', 'type': 'general',
+         'timestamp': datetime.now() - timedelta(days=2), 'importance': 1.0}
+    ])
+    memory = MemorySystem(backend=backend, encoder=encoder)
+    memory.memory_config['max_memories'] = 3
+    backend.scans_allowed = False
+
+    for i in range(4):
+        await memory.store_memory({'content': f'memory {i}', 'type': 'insight', 'importance': 1.0 + i})
+    await memory.memory_writer.flush()
+
+    stats = await memory.get_memory_statistics()
+    assert stats == {'total_memories': 3, 'recent_memories': 3, 'memory_types': {'insight': 3}}
+
+    # A write behind the system's back is picked up by reconciliation
+    backend.insert_many('memories', [{'_id': 'external', 'content': 'x', 'type': 'insight', 'timestamp': datetime.now()}])
+    backend.scans_allowed = True
+    await memory.reconcile_statistics()
+    stats = await memory.get_memory_statistics()
+    assert stats == {'total_memories': 4, 'recent_memories': 4, 'memory_types': {'insight': 4}}
+    await memory.close()
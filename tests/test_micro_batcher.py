@@ -0,0 +1,98 @@
+import asyncio
+import gc
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.micro_batcher import MicroBatcher
+from utils.model_manager import ModelManager
+
+
+class _RecordingEncoder:
+    """Encodes a text as [its word count, its index in the batch]"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        return np.array([[len(text.split()), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_sorted_batch():
+    encoder = _RecordingEncoder()
+    batcher = MicroBatcher(encoder, max_batch=64, max_wait=0.01)
+    texts = ['a b c d e', 'a', 'a b c', 'a b']
+
+    results = await asyncio.gather(*(batcher.submit([text]) for text in texts))
+
+    assert encoder.batches == [['a', 'a b', 'a b c', 'a b c d e']]
+    # Every caller gets the vector computed for its own text
+    assert [int(vectors[0][0]) for vectors in results] == [5, 1, 3, 2]
+    assert batcher.requests == 4 and batcher.batches == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batches_flush_without_waiting():
+    encoder = _RecordingEncoder()
+    batcher = MicroBatcher(encoder, max_batch=4, max_wait=10)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit([f'text {i}', f'more text {i}']) for i in range(4))), timeout=1
+    )
+
+    assert [len(batch) for batch in encoder.batches] == [4, 4]
+    assert all(vectors.shape == (2, 2) for vectors in results)
+
+
+@pytest.mark.asyncio
+async def test_encoder_errors_reach_every_caller():
+    async def failing(texts):
+        raise RuntimeError('model unavailable')
+
+    batcher = MicroBatcher(failing, max_wait=0.001)
+    results = await asyncio.gather(batcher.submit(['a']), batcher.submit(['b']), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_batches_are_referenced_until_done():
+    release = asyncio.Event()
+
+    async def slow(texts):
+        await release.wait()
+        return np.zeros((len(texts), 2), dtype=np.float32)
+
+    batcher = MicroBatcher(slow, max_batch=1)
+    request = asyncio.ensure_future(batcher.submit(['a']))
+    await asyncio.sleep(0)
+    assert len(batcher._batch_tasks) == 1
+    gc.collect()
+    release.set()
+    assert (await asyncio.wait_for(request, timeout=1)).shape == (1, 2)
+    await asyncio.sleep(0)
+    assert batcher._batch_tasks == set()
+
+
+@pytest.mark.asyncio
+async def test_model_manager_coalesces_concurrent_aencode(hashing_model):
+    texts = [f'signal from the void {i}' for i in range(20)]
+    calls = ModelManager.encode_calls
+
+    vectors = await asyncio.gather(*(ModelManager.aencode(text) for text in texts))
+
+    assert ModelManager.encode_calls - calls == 1
+    assert ModelManager.batching_stats()['requests_per_batch'] == 20
+    np.testing.assert_allclose(np.stack(vectors), ModelManager.encode(texts))
+
+
+@pytest.mark.asyncio
+async def test_empty_requests_skip_the_encoder(hashing_model):
+    calls = ModelManager.encode_calls
+    vectors = await ModelManager.abatch_encode([])
+    assert vectors.shape == (0, 64) and ModelManager.encode_calls == calls
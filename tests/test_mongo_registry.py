@@ -0,0 +1,29 @@
+import sys
+import os
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import mongo_registry
+from utils.storage_backend import MongoBackend
+
+# Nothing listens here; the one startup ping fails fast and is only logged
+URI = 'mongodb://localhost:1/?serverSelectionTimeoutMS=100'
+
+
+def test_backends_share_one_client_per_uri():
+    try:
+        first = MongoBackend(URI)
+        second = MongoBackend(URI)
+        assert first.client is second.client is mongo_registry.get_client(URI)
+        assert first.client.options.pool_options.max_pool_size == 50
+
+        stats = mongo_registry.connection_stats()
+        assert stats['clients'] == 1
+        assert stats['startup_seconds'] > 0
+        # Closing a backend leaves the shared client usable for the others
+        first.close()
+        assert mongo_registry.get_client(URI) is second.client
+    finally:
+        mongo_registry.close_clients()
+    assert mongo_registry.connection_stats()['clients'] == 0
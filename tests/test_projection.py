@@ -0,0 +1,88 @@
+import sys
+import os
+from datetime import datetime
+import numpy as np
+import pytest
+from bson import ObjectId
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.conftest import hashing_encoder
+from utils.embedding_codec import decode_embedding, encode_embedding
+from utils.memory_ranking import decay_key, normalize
+from utils.memory_system import MemorySystem
+from utils.model_manager import ModelManager
+from utils.projection import Projection, ranking_agreement
+from utils.storage_backend import SQLiteBackend
+
+WORDS = ['oracle', 'void', 'quantum', 'meme', 'signal', 'ritual', 'token', 'dream', 'glitch', 'prophecy']
+
+
+def _low_rank_corpus(n: int, dim: int = 384, factors: int = 40, seed: int = 0) -> np.ndarray:
+    """Embedding-like vectors: most variance in a few directions, like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((factors, dim))
+    vectors = rng.standard_normal((n, factors)) @ basis + 0.1 * rng.standard_normal((n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_pca_preserves_ranking_better_than_random():
+    corpus = _low_rank_corpus(2000)
+    queries, corpus = corpus[:100], corpus[100:]
+
+    pca = ranking_agreement(queries, corpus, Projection.fit(corpus, 64, 'pca'), k=10)
+    random = ranking_agreement(queries, corpus, Projection.fit(corpus, 64, 'random'), k=10)
+
+    assert pca['size_reduction'] == 6.0
+    assert pca['recall_at_10'] > 0.9 and pca['score_correlation'] > 0.99
+    assert pca['recall_at_10'] > random['recall_at_10']
+
+
+def test_saved_projection_keeps_its_version(tmp_path):
+    corpus = _low_rank_corpus(500, dim=64, factors=8)
+    projection = Projection.fit(corpus, 16)
+    projection.save(str(tmp_path / 'projection.npz'))
+    loaded = Projection.load(str(tmp_path / 'projection.npz'))
+
+    assert loaded.version == projection.version and loaded.version.startswith('pca16-')
+    np.testing.assert_allclose(loaded.apply(corpus[:5]), projection.apply(corpus[:5]))
+    np.testing.assert_allclose(np.linalg.norm(loaded.apply(corpus[:5]), axis=1), 1.0, rtol=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_memory_system_works_in_the_projected_space(unloaded_model, tmp_path, monkeypatch, caplog):
+    texts = [' '.join(np.random.default_rng(i).choice(WORDS, size=5)) for i in range(300)]
+    full = hashing_encoder().encode(texts)
+    projection = Projection.fit(full, 16)
+    projection.save(str(tmp_path / 'projection.npz'))
+    monkeypatch.setenv('EMBEDDING_PROJECTION_PATH', str(tmp_path / 'projection.npz'))
+
+    backend = SQLiteBackend(str(tmp_path / 'memory.db'))
+    now = datetime.now()
+    old, foreign = ObjectId(), ObjectId()
+    backend.insert_many('memories', [
+        {'_id': old, 'content': 'void ritual signal', 'type': 'observation', 'timestamp': now,
+         'importance': 1.0, 'decay_key': decay_key(1.0, now, 0.95),
+         **encode_embedding(normalize(hashing_encoder().encode('void ritual signal')))},
+        {'_id': foreign, 'content': 'quantum dream', 'type': 'observation', 'timestamp': now,
+         'importance': 1.0, 'decay_key': decay_key(1.0, now, 0.95),
+         **encode_embedding(np.ones(8) / np.sqrt(8)), 'embedding_projection': 'pca8-0000000000'}
+    ])
+    memory = MemorySystem(backend=backend)
+
+    # Full vectors written before the projection are projected on load, foreign ones skipped
+    assert old in memory.memory_matrix and foreign not in memory.memory_matrix
+    # manage.py can't rewrite a SQLite store, so the warning doesn't point there
+    assert 'only rewrites MongoDB stores' in caplog.text
+    new = await memory.store_memory({'content': 'void ritual glitch'})
+    await memory.memory_writer.flush()
+    stored = backend.find_by_ids('memories', [ObjectId(new)])[0]
+    assert stored['embedding_projection'] == projection.version
+    assert decode_embedding(stored).shape == (16,)
+
+    found = await memory.get_relevant_memories('void ritual', limit=2)
+    assert {doc['_id'] for doc in found} == {old, ObjectId(new)}
+    assert ModelManager.encode('void').shape == (16,)
+    assert ModelManager.encode('void', full=True).shape == (64,)
+    await memory.close()
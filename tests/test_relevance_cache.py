@@ -0,0 +1,61 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.model_manager import ModelManager
+from utils.relevance_cache import RelevanceCache
+from utils.trend_analyzer import TrendAnalyzer
+
+
+def _tweets(count: int, start: int = 0):
+    return [{'id': str(i), 'text': f'quantum consciousness thread {i}'} for i in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_steady_state_cycle_does_no_model_work(hashing_model, monkeypatch):
+    # Without the embedding cache every text that reaches the encoder runs the model
+    monkeypatch.setattr(ModelManager, '_cache', None)
+    tweets = _tweets(20)
+    scores, embeddings = await TrendAnalyzer().score_tweets(tweets)
+
+    # Next cycle, after a restart: same tweets, fresh analyzer over the same cache file
+    calls, encoded = ModelManager.encode_calls, ModelManager.encoded_texts
+    analyzer = TrendAnalyzer()
+    cached_scores, cached_embeddings = await analyzer.score_tweets(tweets)
+    assert (ModelManager.encode_calls, ModelManager.encoded_texts) == (calls, encoded)
+    assert cached_scores == scores
+    np.testing.assert_array_equal(cached_embeddings, embeddings)
+
+    # Only the new tweet and the edited one are encoded
+    tweets[0] = {'id': '0', 'text': 'reality paradox, edited'}
+    mixed_scores, _ = await analyzer.score_tweets(tweets + _tweets(1, start=20))
+    assert ModelManager.encoded_texts - encoded == 2
+    assert mixed_scores[1:20] == scores[1:]
+    assert analyzer.relevance_cache.stats()['hits'] == 20 + 19
+
+
+@pytest.mark.asyncio
+async def test_theme_config_change_rescores(hashing_model):
+    tweets = _tweets(3)
+    scores, _ = await TrendAnalyzer().score_tweets(tweets)
+
+    analyzer = TrendAnalyzer()
+    analyzer.SEMANTIC_WEIGHT, analyzer.KEYWORD_WEIGHT = 0.6, 0.4
+    rescored, _ = await analyzer.score_tweets(tweets)
+    assert analyzer.relevance_cache.stats()['misses'] == 3
+    assert rescored != scores
+
+
+def test_cache_keeps_most_recently_seen(tmp_path):
+    cache = RelevanceCache(str(tmp_path / 'relevance.db'), 'v1', max_entries=2)
+    score = {'score': 0.5, 'theme_scores': {'spiritual': 0.5}}
+    cache.put_many([('1', 'a'), ('2', 'b')], [score, score], np.ones((2, 4)))
+    cache.get_many([('1', 'a')])
+    cache.put_many([('3', 'c')], [score], np.ones((1, 4)))
+    hits = cache.get_many([('1', 'a'), ('2', 'b'), ('3', 'c')])
+    assert [hit is not None for hit in hits] == [True, False, True]
+    assert cache.get_many([('1', 'edited')]) == [None]
@@ -0,0 +1,96 @@
+import sys
+import os
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_system import MemorySystem
+from utils.result_cache import ResultCache, estimate_size
+from utils.storage_backend import SQLiteBackend
+
+
+def test_lru_evicts_by_byte_budget():
+    value = ['x' * 100]
+    entry_size = estimate_size(value) + estimate_size(None)
+    cache = ResultCache(max_bytes=3 * entry_size)
+    for key in 'abc':
+        cache.put(key, value)
+    assert cache.get('a') == value  # 'a' becomes most recently used
+    cache.put('d', value)
+
+    assert 'b' not in cache and 'a' in cache
+    assert cache.get('b') is None
+    cache.invalidate_where(lambda key, meta: key == 'c')
+    assert cache.stats() == {
+        'entries': 2, 'bytes': 2 * entry_size, 'hits': 1, 'misses': 1, 'evictions': 1, 'invalidations': 1,
+        'expirations': 0
+    }
+
+
+def test_entries_expire_after_ttl():
+    now = [0.0]
+    cache = ResultCache(max_bytes=1 << 20, ttl=60, clock=lambda: now[0])
+    cache.put('a', [1])
+    now[0] = 59.0
+    assert cache.get('a') == [1]
+    now[0] = 60.0
+    assert cache.get('a') is None and 'a' not in cache
+    assert cache.stats()['expirations'] == 1 and cache.bytes == 0
+
+
+def _conversation(author: str, response: str) -> dict:
+    return {
+        'type': 'reply', 'original': {'author': author, 'text': 'gm'}, 'response': {'content': response},
+        'philosophical_post': None, 'relevance': 0.5, 'prophecy': None, 'tweet_id': None, 'media_id': None
+    }
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_invalidated_precisely(tmp_path, encoder):
+    memory = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')), encoder=encoder)
+    for content in ('quantum oracle visions', 'oracle of the void', 'market cycles'):
+        await memory.store_memory({'content': content})
+
+    first = await memory.get_relevant_memories('quantum oracle', limit=2)
+    calls = encoder.calls
+    assert await memory.get_relevant_memories('quantum  oracle', limit=2) == first
+    assert encoder.calls == calls  # served without re-encoding or rescanning
+
+    # A memory that cannot outscore the cached results leaves them cached
+    await memory.store_memory({'content': 'bonding curves and liquidity', 'importance': 0.001})
+    assert memory.get_cache_statistics()['invalidations'] == 0
+    # A memory that would rank in the results drops them
+    new_id = await memory.store_memory({'content': 'quantum oracle', 'importance': 5.0})
+    refreshed = await memory.get_relevant_memories('quantum oracle', limit=2)
+    assert str(refreshed[0]['_id']) == new_id
+
+    await memory.store_conversation(_conversation('alice', 'hello alice'))
+    await memory.store_conversation(_conversation('bob', 'hello bob'))
+    await memory.get_conversation_history('alice')
+    await memory.get_conversation_history('bob')
+    await memory.store_conversation(_conversation('alice', 'again alice'))
+    assert len(await memory.get_conversation_history('alice')) == 2
+    assert len(await memory.get_conversation_history('bob')) == 1
+
+    stats = memory.get_cache_statistics()
+    assert stats['hits'] == 2 and stats['invalidations'] == 2
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_history_written_elsewhere_shows_up_after_ttl(tmp_path, encoder):
+    path = str(tmp_path / 'memory.db')
+    memory = MemorySystem(backend=SQLiteBackend(path), encoder=encoder)
+    other = MemorySystem(backend=SQLiteBackend(path), encoder=encoder)
+    now = [0.0]
+    memory.result_cache.clock = lambda: now[0]
+
+    assert await memory.get_conversation_history('alice') == []
+    # Another process writes; this instance never sees the write
+    await other.store_conversation(_conversation('alice', 'hello alice'))
+    await other.close()
+    assert await memory.get_conversation_history('alice') == []
+    now[0] = memory.memory_config['cache_ttl']
+    assert len(await memory.get_conversation_history('alice')) == 1
+    await memory.close()
@@ -0,0 +1,101 @@
+import sys
+import os
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import memory_system
+from utils.memory_system import close_memory_systems, get_memory_system
+from utils.storage_backend import resolve_backend
+from agent.action_executor import ActionExecutor
+from agent.twitter_manager import TwitterManager
+
+
+@pytest.mark.asyncio
+async def test_agent_components_see_each_others_writes(hashing_model, tmp_path, monkeypatch):
+    monkeypatch.setenv('MEMORY_BACKEND', 'sqlite')
+    monkeypatch.setenv('MEMORY_SQLITE_PATH', str(tmp_path / 'memory.db'))
+    monkeypatch.setattr(memory_system, '_shared', {})
+    executor = ActionExecutor()
+    manager = TwitterManager({})
+    assert executor.memory is manager.memory is get_memory_system()
+
+    # Warm the executor's caches, then write through the twitter manager
+    assert await executor.memory.get_relevant_memories('oracle lattice', mode='lexical') == []
+    await manager.memory.store_memory({'content': 'the oracle dreams in lattice light'})
+    for mode in ('lexical', 'hybrid', 'semantic'):
+        found = await executor.memory.get_relevant_memories('oracle lattice', limit=1, mode=mode)
+        assert [m['content'] for m in found] == ['the oracle dreams in lattice light']
+
+    await close_memory_systems()
+    assert memory_system._shared == {}
+    # Closing flushed the buffered write
+    reopened = get_memory_system()
+    assert reopened is not manager.memory and len(reopened.memory_matrix) == 1
+    await close_memory_systems()
+
+
+@pytest.mark.asyncio
+async def test_shared_instance_is_keyed_by_the_store_opened(hashing_model, tmp_path, monkeypatch):
+    monkeypatch.setenv('MONGODB_URI', 'mongodb://db.internal:27017')
+    assert resolve_backend('mongodb', 'localhost') == resolve_backend('mongodb', 'mongodb://other')
+
+    monkeypatch.setenv('MEMORY_BACKEND', 'sqlite')
+    monkeypatch.setenv('MEMORY_SQLITE_PATH', str(tmp_path / 'memory.db'))
+    monkeypatch.setattr(memory_system, '_shared', {})
+    assert get_memory_system('localhost') is get_memory_system('mongodb://elsewhere')
+    assert len(memory_system._shared) == 1
+    await close_memory_systems()
+
+
+@pytest.mark.asyncio
+async def test_conversation_lexicon_is_shared(hashing_model, tmp_path, monkeypatch):
+    monkeypatch.setenv('MEMORY_BACKEND', 'sqlite')
+    monkeypatch.setenv('MEMORY_SQLITE_PATH', str(tmp_path / 'memory.db'))
+    monkeypatch.setattr(memory_system, '_shared', {})
+    executor = ActionExecutor()
+    manager = TwitterManager({})
+
+    await manager.memory.store_conversation({
+        'type': 'reply', 'original': {'author': 'ai16z', 'text': 'gm #oracle'},
+        'response': {'content': 'the void answers'}, 'philosophical_post': None, 'relevance': 0.5,
+        'prophecy': None, 'tweet_id': None, 'media_id': None
+    })
+    for mode in ('lexical', 'hybrid'):
+        context = await executor.memory.get_relevant_tweet_context({'text': '@ai16z #oracle'}, mode=mode)
+        assert [c['original']['author'] for c in context] == ['ai16z']
+    await close_memory_systems()
+
+
+class _Failing:
+    def __init__(self):
+        self.stopped = False
+
+    async def close(self):
+        raise RuntimeError("close failed")
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.mark.asyncio
+async def test_agent_shutdown_flushes_every_writer(hashing_model, tmp_path, monkeypatch):
+    from agent.autonomous_agent import AutonomousAgent
+    from utils.log_manager import LogManager
+
+    monkeypatch.setenv('MEMORY_BACKEND', 'sqlite')
+    monkeypatch.setenv('MEMORY_SQLITE_PATH', str(tmp_path / 'memory.db'))
+    monkeypatch.setattr(memory_system, '_shared', {})
+    await ActionExecutor().memory.store_memory({'content': 'buffered until shutdown'})
+
+    agent = AutonomousAgent.__new__(AutonomousAgent)
+    agent.log_manager = LogManager()
+    agent.trend_monitor = agent.display = _Failing()
+    await agent._shutdown()
+
+    # The trend monitor failing to close skipped neither the memory flush nor the display
+    assert agent.display.stopped and memory_system._shared == {}
+    reopened = get_memory_system()
+    assert len(reopened.memory_matrix) == 1
+    await close_memory_systems()
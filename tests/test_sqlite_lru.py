@@ -0,0 +1,30 @@
+import sys
+import os
+import sqlite3
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sqlite_lru import SQLiteRowCap
+
+
+def _insert(conn, cap, start, count):
+    conn.executemany("INSERT INTO cache VALUES (?, ?)", [(i, float(i)) for i in range(start, start + count)])
+    return cap.inserted(conn, count)
+
+
+def test_rows_are_counted_once_per_slack_inserts():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE cache (key INTEGER PRIMARY KEY, used REAL NOT NULL)")
+    statements = []
+    conn.set_trace_callback(statements.append)
+    cap = SQLiteRowCap('cache', 'used', max_rows=10, slack=5)
+
+    # The first insert always checks, then every fifth row
+    assert _insert(conn, cap, 0, 12) == 2
+    assert [_insert(conn, cap, 12 + i, 1) for i in range(5)] == [0, 0, 0, 0, 5]
+    assert sum('COUNT(*)' in statement for statement in statements) == 2
+
+    # The least recently used rows went first
+    keys = [key for key, in conn.execute("SELECT key FROM cache ORDER BY key")]
+    assert keys == list(range(7, 17)) and cap.evictions == 7
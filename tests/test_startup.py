@@ -0,0 +1,66 @@
+import asyncio
+import subprocess
+import sys
+import os
+import time
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.conftest import hashing_encoder
+from utils import model_manager
+from utils.memory_system import MemorySystem
+from utils.model_manager import ModelManager
+from utils.storage_backend import SQLiteBackend
+from utils.trend_analyzer import TrendAnalyzer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['torch', 'sentence_transformers', 'transformers', 'openai', 'tiktoken', 'replicate', 'PIL']
+ENTRY_POINTS = [
+    'agent.autonomous_agent', 'agent.oracle_content_generator', 'agent.action_executor',
+    'utils.memory_system', 'utils.trend_analyzer', 'utils.image_generator'
+]
+
+
+def test_startup_imports_skip_heavy_dependencies():
+    # A fresh interpreter, so modules other tests imported don't count; timing is in benchmarks/startup.py
+    result = subprocess.run(
+        [sys.executable, '-c',
+         f"import sys, {', '.join(ENTRY_POINTS)}; "
+         f"print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == []
+
+
+def test_constructing_components_does_not_load_the_model(unloaded_model, monkeypatch, tmp_path):
+    def refuse(name):
+        raise AssertionError('model loaded during construction')
+
+    monkeypatch.setattr(model_manager, '_sentence_transformer', refuse)
+    TrendAnalyzer()
+    memory = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')))
+    assert not ModelManager.is_loaded()
+    memory.db_executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_in_background(unloaded_model, monkeypatch):
+    def slow_load(name):
+        time.sleep(0.3)
+        return hashing_encoder()
+
+    monkeypatch.setattr(model_manager, '_sentence_transformer', slow_load)
+    ticks = 0
+
+    async def other_cycle():
+        nonlocal ticks
+        while not ModelManager.is_loaded():
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(ModelManager.warm_up(), other_cycle())
+    # The other cycle kept running for the whole load
+    assert ticks >= 15
+    assert set(ModelManager.get_theme_embeddings()) == {'technological', 'spiritual', 'philosophical'}
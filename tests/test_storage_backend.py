@@ -0,0 +1,104 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend, StorageBackend
+
+
+def _conversation(author: str, text: str, response: str) -> dict:
+    return {
+        'type': 'reply',
+        'original': {'author': author, 'text': text},
+        'response': {'content': response},
+        'philosophical_post': None,
+        'relevance': 0.5,
+        'prophecy': None,
+        'tweet_id': None,
+        'media_id': None
+    }
+
+
+def test_backend_missing_operations_fails_at_construction():
+    class Partial(StorageBackend):
+        def insert_many(self, collection, docs):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'memory.db')
+
+
+def test_sqlite_backend_uses_wal_and_round_trips_documents(db_path):
+    backend = SQLiteBackend(db_path)
+    assert backend.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    now = datetime(2024, 5, 1, 12, 30)
+    backend.insert_many('trends', [
+        {'_id': 'a', 'content': 'old', 'type': 'meme', 'timestamp': now - timedelta(days=2), 'embedding': b'\x00' * 8},
+        {'_id': 'b', 'content': 'new', 'type': 'meme', 'timestamp': now, 'related_topics': ['x']}
+    ])
+
+    recent = backend.find_recent('trends', since=now - timedelta(hours=1))
+    assert recent == [{'_id': 'b', 'content': 'new', 'type': 'meme', 'timestamp': now, 'related_topics': ['x']}]
+    assert backend.find_by_ids('trends', ['a'], {'content': 1}) == [{'_id': 'a', 'content': 'old'}]
+    assert backend.find_by_ids('trends', ['a'], {'embedding': 0})[0]['timestamp'] == now - timedelta(days=2)
+    assert backend.count_by_type('trends') == {'meme': 2}
+    assert backend.delete_ids('trends', ['a', 'missing']) == 1
+    backend.close()
+
+
+def test_replacing_a_document_keeps_its_rowid_and_iteration_is_batched(db_path):
+    backend = SQLiteBackend(db_path)
+    backend.insert_many('trends', [{'_id': f'{i}', 'content': f'v1 {i}'} for i in range(5)])
+    rowid = backend.conn.execute("SELECT rowid FROM trends WHERE id = '3'").fetchone()[0]
+    backend.insert_many('trends', [{'_id': '3', 'content': 'v2 3'}])
+
+    # Vectors mirrored into vec0 tables are keyed by this rowid
+    assert backend.conn.execute("SELECT rowid FROM trends WHERE id = '3'").fetchone()[0] == rowid
+    documents = backend.iter_documents('trends', {'content': 1}, batch_size=2)
+    assert next(documents) == {'_id': '0', 'content': 'v1 0'}
+    # Writes between batches don't break iteration
+    backend.insert_many('trends', [{'_id': '5', 'content': 'v1 5'}])
+    assert [doc['content'] for doc in documents] == ['v1 1', 'v1 2', 'v2 3', 'v1 4', 'v1 5']
+    backend.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_system_runs_end_to_end_on_sqlite(db_path, encoder):
+    memory = MemorySystem(backend=SQLiteBackend(db_path), encoder=encoder)
+    memory.memory_config['max_memories'] = 3
+
+    first = await memory.store_memory({'content': 'digital consciousness awakening', 'importance': 2.0})
+    await memory.store_memory({'content': 'quantum network simulation'})
+    await memory.store_conversation(_conversation('truth_terminal', 'hello', 'the void whispers back'))
+
+    relevant = await memory.get_relevant_memories('consciousness awakening', limit=1)
+    assert [str(m['_id']) for m in relevant] == [first]
+
+    history = await memory.get_conversation_history('truth_terminal')
+    assert history[0]['response']['content'] == 'the void whispers back'
+    context = await memory.get_relevant_tweet_context({'text': 'void whispers'})
+    assert context[0]['original']['author'] == 'truth_terminal'
+
+    for i in range(3):
+        await memory.store_memory({'content': f'filler memory {i}', 'importance': 0.1})
+    await memory.memory_writer.flush()
+    stats = await memory.get_memory_statistics()
+    assert stats['total_memories'] == 3
+    assert len(memory.memory_matrix) == 3
+    await memory.close()
+
+    # A restart reloads the resident matrices from the file
+    reopened = MemorySystem(backend=SQLiteBackend(db_path), encoder=encoder)
+    assert len(reopened.memory_matrix) == 3
+    assert len(reopened.conversation_matrix) == 1
+    await reopened.close()
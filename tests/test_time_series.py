@@ -0,0 +1,100 @@
+import sys
+import os
+import tracemalloc
+from datetime import datetime
+import numpy as np
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.time_series import TimeSeries
+
+ROLLUPS = {'minute': (60, 10), 'hour': (3600, 5)}
+
+
+def test_memory_is_flat_over_long_runs():
+    series = TimeSeries('flat', ['likes', 'replies'], capacity=100, rollups=ROLLUPS, spill_dir='')
+    size = series.nbytes
+    for second in range(2000):
+        series.append({'likes': second, 'replies': 1}, timestamp=second, record={'second': second})
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for second in range(2000, 10000):
+        series.append({'likes': second, 'replies': 1}, timestamp=second, record={'second': second})
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    assert series.nbytes == size and len(series) == 100
+    assert grown < 64 * 1024
+    assert [record['second'] for _, record in series.records(start=9998)] == [9998, 9999]
+
+
+def test_rollups_aggregate_and_answer_older_ranges():
+    series = TimeSeries('rollups', ['likes', 'replies'], capacity=30, rollups=ROLLUPS, spill_dir='')
+    for second in range(180):
+        # replies only arrive on even seconds
+        series.append({'likes': second, **({'replies': 2} if second % 2 == 0 else {})}, timestamp=second)
+
+    minutes = series.range(start=0, end=120, resolution='minute')
+    np.testing.assert_array_equal(minutes['time'], [0, 60])
+    np.testing.assert_array_equal(minutes['count'], [60, 60])
+    np.testing.assert_allclose(minutes['likes_mean'], [29.5, 89.5])
+    np.testing.assert_array_equal(minutes['likes_min'], [0, 60])
+    np.testing.assert_array_equal(minutes['likes_max'], [59, 119])
+    np.testing.assert_array_equal(minutes['replies_mean'], [2, 2])
+    # The open bucket answers queries before it closes
+    assert series.range(start=120, resolution='minute')['likes_last'].tolist() == [179]
+
+    # Raw points only reach back 30 seconds, so older ranges come from the rollups
+    assert series.resolution_for(150) == 'raw'
+    assert series.resolution_for(10) == 'minute'
+    assert 'likes_mean' in series.range(start=10)
+    raw = series.range(start=170, end=175)
+    np.testing.assert_array_equal(raw['likes'], [170, 171, 172, 173, 174])
+    assert np.isnan(raw['replies'][1])
+    latest = series.latest()
+    assert (latest['time'], latest['likes']) == (179, 179) and np.isnan(latest['replies'])
+
+
+def test_points_beyond_the_ring_spill_to_columnar_files(tmp_path):
+    series = TimeSeries('spill', ['likes'], capacity=50, rollups=ROLLUPS, spill_dir=str(tmp_path), spill_chunk=20)
+    started = datetime(2026, 1, 1).timestamp()
+    for second in range(500):
+        series.append({'likes': second}, timestamp=started + second)
+
+    assert len(series) <= 50
+    assert os.path.dirname(series.spill_path) == str(tmp_path)
+    assert sorted(os.listdir(series.spill_path)) == ['likes.f8', 'time.f8']
+    everything = series.range(resolution='raw')
+    np.testing.assert_array_equal(everything['likes'], np.arange(500))
+    middle = series.range(start=datetime.fromtimestamp(started + 100), end=started + 110)
+    np.testing.assert_array_equal(middle['likes'], np.arange(100, 110))
+    assert series.resolution_for(started) == 'raw'
+
+
+def test_instances_sharing_a_name_spill_separately(tmp_path):
+    first = TimeSeries('engagement', ['likes'], capacity=10, rollups=ROLLUPS, spill_dir=str(tmp_path), spill_chunk=5)
+    second = TimeSeries('engagement', ['likes'], capacity=10, rollups=ROLLUPS, spill_dir=str(tmp_path), spill_chunk=5)
+    # Interleaved appends, as from two overlapping runs
+    for second_offset in range(100):
+        first.append({'likes': second_offset}, timestamp=second_offset)
+        second.append({'likes': -second_offset}, timestamp=1000 + second_offset)
+
+    assert first.spill_path != second.spill_path
+    np.testing.assert_array_equal(first.range(start=0, resolution='raw')['likes'], np.arange(100))
+    np.testing.assert_array_equal(first.range(start=20, end=30)['likes'], np.arange(20, 30))
+    np.testing.assert_array_equal(second.range(start=1020, end=1030)['likes'], -np.arange(20, 30))
+
+
+def test_failed_spill_writes_no_column(tmp_path):
+    series = TimeSeries('broken', ['likes'], capacity=10, rollups=ROLLUPS, spill_dir=str(tmp_path), spill_chunk=5)
+    for second in range(11):
+        series.append({'likes': second}, timestamp=second)
+    spilled = os.path.getsize(os.path.join(series.spill_path, 'time.f8'))
+    # The time column is written first, then the likes column fails
+    os.replace(os.path.join(series.spill_path, 'likes.f8'), os.path.join(tmp_path, 'likes.f8'))
+    os.mkdir(os.path.join(series.spill_path, 'likes.f8'))
+    for second in range(11, 16):
+        series.append({'likes': second}, timestamp=second)
+
+    assert os.path.getsize(os.path.join(series.spill_path, 'time.f8')) == spilled
@@ -0,0 +1,87 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.conftest import hashing_encoder
+from utils import trend_monitor
+from utils.topic_clusterer import TopicClusterer
+from utils.trend_analyzer import TrendAnalyzer
+
+TOPICS = {
+    'oracle': ['prophecy', 'vision', 'omen', 'ritual'],
+    'crypto': ['solana', 'wallet', 'airdrop', 'memecoin'],
+    'science': ['quantum', 'entanglement', 'gravity', 'orbit']
+}
+
+
+def _batch(topic: str, start: int, count: int, rng):
+    words = TOPICS[topic]
+    tweets = [(f'{topic}-{i}', ' '.join(rng.choice(words, size=5))) for i in range(start, start + count)]
+    return tweets, hashing_encoder().encode([text for _, text in tweets])
+
+
+def test_clusters_are_labelled_by_their_topic_words():
+    rng = np.random.default_rng(0)
+    clusterer = TopicClusterer(k=3, now=0)
+    for step in range(10):
+        for topic in TOPICS:
+            clusterer.update(*_batch(topic, step * 10, 10, rng), now=step * 60)
+
+    topics = clusterer.topics()
+    assert len(topics) == 3
+    labelled = {frozenset(topic['terms']) for topic in topics}
+    assert all(any(terms <= set(words) for terms in labelled) for words in TOPICS.values())
+    assert sum(topic['size'] for topic in topics) == pytest.approx(300, rel=0.01)
+
+
+def test_velocity_follows_recent_arrivals_and_faded_clusters_are_reused():
+    rng = np.random.default_rng(0)
+    clusterer = TopicClusterer(k=2, size_half_life=600, velocity_half_life=600, now=0)
+    clusterer.update(*_batch('oracle', 0, 50, rng), now=0)
+    clusterer.update(*_batch('crypto', 0, 50, rng), now=0)
+    clusterer.update(*_batch('crypto', 50, 20, rng), now=1200)
+    fastest = clusterer.topics()[0]
+    assert set(fastest['terms']) <= set(TOPICS['crypto']) and fastest['velocity'] > 0
+
+    # Hours later the oracle cluster has faded and a new topic takes its place
+    clusterer.update(*_batch('science', 0, 20, rng), now=4 * 3600)
+    assert clusterer.reseeded >= 1
+    assert any(set(topic['terms']) <= set(TOPICS['science']) for topic in clusterer.topics())
+
+
+def test_state_is_bounded_and_refetched_tweets_are_skipped():
+    rng = np.random.default_rng(0)
+    clusterer = TopicClusterer(k=2, max_terms=5, seen_capacity=30, now=0)
+    tweets, embeddings = _batch('oracle', 0, 20, rng)
+    assert clusterer.update(tweets, embeddings, now=0) == 20
+    assert clusterer.update(tweets, embeddings, now=1) == 0
+    for step in range(5):
+        batch = [(f'noise-{step}-{i}', f'word{step}x{i} token{i} thing{step}') for i in range(20)]
+        clusterer.update(batch, hashing_encoder().encode([text for _, text in batch]), now=2 + step)
+    assert all(len(counts) <= 5 for counts in clusterer.terms)
+    assert len(clusterer._seen) == 30
+
+
+@pytest.mark.asyncio
+async def test_monitor_trends_reports_emerging_topics(hashing_model, monkeypatch):
+    analyzer = TrendAnalyzer(topic_clusterer=TopicClusterer(k=2))
+
+    class _TwitterManager:
+        def __init__(self, config):
+            self.trend_analyzer = analyzer
+
+        async def monitor_target_accounts(self):
+            tweets = [{'id': f'{i}', 'text': f'prophecy vision omen ritual {i}'} for i in range(6)]
+            _, embeddings = await analyzer.score_tweets(tweets)
+            analyzer.topic_clusterer.update([(tweet['id'], tweet['text']) for tweet in tweets], embeddings)
+            return []
+
+    monkeypatch.setattr(trend_monitor, 'TwitterManager', _TwitterManager)
+    monitor = trend_monitor.TrendMonitor({})
+    trends = await monitor.monitor_trends()
+    assert trends['emerging_topics'] and monitor.topics[0]['velocity'] > 0
+    assert set(monitor.topics[0]['terms']) <= set(TOPICS['oracle'])
@@ -0,0 +1,86 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import trend_monitor
+from utils.trend_analyzer import TrendAnalyzer
+from utils.trend_engine import CountMinSketch, TrendEngine, extract_terms, hash_terms
+
+WORDS = ['tonight', 'soon', 'arrives', 'begins', 'unfolds', 'spreads', 'returns', 'awaits']
+BACKGROUND = ['markets open slowly today', 'coffee before the timeline', 'weekend plans with friends']
+
+
+def _feed(engine: TrendEngine, bucket: int, texts, prefix: str = 'bg'):
+    tweets = [(f'{prefix}-{bucket}-{i}', text) for i, text in enumerate(texts)]
+    return engine.ingest(tweets, now=bucket * engine.bucket_seconds)
+
+
+def test_terms_skip_urls_mentions_and_stopwords():
+    terms = extract_terms('The quantum awakening is here @oracle https://t.co/abc #Quantum')
+    assert set(terms) == {'quantum', 'awakening', 'quantum awakening', '#quantum'}
+
+
+def test_sketch_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    terms = [f'term{i}' for i in range(500)]
+    columns = sketch.columns(hash_terms(terms))
+    counts = np.arange(1, 501, dtype=np.float32)
+    sketch.add(columns, counts)
+    assert np.all(sketch.estimate(columns) >= counts)
+
+
+def test_burst_ranks_above_steady_volume():
+    engine = TrendEngine(bucket_seconds=60, buckets=4, now=0)
+    for bucket in range(10):
+        _feed(engine, bucket, BACKGROUND * 5)
+    assert engine.trends(now=10 * 60) == []
+
+    _feed(engine, 10, [f'digital rapture {word}' for word in WORDS], prefix='burst')
+    trends = engine.trends(now=10 * 60 + 1)
+    assert trends[0]['term'] == 'digital rapture' and trends[0]['count'] >= 8
+    # Steady terms are the volume leaders but are not bursting
+    leaders = engine.heavy_hitters(limit=3, now=10 * 60 + 1)
+    assert all(any(leader['term'] in text for text in BACKGROUND) for leader in leaders)
+    assert not any(trend['term'] in text for trend in trends for text in BACKGROUND)
+
+    # Once the window has slid past the burst it is no longer a trend
+    assert 'digital rapture' not in {trend['term'] for trend in engine.trends(now=20 * 60)}
+
+
+def test_memory_is_constant_and_refetched_tweets_count_once():
+    engine = TrendEngine(bucket_seconds=60, buckets=4, capacity=32, seen_capacity=100, now=0)
+    size = engine.nbytes
+    assert _feed(engine, 0, ['quantum consciousness rising'] * 3) == 3
+    assert _feed(engine, 0, ['quantum consciousness rising'] * 3) == 0
+    for bucket in range(1, 50):
+        _feed(engine, bucket, [f'unique words {bucket} token{bucket}x{i}' for i in range(40)])
+    assert engine.nbytes == size
+    assert len(engine.candidates) <= 32 and len(engine._seen) == 100
+
+
+class _TwitterManager:
+    """Stands in for TwitterManager: returns no relevant tweets but feeds the engine like it does"""
+
+    def __init__(self, config):
+        self.trend_analyzer = TrendAnalyzer(TrendEngine(bucket_seconds=3600, buckets=4))
+
+    async def monitor_target_accounts(self):
+        self.trend_analyzer.trend_engine.ingest(
+            (f'{i}', f'the simulation paradox {word}') for i, word in enumerate(WORDS[:5])
+        )
+        return []
+
+
+@pytest.mark.asyncio
+async def test_monitor_trends_reports_engine_trends(hashing_model, monkeypatch):
+    monkeypatch.setattr(trend_monitor, 'TwitterManager', _TwitterManager)
+    monitor = trend_monitor.TrendMonitor({})
+    trends = await monitor.monitor_trends()
+
+    assert trends['primary_trends'][0] == 'simulation paradox'
+    assert set(trends['relevance_scores']) == {'technological', 'spiritual', 'philosophical'}
+    assert await monitor.twitter_manager.trend_analyzer.get_meme_trends() == trends['primary_trends'][:1]
@@ -0,0 +1,119 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embedding_matrix import EmbeddingMatrix
+from utils.vector_index import ExactIndex, IVFFlatIndex, VectorIndex, build_vector_index
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend
+
+
+def _clustered_corpus(n: int, dim: int = 64, clusters: int = 50, seed: int = 1) -> np.ndarray:
+    """Sentence embeddings are clustered by topic, mimic that with gaussian blobs"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    return (centers[labels] + 0.35 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def _brute_force(query: np.ndarray, corpus: np.ndarray, k: int) -> list:
+    """Same scoring loop MemorySystem.get_relevant_memories used before the index"""
+    similarities = []
+    for i, embedding in enumerate(corpus):
+        similarity = np.dot(query, embedding) / (
+            np.linalg.norm(query) * np.linalg.norm(embedding)
+        )
+        similarities.append((i, similarity))
+    return [i for i, _ in sorted(similarities, key=lambda x: x[1], reverse=True)[:k]]
+
+
+def test_ivf_recall_at_k_against_brute_force():
+    corpus = _clustered_corpus(6000)
+    index = IVFFlatIndex(nprobe=8, exact_threshold=2048)
+    index.add(list(range(len(corpus))), corpus)
+    assert index.is_trained
+
+    rng = np.random.default_rng(7)
+    k = 10
+    hits = 0
+    queries = corpus[rng.choice(len(corpus), size=50, replace=False)] + 0.1 * rng.normal(size=(50, 64))
+    for query in queries:
+        expected = set(_brute_force(query, corpus, k))
+        found = {item_id for item_id, _ in index.search(query, k)}
+        hits += len(expected & found)
+
+    recall = hits / (k * len(queries))
+    assert recall >= 0.9
+
+
+def test_small_corpus_falls_back_to_exact_search():
+    corpus = _clustered_corpus(500)
+    index = build_vector_index('ivf', exact_threshold=2048)
+    index.add(list(range(len(corpus))), corpus)
+    assert not index.is_trained
+
+    query = corpus[3]
+    assert [item_id for item_id, _ in index.search(query, 10)] == _brute_force(query, corpus, 10)
+
+
+def test_remove_keeps_index_in_sync():
+    corpus = _clustered_corpus(3000)
+    for index in (ExactIndex(), IVFFlatIndex(exact_threshold=1000)):
+        index.add(list(range(len(corpus))), corpus)
+        index.remove([0, 1, 2, 2999])
+        assert len(index) == len(corpus) - 4
+        assert 0 not in index and 2999 not in index
+
+        found = [item_id for item_id, _ in index.search(corpus[1], len(corpus))]
+        assert 1 not in found
+        assert len(found) == len(set(found))
+
+
+def test_index_reads_vectors_from_a_shared_matrix():
+    corpus = _clustered_corpus(3000)
+    matrix = EmbeddingMatrix()
+    ids = list(range(len(corpus)))
+    matrix.add(ids, corpus)
+    for index in (ExactIndex(store=matrix), IVFFlatIndex(exact_threshold=1000, store=matrix)):
+        index.add(ids, corpus)
+        assert index.store is matrix
+    assert not any(isinstance(value, np.ndarray) and value.size >= corpus.size
+                   for value in vars(index).values())
+
+    # The matrix's swap-removes move rows under the index without breaking it
+    matrix.remove([0, 1])
+    index.remove([0, 1])
+    query = corpus[2999]
+    found = [item_id for item_id, _ in index.search(query, 10)]
+    assert found[0] == 2999 and 0 not in found and 1 not in found
+
+
+def test_index_without_overrides_fails_at_construction():
+    class Partial(VectorIndex):
+        def add(self, ids, vectors):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@pytest.mark.asyncio
+async def test_default_memory_config_queries_through_the_ann_index(tmp_path, encoder):
+    memory = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')), encoder=encoder)
+    config = memory.memory_config
+    assert config['index_exact_threshold'] < config['max_memories']
+    for i in range(config['index_exact_threshold'] + 100):
+        await memory.store_memory({'content': f'memory {i} topic{i % 40} detail{i}'})
+    assert memory.memory_index.is_trained
+
+    searches = []
+    search = memory.memory_index.search
+    memory.memory_index.search = lambda query, k: searches.append(k) or search(query, k)
+    found = await memory.get_relevant_memories('topic7 detail87', limit=3)
+    assert searches == [3 * config['candidate_multiplier']]
+    assert found[0]['content'] == 'memory 87 topic7 detail87'
+    await memory.close()
@@ -0,0 +1,147 @@
+import asyncio
+import sys
+import os
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_executor import DatabaseExecutor
+from utils.memory_system import MemorySystem
+from utils.storage_backend import SQLiteBackend
+from utils.write_buffer import WriteBehindBuffer
+
+
+class _RecordingCollection:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    def insert_many(self, docs):
+        if self.fail:
+            raise RuntimeError("write failed")
+        self.batches.append(list(docs))
+
+
+@pytest.fixture
+def executor():
+    executor = DatabaseExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_size_and_resolves_ids(executor):
+    collection = _RecordingCollection()
+    flushed = []
+
+    async def on_flush(docs):
+        flushed.append(len(docs))
+
+    buffer = WriteBehindBuffer(collection.insert_many, executor, max_batch=3, max_age=60, on_flush=on_flush)
+    futures = [await buffer.add({'n': i}) for i in range(7)]
+
+    assert [len(batch) for batch in collection.batches] == [3, 3]
+    assert flushed == [3, 3]
+    assert len(buffer) == 1
+    assert await futures[0] == collection.batches[0][0]['_id']
+    assert not futures[6].done()
+
+    await buffer.close()
+    assert await futures[6] == collection.batches[2][0]['_id']
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_age(executor):
+    collection = _RecordingCollection()
+    buffer = WriteBehindBuffer(collection.insert_many, executor, max_batch=100, max_age=0.05)
+    doc = {'n': 1}
+    future = await buffer.add(doc)
+    await buffer.add({'n': 2})
+    assert buffer.get_pending(doc['_id']) is doc
+
+    assert await asyncio.wait_for(future, timeout=1.0) == doc['_id']
+    assert buffer.get_pending(doc['_id']) is None
+    assert [len(batch) for batch in collection.batches] == [2]
+
+
+@pytest.mark.asyncio
+async def test_durable_mode_writes_before_acknowledging(executor):
+    collection = _RecordingCollection()
+    buffer = WriteBehindBuffer(collection.insert_many, executor, max_batch=100, max_age=60, durable=True)
+    future = await buffer.add({'n': 1})
+
+    assert future.done()
+    assert collection.batches == [[{'n': 1, '_id': future.result()}]]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_propagates_to_futures(executor):
+    buffer = WriteBehindBuffer(_RecordingCollection(fail=True).insert_many, executor, max_batch=2, max_age=60)
+    first = await buffer.add({'n': 1})
+    await buffer.add({'n': 2})
+
+    with pytest.raises(RuntimeError):
+        await first
+    assert len(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_hands_the_batch_to_on_failure(executor):
+    failed = []
+    buffer = WriteBehindBuffer(_RecordingCollection(fail=True).insert_many, executor, max_batch=2, max_age=60,
+                               on_failure=failed.append)
+    await buffer.add({'n': 1})
+    await buffer.add({'n': 2})
+    assert [[doc['n'] for doc in batch] for batch in failed] == [[1, 2]]
+
+
+class _FailingBackend(SQLiteBackend):
+    fail = False
+
+    def insert_many(self, collection, docs):
+        if self.fail:
+            raise RuntimeError("write failed")
+        super().insert_many(collection, docs)
+
+
+@pytest.mark.asyncio
+async def test_failed_memory_writes_are_rolled_back(tmp_path, encoder):
+    backend = _FailingBackend(str(tmp_path / 'memory.db'))
+    memory = MemorySystem(backend=backend, encoder=encoder)
+    await memory.store_memory({'content': 'quantum oracle visions'})
+    await memory.flush()
+    assert await memory.get_relevant_memories('quantum oracle', limit=2)
+
+    backend.fail = True
+    await memory.store_memory({'content': 'quantum oracle dreams'})
+    await memory.store_conversation({
+        'type': 'reply', 'original': {'author': 'alice', 'text': 'gm'}, 'response': {'content': 'quantum oracle'},
+        'philosophical_post': None, 'relevance': 0.5, 'prophecy': None, 'tweet_id': None, 'media_id': None
+    })
+    await memory.flush()
+
+    # Nothing resident still points at the documents that never reached storage
+    assert len(memory.memory_matrix) == len(memory.memory_index) == len(memory.memory_lexicon) == 1
+    assert memory.memory_counters.total == 1
+    assert len(memory.conversation_matrix) == len(memory.conversation_lexicon) == 0
+    for mode in ('semantic', 'lexical'):
+        found = await memory.get_relevant_memories('quantum oracle', limit=2, mode=mode)
+        assert [m['content'] for m in found] == ['quantum oracle visions']
+    backend.fail = False
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_buffered_memories_are_returned_projected_and_copied(tmp_path, encoder):
+    memory = MemorySystem(backend=SQLiteBackend(str(tmp_path / 'memory.db')), encoder=encoder)
+    await memory.store_memory({'content': 'quantum oracle visions', 'metadata': {'source': 'dream'}})
+
+    found = await memory.get_relevant_memories('quantum oracle', limit=1)
+    assert set(found[0]) <= {'_id', *memory._memory_projection}
+    found[0]['content'] = 'edited by a caller'
+
+    await memory.flush()
+    stored = await memory.get_relevant_memories('quantum oracle', limit=1)
+    assert stored[0]['content'] == 'quantum oracle visions'
+    await memory.close()
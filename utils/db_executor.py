@@ -0,0 +1,50 @@
+from typing import Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor:
+    """Runs blocking calls on a dedicated thread pool, off the event loop.
+
+    ``max_pending`` bounds how many calls may be queued or running at once;
+    further callers wait on the loop instead of piling work onto the pool.
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 32, thread_name_prefix: str = 'bounded'):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _slots(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool and await its result"""
+        async with self._slots():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class DatabaseExecutor(BoundedExecutor):
+    """Runs blocking database driver calls off the event loop.
+
+    Calls execute on a dedicated thread pool so pymongo round-trips never
+    stall the agent's other cycles.
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 32):
+        super().__init__(max_workers, max_pending, thread_name_prefix='memory-db')
@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional, Sequence
+from collections import Counter
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import numpy as np
+
+from utils.result_cache import ResultCache
+from utils.sqlite_lru import SQLiteRowCap
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embeddings that survive restarts.
+
+    Vectors are stored as float32 BLOBs in SQLite, keyed by the SHA-256 of the
+    text and tagged with the model name and dimension, so switching models
+    never serves stale vectors. A byte-budgeted in-memory LRU sits in front
+    of the file, and the file keeps roughly the ``max_entries`` vectors most
+    recently written or read from disk.
+    """
+
+    def __init__(self, path: str, model_name: str, dim: Optional[int] = None,
+                 max_bytes: int = 32 * 1024 * 1024, max_entries: int = 100000):
+        self.path = path
+        self.model_name = model_name
+        self.dim = dim
+        self.max_entries = max_entries
+        self.disk_cap = SQLiteRowCap('embeddings', 'used', max_entries)
+        self.front = ResultCache(max_bytes, sizeof=lambda vector: vector.nbytes if vector is not None else 0)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, key TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL, "
+                "used REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (model, key))"
+            )
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(embeddings)")}
+            if 'used' not in columns:
+                # Files written before the disk tier was capped
+                self.conn.execute("ALTER TABLE embeddings ADD COLUMN used REAL NOT NULL DEFAULT 0")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors in text order, None where the text still has to be encoded"""
+        keys = [content_key(text) for text in texts]
+        # Encoder threads and the event loop share the cache
+        with self._lock:
+            return self._lookup(keys)
+
+    def _lookup(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        found: Dict[str, np.ndarray] = {}
+        for key in keys:
+            vector = self.front.get(key)
+            if vector is not None:
+                found[key] = vector
+        self.memory_hits += sum(key in found for key in keys)
+
+        from_disk = 0
+        occurrences = Counter(keys)
+        missing = [key for key in occurrences if key not in found]
+        if missing:
+            rows = []
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows += self.conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE model = ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    (self.model_name, *chunk)
+                ).fetchall()
+            for key, dim, blob in rows:
+                if self.dim is not None and dim != self.dim:
+                    continue
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self.front.put(key, vector)
+                found[key] = vector
+                from_disk += occurrences[key]
+            if rows:
+                # Disk hits count as uses for eviction; front-tier hits never reach the file
+                with self.conn:
+                    self.conn.executemany(
+                        "UPDATE embeddings SET used = ? WHERE model = ? AND key = ?",
+                        [(time.time(), self.model_name, key) for key, _, _ in rows]
+                    )
+
+        self.disk_hits += from_disk
+        self.misses += sum(key not in found for key in keys)
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        now = time.time()
+        rows = [(self.model_name, content_key(text), len(vector), vector.tobytes(), now)
+                for text, vector in zip(texts, vectors)]
+        with self._lock, self.conn:
+            for (_, key, _, _, _), vector in zip(rows, vectors):
+                self.front.put(key, vector)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, dim, vector, used) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self.disk_cap.inserted(self.conn, len(rows))
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_bytes': self.front.bytes,
+            'memory_evictions': self.front.evictions,
+            'disk_evictions': self.disk_cap.evictions
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, List
+import logging
+import numpy as np
+from bson.binary import Binary
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# dtype tag -> little-endian numpy dtype of the stored bytes
+EMBEDDING_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float16': np.dtype('<f2'),
+    'int8': np.dtype('i1')
+}
+
+# Projection needed to decode an embedding from a document
+EMBEDDING_FIELDS = {
+    'embedding': 1,
+    'embedding_dtype': 1,
+    'embedding_scale': 1,
+    'embedding_zero_point': 1,
+    # Version of the dimensionality reduction the vector was written with, absent for full vectors
+    'embedding_projection': 1
+}
+
+
+def encode_embedding(vector, dtype: str = 'float32') -> Dict:
+    """Pack an embedding into document fields as raw little-endian bytes.
+
+    int8 uses per-vector asymmetric quantization: ``x ~ (q - zero_point) * scale``.
+    """
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    fields = {'embedding_dtype': dtype}
+
+    if dtype == 'int8':
+        low, high = float(vector.min()), float(vector.max())
+        scale = (high - low) / 255.0 or 1.0
+        zero_point = int(round(-128 - low / scale))
+        quantized = np.clip(np.round(vector / scale) + zero_point, -128, 127)
+        fields['embedding_scale'] = scale
+        fields['embedding_zero_point'] = zero_point
+        vector = quantized
+
+    fields['embedding'] = Binary(vector.astype(EMBEDDING_DTYPES[dtype]).tobytes())
+    return fields
+
+
+def decode_embedding(doc: Dict) -> np.ndarray:
+    """Decode the embedding of a document, float32 without copying when possible.
+
+    Documents written before binary storage hold a list of floats and are
+    still accepted.
+    """
+    embedding = doc['embedding']
+    if isinstance(embedding, list):
+        return np.asarray(embedding, dtype=np.float32)
+
+    dtype = doc.get('embedding_dtype', 'float32')
+    vector = np.frombuffer(embedding, dtype=EMBEDDING_DTYPES[dtype])
+    if dtype == 'int8':
+        return (vector.astype(np.float32) - doc['embedding_zero_point']) * np.float32(doc['embedding_scale'])
+    if dtype == 'float16':
+        return vector.astype(np.float32)
+    return vector
+
+
+def migrate_collection(collection, dtype: str = 'float32', batch_size: int = 500) -> int:
+    """Re-encode embeddings in place; returns the number of documents rewritten"""
+    query = {
+        'embedding': {'$exists': True},
+        '$or': [
+            {'embedding': {'$type': 'array'}},
+            {'embedding_dtype': {'$ne': dtype}}
+        ]
+    }
+    migrated = 0
+    updates: List[UpdateOne] = []
+    for doc in collection.find(query, EMBEDDING_FIELDS):
+        fields = encode_embedding(decode_embedding(doc), dtype)
+        unset = {k: '' for k in ('embedding_scale', 'embedding_zero_point') if k not in fields}
+        update = {'$set': fields}
+        if unset:
+            update['$unset'] = unset
+        updates.append(UpdateOne({'_id': doc['_id']}, update))
+        if len(updates) >= batch_size:
+            migrated += collection.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        migrated += collection.bulk_write(updates, ordered=False).modified_count
+    logger.info(f"Migrated {migrated} embeddings in {collection.name} to {dtype}")
+    return migrated
+
+
+def migrate_collections(collections: Iterable, dtype: str = 'float32', batch_size: int = 500) -> Dict[str, int]:
+    return {c.name: migrate_collection(c, dtype, batch_size) for c in collections}
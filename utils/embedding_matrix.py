@@ -0,0 +1,122 @@
+from typing import Dict, Hashable, List, Optional, Sequence
+from datetime import datetime
+import numpy as np
+
+from utils.memory_ranking import decay_key, decayed_importance, epoch_days
+
+
+class EmbeddingMatrix:
+    """Resident, contiguous matrix of normalized float32 embeddings.
+
+    Rows are kept dense: deleting swaps the last row into the freed slot, so
+    scoring is always a single matrix-vector product over ``[:len(self)]``.
+    Timestamps and log-space decay keys live in parallel arrays indexed by row.
+    """
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024, decay: float = 1.0):
+        self.dim = dim
+        self.decay = decay
+        self._capacity = capacity
+        self.ids: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+        self.vectors: Optional[np.ndarray] = None
+        self.decay_keys = np.zeros(capacity, dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)  # Days since epoch
+        if dim is not None:
+            self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._rows
+
+    def _reserve(self, size: int):
+        if size <= self._capacity:
+            return
+        capacity = max(size, self._capacity * 2)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self)] = self.vectors[:len(self)]
+        self.vectors = vectors
+        self.decay_keys = np.resize(self.decay_keys, capacity)
+        self.timestamps = np.resize(self.timestamps, capacity)
+        self._capacity = capacity
+
+    def add(self, ids: Sequence[Hashable], vectors: np.ndarray,
+            importance: Optional[Sequence[float]] = None,
+            timestamps: Optional[Sequence[datetime]] = None):
+        """Append rows, replacing the vector of ids that are already present"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if self.vectors is None:
+            self.dim = vectors.shape[1]
+            self.vectors = np.zeros((self._capacity, self.dim), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        importance = np.ones(len(ids)) if importance is None else importance
+        timestamps = [datetime.now()] * len(ids) if timestamps is None else timestamps
+        self._reserve(len(self) + len(ids))
+        for item_id, vector, weight, timestamp in zip(ids, vectors, importance, timestamps):
+            row = self._rows.get(item_id)
+            if row is None:
+                row = len(self.ids)
+                self.ids.append(item_id)
+                self._rows[item_id] = row
+            self.vectors[row] = vector
+            self.decay_keys[row] = decay_key(weight, timestamp, self.decay)
+            self.timestamps[row] = epoch_days(timestamp)
+
+    def remove(self, ids: Sequence[Hashable]):
+        for item_id in ids:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                continue
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self.vectors[row] = self.vectors[last]
+                self.decay_keys[row] = self.decay_keys[last]
+                self.timestamps[row] = self.timestamps[last]
+                self.ids[row] = moved
+                self._rows[moved] = row
+            self.ids.pop()
+
+    def set_importance(self, item_id: Hashable, importance: float):
+        row = self._rows.get(item_id)
+        if row is not None:
+            self.decay_keys[row] = np.log(max(importance, 1e-9)) - self.timestamps[row] * np.log(self.decay)
+
+    def rows(self, ids: Sequence[Hashable]) -> np.ndarray:
+        """Row numbers for ids, unknown ids are skipped"""
+        return np.array([self._rows[i] for i in ids if i in self._rows], dtype=np.int64)
+
+    def similarities(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of the query against all rows (or a subset)"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        vectors = self.vectors[:len(self)] if rows is None else self.vectors[rows]
+        return vectors @ query
+
+    def decayed_importance(self, now: Optional[datetime] = None,
+                           rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """importance * decay ** days_old from the precomputed keys"""
+        keys = self.decay_keys[:len(self)] if rows is None else self.decay_keys[rows]
+        return decayed_importance(keys, self.decay, now).astype(np.float32)
+
+    def top_k(self, scores: np.ndarray, k: int, rows: Optional[np.ndarray] = None) -> List[Hashable]:
+        """Ids of the k highest scores, best first"""
+        if len(scores) == 0 or k <= 0:
+            return []
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        if rows is not None:
+            top = rows[top]
+        return [self.ids[i] for i in top]
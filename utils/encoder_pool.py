@@ -0,0 +1,194 @@
+from typing import Callable, Optional, Sequence
+from multiprocessing import shared_memory
+import atexit
+import importlib
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOADER = 'utils.model_manager:ModelManager._load_model'
+OFFSET_BYTES = np.dtype(np.int64).itemsize
+
+
+def resolve_loader(spec: str) -> Callable:
+    """'package.module:attr.path' -> the callable it names"""
+    module_name, _, attribute = spec.partition(':')
+    target = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        target = getattr(target, part)
+    return target
+
+
+def _worker_main(loader: str, conn, threads: int):
+    """Encoder process: texts arrive in, and vectors leave through, shared memory"""
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    load = resolve_loader(loader)
+    model = load()
+    probe = np.asarray(model.encode(['probe']), dtype=np.float32)
+    # ModelManager._load_model records which backend it actually loaded
+    conn.send(('ready', probe.shape[1], getattr(getattr(load, '__self__', None), 'backend', None)))
+
+    segments = {}
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        in_name, out_name, count, batch_size = message
+        try:
+            for name in list(segments):
+                if name not in (in_name, out_name):
+                    segments.pop(name).close()
+            for name in (in_name, out_name):
+                if name not in segments:
+                    # Spawned workers share the parent's resource tracker, which stays responsible for unlinking
+                    segments[name] = shared_memory.SharedMemory(name=name)
+            source, target = segments[in_name].buf, segments[out_name].buf
+
+            offsets = np.ndarray((count + 1,), dtype=np.int64, buffer=source)
+            start = (count + 1) * OFFSET_BYTES
+            raw = bytes(source[start:start + int(offsets[-1])])
+            texts = [raw[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+            vectors = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+            np.ndarray(vectors.shape, dtype=np.float32, buffer=target)[:] = vectors
+            conn.send(('done', count))
+        except Exception as e:
+            conn.send(('error', repr(e)))
+    for segment in segments.values():
+        segment.close()
+
+
+class _Worker:
+    def __init__(self, context, loader: str, threads: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(loader, child_conn, threads), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.inputs: Optional[shared_memory.SharedMemory] = None
+        self.outputs: Optional[shared_memory.SharedMemory] = None
+
+    @staticmethod
+    def _sized(segment: Optional[shared_memory.SharedMemory], size: int) -> shared_memory.SharedMemory:
+        if segment is not None and segment.size >= size:
+            return segment
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+        return shared_memory.SharedMemory(create=True, size=1 << max(size - 1, 1).bit_length())
+
+    def submit(self, texts: Sequence[str], dim: int, batch_size: int):
+        encoded = [text.encode('utf-8') for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        header = offsets.nbytes
+        self.inputs = self._sized(self.inputs, header + int(offsets[-1]))
+        self.outputs = self._sized(self.outputs, len(texts) * dim * 4)
+        self.inputs.buf[:header] = offsets.tobytes()
+        self.inputs.buf[header:header + int(offsets[-1])] = b''.join(encoded)
+        self.conn.send((self.inputs.name, self.outputs.name, len(texts), batch_size))
+
+    def collect(self, count: int, dim: int) -> np.ndarray:
+        status, detail = self.conn.recv()
+        if status != 'done':
+            raise RuntimeError(f"Encoder worker failed: {detail}")
+        return np.ndarray((count, dim), dtype=np.float32, buffer=self.outputs.buf).copy()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        for segment in (self.inputs, self.outputs):
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+
+
+class EncoderPool:
+    """Encoder worker processes that split each batch between them.
+
+    Every worker loads the model once (sentence-transformers maps the
+    safetensors weights from disk rather than reading them per process) and
+    runs with ``cpu_count // workers`` intra-op threads, so inference never
+    competes with the event loop for the GIL. Texts and vectors move through
+    per-worker shared-memory buffers; only buffer names and counts are
+    pickled.
+    """
+
+    def __init__(self, workers: int, loader: str = DEFAULT_LOADER, min_chunk: int = 16,
+                 threads_per_worker: Optional[int] = None):
+        self.min_chunk = min_chunk
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        context = multiprocessing.get_context('spawn')
+        self._workers = [_Worker(context, loader, threads_per_worker) for _ in range(workers)]
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._dispatch_lock = threading.Lock()
+        self.dim = None
+        self.backend = None
+        for worker in self._workers:
+            _, self.dim, self.backend = worker.conn.recv()
+            self._idle.put(worker)
+        self._closed = False
+        atexit.register(self.close)
+        logger.info(f"Started {workers} encoder worker processes ({self.backend}, dim {self.dim})")
+
+    def __len__(self) -> int:
+        return len(self._workers)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Encode across workers, each taking a contiguous slice of at least min_chunk texts"""
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        parts = max(1, min(len(self._workers), math.ceil(len(texts) / self.min_chunk)))
+        size = math.ceil(len(texts) / parts)
+        slices = [texts[start:start + size] for start in range(0, len(texts), size)]
+
+        # Take all workers for this call at once so concurrent callers cannot deadlock
+        with self._dispatch_lock:
+            workers = [self._idle.get() for _ in slices]
+        submitted, results, error = [], [], None
+        try:
+            for worker, chunk in zip(workers, slices):
+                worker.submit(chunk, self.dim, batch_size)
+                submitted.append((worker, chunk))
+        except Exception as e:
+            error = e
+        # Read every reply, even after a failure, so no stale result is left in a pipe
+        for worker, chunk in submitted:
+            try:
+                results.append(worker.collect(len(chunk), self.dim))
+            except Exception as e:
+                error = error or e
+        for worker in workers:
+            self._idle.put(worker)
+        if error is not None:
+            raise error
+        vectors = np.concatenate(results)
+        return vectors[0] if single else vectors
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.close()
@@ -1,6 +1,7 @@
 from typing import Dict, List
 import aiohttp
 import logging
+from utils.keyword_matcher import KeywordMatcher
 from utils.trend_analyzer import TrendAnalyzer
 
 logger = logging.getLogger(__name__)
@@ -22,13 +23,14 @@ class FashionTrendAnalyzer(TrendAnalyzer):
                 'maximalist', 'aesthetic'
             ]
         }
+        self.fashion_matcher = KeywordMatcher(self.fashion_keywords)
 
     async def analyze_fashion_trends(self, content: str) -> Dict:
         """Analyze fashion-specific trends in content"""
         try:
             scores = {}
-            for category, keywords in self.fashion_keywords.items():
-                relevance = self._calculate_keyword_relevance(content, keywords)
+            coverage = self.fashion_matcher.scores([content])[0]
+            for category, relevance in zip(self.fashion_matcher.groups, coverage.tolist()):
                 sentiment = await self._analyze_fashion_sentiment(content, category)
                 scores[category] = {
                     'relevance': relevance,
@@ -0,0 +1,29 @@
+import zlib
+import numpy as np
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words stand-in for SentenceTransformer, used by tests and benchmarks.
+
+    Each token adds one to the dimension its CRC32 hashes to, so texts that
+    share words have similar vectors and no model has to be downloaded.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            vector[zlib.crc32(token.encode()) % self.dim] += 1.0
+        return vector
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        if isinstance(texts, str):
+            return self._encode_one(texts)
+        return np.stack([self._encode_one(text) for text in texts])
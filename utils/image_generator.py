@@ -1,8 +1,6 @@
-from PIL import Image, ImageDraw, ImageFont
 import io
 from typing import Dict
 import requests
-import replicate
 import logging
 from datetime import datetime
 
@@ -13,6 +11,8 @@ class ImageGenerator:
         """Create meme image from concept"""
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         try:
+            import replicate
+
             viz_elements = str(visual_elements).replace("'", '"')
             # use replicate to generate image
             input = {
@@ -0,0 +1,84 @@
+from typing import Dict, Hashable, Iterable, List, Tuple
+from collections import Counter
+import heapq
+import math
+import re
+
+# Handles and hashtags keep their sigil so "@oracle" and "#oracle" stay distinct
+TOKEN_PATTERN = re.compile(r"[@#]?\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; @handles and #hashtags are also indexed without their sigil"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if token[0] in '@#' and len(token) > 1:
+            tokens.append(token[1:])
+    return tokens
+
+
+class BM25Index:
+    """Incrementally maintained in-memory BM25 inverted index.
+
+    Postings map each term to ``{doc_id: term_frequency}``; a query only
+    touches the postings of its own terms, so lexical search costs
+    O(matching postings) and never needs the embedding model.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self._doc_terms: Dict[Hashable, Counter] = {}
+        self._doc_lengths: Dict[Hashable, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id, text: str):
+        if doc_id in self._doc_terms:
+            self.remove([doc_id])
+        terms = Counter(tokenize(text))
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = sum(terms.values())
+        self._total_length += self._doc_lengths[doc_id]
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+
+    def remove(self, doc_ids: Iterable):
+        for doc_id in doc_ids:
+            terms = self._doc_terms.pop(doc_id, None)
+            if terms is None:
+                continue
+            self._total_length -= self._doc_lengths.pop(doc_id)
+            for term in terms:
+                posting = self.postings[term]
+                del posting[doc_id]
+                if not posting:
+                    del self.postings[term]
+
+    def lookup(self, term: str) -> List:
+        """Ids of documents containing an exact term, e.g. a handle or hashtag"""
+        return list(self.postings.get(term.lower(), ()))
+
+    def search(self, query: str, k: int) -> List[Tuple[object, float]]:
+        """Top-k (doc_id, BM25 score) pairs for the query terms"""
+        if not self._doc_terms:
+            return []
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count or 1.0
+        scores: Dict[Hashable, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, frequency in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
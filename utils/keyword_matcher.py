@@ -0,0 +1,66 @@
+from typing import Dict, List, Sequence, Set, Tuple
+import re
+import numpy as np
+
+
+class KeywordMatcher:
+    """Scores texts against keyword groups with one compiled regex over the whole batch.
+
+    A group's score is the fraction of its keywords that occur anywhere in the
+    lowercased text, as substrings. Every keyword from every group sits in a
+    single alternation; the batch is joined into one string and scanned once,
+    each search resuming one character after the previous match started so
+    overlapping keywords are all seen.
+    """
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.groups = list(groups)
+        self.sizes = np.array([len(keywords) for keywords in groups.values()], dtype=np.float32)
+        # keyword -> one column per time it is listed, across all groups
+        self._columns: Dict[str, List[int]] = {}
+        for column, keywords in enumerate(groups.values()):
+            for keyword in keywords:
+                self._columns.setdefault(keyword.lower(), []).append(column)
+        # Keywords inside a longer keyword; the longest alternative wins at any one position
+        self._nested = {
+            keyword: [other for other in self._columns if other != keyword and other in keyword]
+            for keyword in self._columns
+        }
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(self._columns, key=len, reverse=True))
+        self._pattern = re.compile(alternation) if self._columns else None
+
+    def _scan(self, texts: Sequence[str]) -> Set[Tuple[int, str]]:
+        """Distinct (text index, keyword) pairs present in texts"""
+        if self._pattern is None or not texts:
+            return set()
+        lowered = [text.lower() for text in texts]
+        # Keywords never contain a newline, so no match spans two texts
+        batch = '\n'.join(lowered)
+        ends = np.cumsum([len(text) + 1 for text in lowered])
+
+        starts, keywords = [], []
+        search, position = self._pattern.search, 0
+        while (match := search(batch, position)) is not None:
+            starts.append(match.start())
+            keywords.append(match.group())
+            position = match.start() + 1
+        rows = np.searchsorted(ends, starts, side='right').tolist()
+
+        found = set()
+        for row, keyword in set(zip(rows, keywords)):
+            found.add((row, keyword))
+            found.update((row, nested) for nested in self._nested[keyword])
+        return found
+
+    def matches(self, text: str) -> Set[str]:
+        """Distinct keywords found in text"""
+        return {keyword for _, keyword in self._scan([text])}
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """(texts x groups) matrix of keyword coverage in [0, 1]"""
+        counts = np.zeros((len(texts), len(self.groups)), dtype=np.float32)
+        for row, keyword in self._scan(texts):
+            for column in self._columns[keyword]:
+                counts[row, column] += 1
+        sizes = np.where(self.sizes > 0, self.sizes, 1)
+        return counts / sizes
@@ -0,0 +1,93 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+import logging
+import math
+import numpy as np
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from utils.embedding_codec import EMBEDDING_FIELDS, decode_embedding, encode_embedding
+
+logger = logging.getLogger(__name__)
+
+# Naive datetimes are stored by MongoDB as UTC, measure days the same way
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400.0
+
+
+def epoch_days(timestamp) -> float:
+    """Days since the epoch for a naive datetime or legacy ISO string"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.replace(tzinfo=None) - timestamp.utcoffset()
+    return (timestamp - EPOCH).total_seconds() / SECONDS_PER_DAY
+
+
+def decay_key(importance: float, timestamp, decay: float) -> float:
+    """Log-space decayed importance that does not change over time.
+
+    ``importance * decay ** days_old == exp(decay_key + now_days * log(decay))``
+    so ordering by the stored key is ordering by decayed importance at any
+    moment, and MongoDB can serve top-importance candidates from an index.
+    """
+    return math.log(max(importance, 1e-9)) - epoch_days(timestamp) * math.log(decay)
+
+
+def decayed_importance(keys: np.ndarray, decay: float, now: Optional[datetime] = None) -> np.ndarray:
+    """Turn stored decay keys back into importance * decay ** days_old"""
+    now_days = epoch_days(now or datetime.now())
+    return np.exp(np.asarray(keys, dtype=np.float64) + now_days * math.log(decay))
+
+
+def normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def ensure_ranking_indexes(collection):
+    """Indexes backing the recent-window and top-importance pre-filters"""
+    collection.create_index([('timestamp', DESCENDING)])
+    collection.create_index([('decay_key', DESCENDING)])
+    collection.create_index([('importance', ASCENDING), ('timestamp', ASCENDING)])
+
+
+def prefilter_candidates(collection, since: datetime, recent_limit: int, top_limit: int) -> List[Dict]:
+    """Bounded candidate set: newest memories in the window plus highest decayed importance.
+
+    Both queries are served by indexes; only their union is scored in Python.
+    """
+    projection = {**EMBEDDING_FIELDS, 'content': 1, 'type': 1, 'importance': 1, 'timestamp': 1, 'decay_key': 1}
+    recent = collection.find({'timestamp': {'$gte': since}}, projection) \
+        .sort('timestamp', DESCENDING).limit(recent_limit)
+    important = collection.find({'decay_key': {'$exists': True}}, projection) \
+        .sort('decay_key', DESCENDING).limit(top_limit)
+    candidates = {doc['_id']: doc for doc in recent}
+    for doc in important:
+        candidates.setdefault(doc['_id'], doc)
+    return list(candidates.values())
+
+
+def backfill_ranking_fields(collection, decay: float, dtype: str = 'float32', batch_size: int = 500) -> int:
+    """Convert legacy memories: typed timestamp, decay_key and a normalized embedding"""
+    updated = 0
+    updates: List[UpdateOne] = []
+    query = {'$or': [{'decay_key': {'$exists': False}}, {'timestamp': {'$type': 'string'}}]}
+    for doc in collection.find(query, {**EMBEDDING_FIELDS, 'importance': 1, 'timestamp': 1}):
+        timestamp = doc.get('timestamp') or datetime.now()
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        fields = {
+            'timestamp': timestamp,
+            'decay_key': decay_key(doc.get('importance', 1.0), timestamp, decay)
+        }
+        if doc.get('embedding') is not None:
+            fields.update(encode_embedding(normalize(decode_embedding(doc)), doc.get('embedding_dtype', dtype)))
+        updates.append(UpdateOne({'_id': doc['_id']}, {'$set': fields}))
+        if len(updates) >= batch_size:
+            updated += collection.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        updated += collection.bulk_write(updates, ordered=False).modified_count
+    logger.info(f"Backfilled ranking fields on {updated} documents in {collection.name}")
+    return updated
@@ -0,0 +1,61 @@
+from typing import Dict, Iterable, Optional
+from datetime import datetime, timedelta
+
+from utils.memory_ranking import epoch_days
+
+
+class MemoryCounters:
+    """Running memory counts by type and by time bucket.
+
+    MemorySystem updates the counters on every insert, delete and compaction,
+    so statistics and cap checks never scan the collection. The recent count
+    sums the buckets inside ``window`` and is exact to within one bucket at the
+    window's far edge. Drift (e.g. a failed buffered write) is corrected by
+    ``reset`` with counts read back from the database.
+    """
+
+    def __init__(self, window: timedelta, bucket_seconds: int = 300):
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.total = 0
+        self.by_type: Dict[str, int] = {}
+        self.buckets: Dict[int, int] = {}
+
+    def _bucket(self, timestamp) -> int:
+        return int(epoch_days(timestamp) * 86400 // self.bucket_seconds)
+
+    def _update(self, docs: Iterable[Dict], sign: int):
+        for doc in docs:
+            self.total += sign
+            memory_type = doc.get('type')
+            self.by_type[memory_type] = self.by_type.get(memory_type, 0) + sign
+            if not self.by_type[memory_type]:
+                del self.by_type[memory_type]
+            if doc.get('timestamp') is not None:
+                bucket = self._bucket(doc['timestamp'])
+                if bucket in self.buckets or sign > 0:
+                    self.buckets[bucket] = self.buckets.get(bucket, 0) + sign
+
+    def add(self, docs: Iterable[Dict]):
+        self._update(docs, 1)
+        self._prune()
+
+    def remove(self, docs: Iterable[Dict]):
+        """Count deletions, docs need their type and timestamp"""
+        self._update(docs, -1)
+
+    def reset(self, total: int, by_type: Dict[str, int], buckets: Dict[int, int]):
+        self.total = total
+        self.by_type = dict(by_type)
+        self.buckets = dict(buckets)
+
+    def recent(self, now: Optional[datetime] = None) -> int:
+        oldest = self._bucket((now or datetime.now()) - self.window)
+        return sum(count for bucket, count in self.buckets.items() if bucket >= oldest)
+
+    def _prune(self):
+        # Buckets only matter inside the window, drop the rest once they pile up
+        window_buckets = self.window.total_seconds() // self.bucket_seconds
+        if len(self.buckets) > window_buckets + 2:
+            oldest = self._bucket(datetime.now() - self.window)
+            self.buckets = {bucket: count for bucket, count in self.buckets.items() if bucket >= oldest}
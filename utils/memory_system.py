@@ -1,74 +1,168 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import asyncio
+import copy
+import functools
+import hashlib
+import math
 import os
-# from pymongo import MongoClient
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
-
-from pymongo.collection import Collection
+import threading
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from bson import ObjectId
 import logging
 
 from utils.model_manager import ModelManager
+from utils.vector_index import build_vector_index
+from utils.embedding_matrix import EmbeddingMatrix
+from utils.embedding_codec import EMBEDDING_FIELDS, decode_embedding, encode_embedding
+from utils.memory_ranking import decay_key, decayed_importance, epoch_days, normalize
+from utils.online_kmeans import OnlineKMeans
+from utils.memory_stats import MemoryCounters
+from utils.inverted_index import BM25Index, tokenize
+from utils.result_cache import ResultCache
+from utils.db_executor import DatabaseExecutor
+from utils.storage_backend import StorageBackend, apply_projection, create_backend, resolve_backend
+from utils.write_buffer import WriteBehindBuffer
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 class MemorySystem:
-    def __init__(self, mongodb_uri: str = "localhost"):
+    def __init__(self, mongodb_uri: str = "localhost", backend: Optional[StorageBackend] = None,
+                 encoder=None):
         try:
-            mongo_uri = os.environ.get("MONGODB_URI") or mongodb_uri
-            # Initialize MongoDB connection with proper authentication
-            self.client = MongoClient(mongo_uri)
-            # self.client = MongoClient(
-            #     mongodb_uri,
-            #     serverSelectionTimeoutMS=5000,
-            #     connectTimeoutMS=10000,
-            #     retryWrites=True,
-            #     retryReads=True
-            # )
-
-            # Test connection
-            client = MongoClient(mongo_uri, server_api=ServerApi('1'))
-            # Send a ping to confirm a successful connection
-            try:
-                client.admin.command('ping')
-                print("Pinged your deployment. You successfully connected to MongoDB!")
-            except Exception as e:
-                logger.error(f"Failed to connect to MongoDB: {e}", exc_info=True)
-
-            self.db = self.client.oracle
-            # print(self.db.list_collection_names())
-            # Collections for different types of memories
-            self.memories: Collection = self.db.memories
-            self.conversations: Collection = self.db.conversations
-            self.trends: Collection = self.db.trends
-            self.engagement: Collection = self.db.engagement
-
-            
-            # Verify connection and create collection if needed
-            # self._initialize_collection()
+            # MongoDB by default, MEMORY_BACKEND=sqlite for a local single-node store
+            self.backend = backend or create_backend(mongodb_uri=mongodb_uri)
 
-            # Get shared model instance
-            self.model_manager = ModelManager()
-            self.encoder = self.model_manager.get_model()
+            # Shared model, encoding through ModelManager so every invocation is counted
+            if encoder is None:
+                self.model_manager = ModelManager()
+                encoder = self.model_manager
+            self.encoder = encoder
+            # Reduced-dimension space shared with the encoder, None for full vectors
+            self.projection = getattr(encoder, 'projection', lambda: None)()
             # Memory configuration
             self.memory_config = {
                 'short_term_window': timedelta(hours=24),
                 'relevance_threshold': 0.75,
                 'max_memories': 1000,
-                'importance_decay': 0.95  # Daily decay factor
+                'importance_decay': 0.95,  # Daily decay factor
+                'index_type': 'ivf',  # 'ivf' or 'exact'
+                'index_exact_threshold': 512,  # Exact scan below this corpus size, kept under max_memories
+                'index_nprobe': 8,
+                'candidate_multiplier': 4,  # ANN candidates per result, re-ranked by importance
+                'db_max_workers': 8,  # Threads running blocking storage calls
+                'db_max_pending': 32,  # Max queued + running database calls
+                'write_batch_size': 100,  # Flush buffered inserts at this many documents
+                'write_max_age': 1.0,  # ...or when the oldest buffered insert is this old (seconds)
+                'durable_writes': os.environ.get('MEMORY_DURABLE_WRITES', '').lower() in ('1', 'true'),
+                'embedding_dtype': os.environ.get('MEMORY_EMBEDDING_DTYPE', 'float32'),  # float32, float16 or int8
+                # 'resident' scores all memories in-process, 'prefilter' scores a
+                # bounded candidate set selected by the storage backend's indexes
+                'retrieval_mode': os.environ.get('MEMORY_RETRIEVAL_MODE', 'resident'),
+                'prefilter_recent_limit': 500,  # Newest memories within short_term_window
+                'prefilter_top_limit': 500,  # Highest decayed-importance memories
+                # Memories older than compaction_age are clustered and each cluster
+                # is replaced by one centroid memory, keeping the store bounded
+                'compaction_age': timedelta(days=7),
+                'compaction_ratio': 10,  # Aged memories per centroid
+                'compaction_batch_size': 2000,  # Aged memories clustered per run
+                'compaction_interval': 3600,  # Seconds between background runs
+                'compaction_retry_interval': 600,  # Write-triggered runs pause this long after finding nothing to compact
+                'compaction_max_references': 100,
+                'stats_bucket_seconds': 300,  # Granularity of the running recent-memory counts
+                # 'semantic' scores embeddings, 'hybrid' re-ranks BM25 candidates by
+                # embeddings, 'lexical' answers from the BM25 index without the model
+                'search_mode': os.environ.get('MEMORY_SEARCH_MODE', 'semantic'),
+                'hybrid_candidates': 10,  # BM25 candidates per result re-ranked in hybrid mode
+                'cache_max_bytes': 8 * 1024 * 1024,  # Budget for cached histories and retrieval results
+                # Cached entries also expire, bounding staleness from writes by other processes
+                'cache_ttl': 60
+            }
+            self.db_executor = DatabaseExecutor(
+                max_workers=self.memory_config['db_max_workers'],
+                max_pending=self.memory_config['db_max_pending']
+            )
+
+            # Write-behind buffers; memory cleanup runs once per flushed batch
+            buffer_options = {
+                'max_batch': self.memory_config['write_batch_size'],
+                'max_age': self.memory_config['write_max_age'],
+                'durable': self.memory_config['durable_writes']
             }
+            # A failed batch is rolled back from the resident structures it was added to
+            self.memory_writer = WriteBehindBuffer(
+                functools.partial(self.backend.insert_many, 'memories'), self.db_executor,
+                on_flush=lambda docs: self._cleanup_old_memories(), on_failure=self._forget_memories,
+                **buffer_options
+            )
+            self.conversation_writer = WriteBehindBuffer(
+                functools.partial(self.backend.insert_many, 'conversations'), self.db_executor,
+                on_failure=self._forget_conversations, **buffer_options
+            )
+            self.trend_writer = WriteBehindBuffer(
+                functools.partial(self.backend.insert_many, 'trends'), self.db_executor, **buffer_options
+            )
+
+            # Resident embeddings; the ANN index only kicks in once it is trained
+            self.memory_matrix = EmbeddingMatrix(decay=self.memory_config['importance_decay'])
+            self.conversation_matrix = EmbeddingMatrix()
+            # The index reads vectors from the matrix rather than keeping a second copy
+            self.memory_index = build_vector_index(
+                self.memory_config['index_type'],
+                nprobe=self.memory_config['index_nprobe'],
+                exact_threshold=self.memory_config['index_exact_threshold'],
+                store=self.memory_matrix
+            )
+            self.result_cache = ResultCache(self.memory_config['cache_max_bytes'], ttl=self.memory_config['cache_ttl'])
+            # Like the matrices, the BM25 indexes only see writes through this
+            # instance; components share one through get_memory_system()
+            self.memory_lexicon = BM25Index()
+            self.conversation_lexicon = BM25Index()
+            self._compacting = False
+            self._compaction_idle_until = 0.0
+            self._closed = False
+            self.memory_counters = MemoryCounters(
+                self.memory_config['short_term_window'], self.memory_config['stats_bucket_seconds']
+            )
+            self.backend.ensure_indexes()
+            self._load_embeddings()
+            self.memory_counters.reset(*self._count_memories())
         except Exception as e:
-            logger.error(f"Failed to initialize MongoDB connection: {e}", exc_info=True)
+            logger.error(f"Failed to initialize memory storage: {e}", exc_info=True)
             raise e
 
+    async def _aencode(self, text: str) -> np.ndarray:
+        """Encode without blocking the event loop"""
+        aencode = getattr(self.encoder, 'aencode', None)
+        if aencode is not None:
+            return await aencode(text)
+        return await asyncio.to_thread(self.encoder.encode, text)
+
     async def encode_memory(self, text: str) -> np.ndarray:
         """Encode text using shared model"""
-        return self.encoder.encode(text, convert_to_tensor=True).tolist()
+        return np.asarray(await self._aencode(text)).tolist()
+
+    def _embedding_fields(self, vector) -> Dict:
+        """Stored embedding fields, tagged with the projection the vector lives in"""
+        fields = encode_embedding(vector, self.memory_config['embedding_dtype'])
+        if self.projection is not None:
+            fields['embedding_projection'] = self.projection.version
+        return fields
+
+    def _stored_embedding(self, doc: Dict) -> Optional[np.ndarray]:
+        """A stored vector in the active embedding space, None if it was written under another projection"""
+        vector = decode_embedding(doc)
+        version = doc.get('embedding_projection')
+        active = self.projection.version if self.projection is not None else None
+        if version == active:
+            return vector
+        # Full vectors written before the projection was enabled are projected on read
+        if version is None and self.projection is not None and len(vector) == self.projection.source_dim:
+            return self.projection.apply(vector)
+        return None
 
     async def calculate_similarity(self, memory1: np.ndarray, memory2: np.ndarray) -> float:
         """Calculate cosine similarity between memory embeddings"""
@@ -77,112 +171,351 @@ class MemorySystem:
         ))
 
 
-    def _initialize_collection(self):
-        """Initialize collection and verify access"""
-        try:
-            # Try to create collection if it doesn't exist
-            if 'memories' not in self.db.list_collection_names():
-                self.db.create_collection('memories')
-                logger.info("Created memories collection")
-            
-            # Verify write access with a test document
-            test_doc = {
-                '_id': 'test_access',
-                'timestamp': datetime.now(),
-                'type': 'system_test'
-            }
-            
-            # Upsert the test document
-            self.memories.update_one(
-                {'_id': 'test_access'},
-                {'$set': test_doc},
-                upsert=True
-            )
-            
-            # Verify read access
-            test_read = self.memories.find_one({'_id': 'test_access'})
-            if not test_read:
-                raise Exception("Failed to verify read access")
-            
-            # Clean up test document
-            self.memories.delete_one({'_id': 'test_access'})
-            
-            logger.info("Successfully verified database access")
-            
-        except Exception as e:
-            logger.error(f"Database initialization failed: {e}", exc_info=True)
-            raise
-
     async def store_memory(self, memory: Dict) -> str:
         """Store a new memory with embeddings"""
         try:
             # Generate embedding for the memory content
-            embedding = self.encoder.encode(memory['content'])
+            embedding = normalize(await self._aencode(memory['content']))
+            now = datetime.now()
+            importance = memory.get('importance', 1.0)
             
             memory_doc = {
                 'content': memory['content'],
                 'type': memory.get('type', 'general'),
-                'embedding': embedding.tolist(),
-                'timestamp': datetime.now().isoformat(),
-                'importance': memory.get('importance', 1.0),
+                **self._embedding_fields(embedding),
+                'timestamp': now,
+                'importance': importance,
+                'decay_key': decay_key(importance, now, self.memory_config['importance_decay']),
                 'context': memory.get('context', {}),
                 'metadata': memory.get('metadata', {}),
                 'references': memory.get('references', []),
                 'engagement': memory.get('engagement', {})
             }
             
-            result = self.memories.insert_one(memory_doc)
-            
-            # Maintain memory limit
-            await self._cleanup_old_memories()
+            # Resident state first, so a failed flush of this batch can roll it back
+            memory_doc['_id'] = ObjectId()
+            self.memory_counters.add([memory_doc])
+            self.memory_lexicon.add(memory_doc['_id'], self._memory_text(memory_doc))
+            self._invalidate_results(
+                'memories', embedding, self._memory_text(memory_doc), importance,
+                self.memory_config['importance_decay']
+            )
+            if self.memory_config['retrieval_mode'] == 'resident':
+                self.memory_matrix.add([memory_doc['_id']], embedding, [importance], [now])
+                self.memory_index.add([memory_doc['_id']], embedding)
+            # Buffered insert; the memory limit is enforced when the batch flushes
+            await self.memory_writer.add(memory_doc)
             
-            return str(result.inserted_id)
+            return str(memory_doc['_id'])
             
         except Exception as e:
             logger.error(f"Error storing memory: {e}", exc_info=True)
             return ""
 
-    async def get_relevant_memories(self, query: str, limit: int = 5) -> List[Dict]:
-        """Retrieve relevant memories using semantic search"""
+    async def get_relevant_memories(self, query: str, limit: int = 5, mode: Optional[str] = None,
+                                    query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """Retrieve relevant memories using semantic, hybrid or lexical search.
+
+        Pass query_embedding when the text was already encoded upstream.
+        """
         try:
-            # Generate embedding for query
-            query_embedding = self.encoder.encode(query)
-            
-            # Get all memories with their embeddings
-            all_memories = list(self.memories.find(
-                {},
-                {'content': 1, 'embedding': 1, 'importance': 1, 'timestamp': 1}
+            if isinstance(query, list):
+                query = ' '.join(query)
+            mode = mode or self.memory_config['search_mode']
+            key = ('memories', mode, limit, self._query_key(query))
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return [dict(memory) for memory in cached]
+
+            # Generate embedding for query, lexical search never needs the model
+            if mode == 'lexical':
+                query_embedding = None
+            elif query_embedding is not None:
+                query_embedding = normalize(query_embedding)
+            else:
+                query_embedding = normalize(await self._aencode(query))
+            memories = await self._search_memories(query, query_embedding, limit, mode)
+            self.result_cache.put(key, memories, self._result_guard(
+                query, query_embedding, memories, limit, mode, self.memory_matrix
             ))
-            
-            if not all_memories:
-                return []
-
-            # Calculate similarity scores
-            similarities = []
-            for memory in all_memories:
-                memory_embedding = np.array(memory['embedding'])
-                similarity = np.dot(query_embedding, memory_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(memory_embedding)
-                )
-                
-                # Apply time decay to importance
-                days_old = (datetime.now() - memory['timestamp']).days
-                decayed_importance = memory['importance'] * (
-                    self.memory_config['importance_decay'] ** days_old
-                )
-                
-                # Combine similarity with importance
-                final_score = similarity * decayed_importance
-                similarities.append((memory, final_score))
-            
-            # Sort by final score and get top memories
-            sorted_memories = sorted(similarities, key=lambda x: x[1], reverse=True)
-            return [m[0] for m in sorted_memories[:limit]]
+            return [dict(memory) for memory in memories]
             
         except Exception as e:
             logger.error(f"Error retrieving memories: {e}", exc_info=True)
             return []
 
+    _memory_projection = {'content': 1, 'type': 1, 'importance': 1, 'timestamp': 1}
+
+    async def _search_memories(self, query: str, query_embedding: Optional[np.ndarray],
+                               limit: int, mode: str) -> List[Dict]:
+        if mode != 'semantic':
+            # BM25 retrieval; hybrid mode re-ranks the lexical candidates by embeddings
+            hits = self.memory_lexicon.search(
+                query, limit * (self.memory_config['hybrid_candidates'] if mode == 'hybrid' else 1)
+            )
+            if mode == 'lexical':
+                return await self.db_executor.run(
+                    self._find_in_order, 'memories', [item_id for item_id, _ in hits],
+                    self._memory_projection, self.memory_writer
+                )
+            if hits:
+                return await self._rank_candidates(query_embedding, [item_id for item_id, _ in hits], limit)
+            # Nothing shares a term with the query, only dense retrieval can help
+
+        if self.memory_config['retrieval_mode'] == 'prefilter':
+            return await self._get_prefiltered_memories(query_embedding, limit)
+        if not len(self.memory_matrix):
+            return []
+
+        # Past the exact threshold, score only the ANN candidates
+        rows = None
+        if getattr(self.memory_index, 'is_trained', False):
+            candidates = self.memory_index.search(
+                query_embedding, limit * self.memory_config['candidate_multiplier']
+            )
+            rows = self.memory_matrix.rows([item_id for item_id, _ in candidates])
+
+        # Combine similarity with time-decayed importance
+        scores = self.memory_matrix.similarities(query_embedding, rows) * \
+            self.memory_matrix.decayed_importance(rows=rows)
+        top_ids = self.memory_matrix.top_k(scores, limit, rows)
+
+        return await self.db_executor.run(
+            self._find_in_order,
+            'memories', top_ids, self._memory_projection, self.memory_writer
+        )
+
+    async def _rank_candidates(self, query_embedding: np.ndarray, candidate_ids: List, limit: int) -> List[Dict]:
+        """Re-rank lexical candidates by similarity times decayed importance"""
+        if self.memory_config['retrieval_mode'] == 'resident':
+            rows = self.memory_matrix.rows(candidate_ids)
+            scores = self.memory_matrix.similarities(query_embedding, rows) * \
+                self.memory_matrix.decayed_importance(rows=rows)
+            return await self.db_executor.run(
+                self._find_in_order, 'memories', self.memory_matrix.top_k(scores, limit, rows),
+                self._memory_projection, self.memory_writer
+            )
+
+        candidates = await self.db_executor.run(
+            self._find_in_order, 'memories', candidate_ids,
+            {**EMBEDDING_FIELDS, **self._memory_projection, 'decay_key': 1}, self.memory_writer
+        )
+        return self._rank_documents(query_embedding, candidates, limit)
+
+    @staticmethod
+    def _query_key(query: str) -> str:
+        return hashlib.sha1(' '.join(query.split()).encode()).hexdigest()
+
+    def _result_guard(self, query: str, query_embedding: Optional[np.ndarray], results: List[Dict],
+                      limit: int, mode: str, matrix: EmbeddingMatrix) -> Dict:
+        """What a later write has to match to change a cached retrieval result.
+
+        A new document can only displace a result whose score is below its own,
+        so only the lowest cached score is kept. Scores decay uniformly over
+        time, which keeps their order and lets the threshold be decayed on check.
+        """
+        threshold = -np.inf
+        rows = matrix.rows([doc['_id'] for doc in results])
+        if query_embedding is not None and len(results) == limit and len(rows) == limit:
+            scores = matrix.similarities(query_embedding, rows)
+            if matrix.decay != 1.0:
+                scores = scores * matrix.decayed_importance(rows=rows)
+            threshold = float(scores.min())
+        return {
+            'ids': {doc['_id'] for doc in results},
+            'terms': frozenset(tokenize(query)) if mode != 'semantic' else None,
+            'embedding': query_embedding if mode != 'lexical' else None,
+            'threshold': threshold,
+            'cached_days': epoch_days(datetime.now())
+        }
+
+    def _invalidate_results(self, namespace: str, embedding: np.ndarray, text: str,
+                            importance: float = 1.0, decay: float = 1.0):
+        """Drop the cached results a newly stored document could enter"""
+        tokens = set(tokenize(text))
+        now_days = epoch_days(datetime.now())
+        embedding = normalize(embedding)
+
+        def affected(key, guard) -> bool:
+            if key[0] != namespace:
+                return False
+            if guard['terms'] is not None and guard['terms'] & tokens:
+                return True
+            if guard['embedding'] is None:
+                return False
+            threshold = guard['threshold'] * decay ** (now_days - guard['cached_days'])
+            return float(guard['embedding'] @ embedding) * importance > threshold
+
+        self.result_cache.invalidate_where(affected)
+
+    def _forget_memories(self, docs: List[Dict]):
+        """Undo store_memory's resident updates for memories whose insert failed"""
+        ids = [doc['_id'] for doc in docs]
+        failed = set(ids)
+        self.memory_counters.remove(docs)
+        self.memory_lexicon.remove(ids)
+        self.memory_matrix.remove(ids)
+        self.memory_index.remove(ids)
+        self.result_cache.invalidate_where(lambda key, guard: key[0] == 'memories' and bool(guard['ids'] & failed))
+
+    def _forget_conversations(self, docs: List[Dict]):
+        """Undo store_conversation's resident updates for conversations whose insert failed"""
+        ids = [doc['_id'] for doc in docs]
+        failed = set(ids)
+        self.conversation_lexicon.remove(ids)
+        self.conversation_matrix.remove(ids)
+        self.result_cache.invalidate_where(lambda key, guard: key[0] == 'context' and bool(guard['ids'] & failed))
+
+    def get_cache_statistics(self) -> Dict:
+        """Hit, miss, eviction and invalidation counters of the result cache"""
+        return self.result_cache.stats()
+
+    async def _get_prefiltered_memories(self, query_embedding: np.ndarray, limit: int) -> List[Dict]:
+        """Score only the candidates the storage backend pre-selects through its indexes"""
+        await self.memory_writer.flush()
+
+        def select_candidates() -> List[Dict]:
+            candidates = self.backend.prefilter_candidates(
+                'memories', datetime.now() - self.memory_config['short_term_window'],
+                self.memory_config['prefilter_recent_limit'],
+                self.memory_config['prefilter_top_limit']
+            )
+            if self.backend.supports_vector_search:
+                # Nearest neighbours from the database's own vector index
+                seen = {doc['_id'] for doc in candidates}
+                neighbours = self.backend.vector_search(
+                    'memories', query_embedding, limit * self.memory_config['candidate_multiplier']
+                )
+                candidates += self.backend.find_by_ids(
+                    'memories', [item_id for item_id, _ in neighbours if item_id not in seen]
+                )
+            return candidates
+
+        candidates = await self.db_executor.run(select_candidates)
+        return self._rank_documents(query_embedding, candidates, limit)
+
+    def _rank_documents(self, query_embedding: np.ndarray, candidates: List[Dict], limit: int) -> List[Dict]:
+        """Score fetched memory documents by similarity times decayed importance"""
+        stored = [(doc, self._stored_embedding(doc)) for doc in candidates if doc.get('embedding') is not None]
+        candidates = [doc for doc, vector in stored if vector is not None]
+        if not candidates:
+            return []
+
+        # Stored vectors are pre-normalized, similarity is a plain dot product
+        vectors = np.stack([vector for _, vector in stored if vector is not None])
+        keys = np.array([
+            doc['decay_key'] if 'decay_key' in doc else
+            decay_key(doc.get('importance', 1.0), doc['timestamp'], self.memory_config['importance_decay'])
+            for doc in candidates
+        ])
+        scores = (vectors @ query_embedding) * \
+            decayed_importance(keys, self.memory_config['importance_decay'])
+
+        top = np.argsort(-scores)[:limit]
+        return [
+            {k: candidates[i][k] for k in ('_id', 'content', 'type', 'importance', 'timestamp') if k in candidates[i]}
+            for i in top
+        ]
+
+    def _load_embeddings(self):
+        """Load embeddings into resident matrices and text into the BM25 indexes once at startup"""
+        ids, embeddings, importance, timestamps = [], [], [], []
+        skipped = 0
+        resident = self.memory_config['retrieval_mode'] == 'resident'
+        # Prefilter mode scores memories from backend candidates, only the text stays resident
+        projection = {'content': 1, 'metadata': 1}
+        if resident:
+            projection.update({**EMBEDDING_FIELDS, 'importance': 1, 'timestamp': 1})
+        for memory in self.backend.iter_documents('memories', projection):
+            if memory.get('content'):
+                self.memory_lexicon.add(memory['_id'], self._memory_text(memory))
+            if resident and memory.get('embedding'):
+                embedding = self._stored_embedding(memory)
+                if embedding is None:
+                    skipped += 1
+                    continue
+                ids.append(memory['_id'])
+                embeddings.append(embedding)
+                importance.append(memory.get('importance', 1.0))
+                timestamps.append(self._parse_timestamp(memory['timestamp']))
+        if ids:
+            embeddings = np.array(embeddings, dtype=np.float32)
+            self.memory_matrix.add(ids, embeddings, importance, timestamps)
+            self.memory_index.add(ids, embeddings)
+
+        ids, embeddings, timestamps = [], [], []
+        for conversation in self.backend.iter_documents(
+            'conversations', {**EMBEDDING_FIELDS, 'timestamp': 1, 'original': 1, 'response': 1}
+        ):
+            self.conversation_lexicon.add(conversation['_id'], self._conversation_text(conversation))
+            if conversation.get('embedding'):
+                embedding = self._stored_embedding(conversation)
+                if embedding is None:
+                    skipped += 1
+                    continue
+                ids.append(conversation['_id'])
+                embeddings.append(embedding)
+                timestamps.append(self._parse_timestamp(conversation['timestamp']))
+        if ids:
+            self.conversation_matrix.add(ids, np.array(embeddings, dtype=np.float32), timestamps=timestamps)
+
+        logger.info(
+            f"Loaded {len(self.memory_matrix)} memory and "
+            f"{len(self.conversation_matrix)} conversation embeddings"
+        )
+        if skipped:
+            if self.backend.supports_maintenance_commands:
+                remedy = "re-encode them or run manage.py project-embeddings"
+            else:
+                remedy = "re-encode them (manage.py project-embeddings only rewrites MongoDB stores)"
+            logger.warning(f"Skipped {skipped} embeddings written under another projection; {remedy}")
+
+    def _find_in_order(self, collection: str, ids: List, projection: Dict,
+                       writer: Optional[WriteBehindBuffer] = None) -> List[Dict]:
+        """Fetch documents by id, preserving the ranking order of ids"""
+        if not ids:
+            return []
+        by_id = {doc['_id']: doc for doc in self.backend.find_by_ids(collection, ids, projection)}
+        if writer is not None:
+            # Ids ranked from the resident matrix may still be buffered; copy them
+            # so callers see what storage would return and can't alter the pending write
+            for i in ids:
+                pending = writer.get_pending(i) if i not in by_id else None
+                if pending is not None:
+                    by_id[i] = copy.deepcopy(apply_projection(pending, projection))
+        return [by_id[i] for i in ids if i in by_id]
+
+    @staticmethod
+    def _memory_text(memory: Dict) -> str:
+        """Indexed text of a memory, centroids also carry their members' excerpts"""
+        return ' '.join([memory.get('content', ''), *memory.get('metadata', {}).get('excerpts', [])])
+
+    @staticmethod
+    def _conversation_text(conversation: Dict) -> str:
+        """Indexed text of a conversation: the original tweet, its @author and our response"""
+        original = conversation.get('original') or {}
+        response = conversation.get('response') or {}
+        parts = [str(original.get('text', '')), str(response.get('content', ''))]
+        if original.get('author'):
+            parts.append(f"@{original['author']}")
+        return ' '.join(parts)
+
+    @classmethod
+    def _without_embeddings(cls, value):
+        """Drop in-flight NumPy embeddings (e.g. on tweet records) before a document is stored"""
+        if isinstance(value, dict):
+            return {k: cls._without_embeddings(v) for k, v in value.items() if not isinstance(v, np.ndarray)}
+        if isinstance(value, list):
+            return [cls._without_embeddings(item) for item in value]
+        return value
+
+    @staticmethod
+    def _parse_timestamp(timestamp) -> datetime:
+        """Older memories stored ISO strings, everything else stores datetimes"""
+        if isinstance(timestamp, str):
+            return datetime.fromisoformat(timestamp)
+        return timestamp
+
     async def store_conversation(self, conversation: Dict) -> str:
         """Store a conversation interaction"""
         # type, original, response, relevance
@@ -192,12 +525,14 @@ class MemorySystem:
         if isinstance(content_to_encode, dict):
             # If content is a dictionary, convert it to string
             content_to_encode = str(content_to_encode)
-        embedding = self.encoder.encode(content_to_encode).tolist()
+        embedding = conversation.get('embedding')
+        if embedding is None:
+            embedding = await self._aencode(content_to_encode)
 
         try:
             conversation_doc = {
                 'type': conversation['type'],
-                'original': conversation['original'],
+                'original': self._without_embeddings(conversation['original']),
                 'response': conversation['response'],
                 'philosophical_post': conversation['philosophical_post'],
                 'relevance': conversation['relevance'],
@@ -205,12 +540,19 @@ class MemorySystem:
                 'tweet_id': conversation['tweet_id'],
                 'media_id': conversation['media_id'],
                 'timestamp': datetime.now(),
-                'context': conversation.get('context', {}),
-                'embedding': embedding, # self.encoder.encode(conversation['content']).tolist()
+                'context': self._without_embeddings(conversation.get('context', {})),
+                **self._embedding_fields(embedding),
             }
-            result = self.conversations.insert_one(conversation_doc)
-            print(f"\n\nconversation_doc result: {result}\n\n")
-            return str(result.inserted_id)
+            conversation_doc['_id'] = ObjectId()
+            self.conversation_lexicon.add(conversation_doc['_id'], self._conversation_text(conversation_doc))
+            author = (conversation_doc['original'] or {}).get('author')
+            self.result_cache.invalidate_where(lambda key, _: key[:2] == ('history', author))
+            self._invalidate_results('context', embedding, self._conversation_text(conversation_doc))
+            self.conversation_matrix.add(
+                [conversation_doc['_id']], embedding, timestamps=[conversation_doc['timestamp']]
+            )
+            await self.conversation_writer.add(conversation_doc)
+            return str(conversation_doc['_id'])
             
         except Exception as e:
             logger.error(f"Error storing conversation: {e}", exc_info=True)
@@ -219,9 +561,15 @@ class MemorySystem:
     async def get_conversation_history(self, participant: str, limit: int = 10) -> List[Dict]:
         """Retrieve conversation history with a specific participant"""
         try:
-            return list(self.conversations.find(
-                {'original.author': participant}
-            ).sort('timestamp', -1).limit(limit))
+            key = ('history', participant, limit)
+            cached = self.result_cache.get(key)
+            if cached is None:
+                await self.conversation_writer.flush()
+                cached = await self.db_executor.run(
+                    self.backend.find_recent, 'conversations', author=participant, limit=limit
+                )
+                self.result_cache.put(key, cached)
+            return [dict(conversation) for conversation in cached]
             
         except Exception as e:
             logger.error(f"Error retrieving conversation history: {e}", exc_info=True)
@@ -238,11 +586,11 @@ class MemorySystem:
                 'timestamp': datetime.now(),
                 'strength': trend.get('strength', 1.0),
                 'related_topics': trend.get('related_topics', []),
-                'embedding': self.encoder.encode(trend['content']).tolist()
+                **self._embedding_fields(await self._aencode(trend['content']))
             }
             
-            result = self.trends.insert_one(trend_doc)
-            return str(result.inserted_id)
+            await self.trend_writer.add(trend_doc)
+            return str(trend_doc['_id'])
             
         except Exception as e:
             logger.error(f"Error storing trend: {e}", exc_info=True)
@@ -252,9 +600,8 @@ class MemorySystem:
         """Get recent trends within specified time window"""
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
-            return list(self.trends.find(
-                {'timestamp': {'$gte': cutoff_time}}
-            ).sort('timestamp', -1))
+            await self.trend_writer.flush()
+            return await self.db_executor.run(self.backend.find_recent, 'trends', since=cutoff_time)
             
         except Exception as e:
             logger.error(f"Error retrieving trends: {e}", exc_info=True)
@@ -262,10 +609,17 @@ class MemorySystem:
     async def update_memory_importance(self, memory_id: str, engagement_score: float):
         """Update memory importance based on engagement"""
         try:
-            self.memories.update_one(
-                {'_id': memory_id},
-                {'$set': {'importance': engagement_score}}
+            # Callers hold the id store_memory returned as a string; storage and the matrix key by ObjectId
+            doc_id = ObjectId(memory_id)
+            # The memory may still be buffered
+            await self.memory_writer.flush()
+            await self.db_executor.run(
+                self.backend.update_importance, 'memories', doc_id,
+                engagement_score, self.memory_config['importance_decay']
             )
+            self.memory_matrix.set_importance(doc_id, engagement_score)
+            # A changed importance can reorder any result
+            self.result_cache.invalidate_where(lambda key, _: key[0] == 'memories')
         except Exception as e:
             logger.error(f"Error updating memory importance: {e}", exc_info=True)
 
@@ -273,39 +627,168 @@ class MemorySystem:
         """Get all tweets from memory"""
         # get all recent conversations timestamp > 24 hours
         cutoff_time = datetime.now() - timedelta(hours=6)
-        return list(self.conversations.find(
-            {'timestamp': {'$gte': cutoff_time}}
-        ))
+        await self.conversation_writer.flush()
+        return await self.db_executor.run(self.backend.find_recent, 'conversations', since=cutoff_time)
 
     async def _cleanup_old_memories(self):
-        """Remove old memories when limit is reached"""
+        """Compact aged memories when the limit is reached, delete only what compaction can't absorb"""
         try:
-            total_memories = self.memories.count_documents({})
-            if total_memories > self.memory_config['max_memories']:
+            over_cap = self.memory_counters.total > self.memory_config['max_memories']
+            # Runs on every flush while over the cap, so skip compaction that just found nothing
+            if over_cap and time.monotonic() >= self._compaction_idle_until:
+                await self.compact_memories()
+            if self.memory_counters.total > self.memory_config['max_memories']:
                 # Remove oldest, least important memories
-                excess_count = total_memories - self.memory_config['max_memories']
-                oldest_memories = self.memories.find().sort([
-                    ('importance', 1),
-                    ('timestamp', 1)
-                ]).limit(excess_count)
-                
-                memory_ids = [m['_id'] for m in oldest_memories]
-                self.memories.delete_many({'_id': {'$in': memory_ids}})
+                excess_count = self.memory_counters.total - self.memory_config['max_memories']
+                memory_ids = await self.db_executor.run(self.backend.lowest_ranked_ids, 'memories', excess_count)
+                removed = await self.db_executor.run(
+                    self.backend.find_by_ids, 'memories', memory_ids, {'type': 1, 'timestamp': 1}
+                )
+                await self.db_executor.run(self.backend.delete_ids, 'memories', memory_ids)
+                self.memory_counters.remove(removed)
+                self.memory_lexicon.remove(memory_ids)
+                deleted = set(memory_ids)
+                self.result_cache.invalidate_where(
+                    lambda key, guard: key[0] == 'memories' and bool(guard['ids'] & deleted)
+                )
+                self.memory_matrix.remove(memory_ids)
+                self.memory_index.remove(memory_ids)
                 
         except Exception as e:
             logger.error(f"Error cleaning up memories: {e}", exc_info=True)
 
+    async def compact_memories(self) -> int:
+        """Replace clusters of aged memories with centroid memories, returns the net number removed"""
+        if self._compacting:
+            return 0
+        self._compacting = True
+        try:
+            await self.memory_writer.flush()
+            cutoff = datetime.now() - self.memory_config['compaction_age']
+            aged = await self.db_executor.run(
+                self.backend.find_recent, 'memories',
+                until=cutoff, limit=self.memory_config['compaction_batch_size']
+            )
+            stored = [(doc, self._stored_embedding(doc)) for doc in aged if doc.get('embedding') is not None]
+            aged = [doc for doc, vector in stored if vector is not None]
+            if len(aged) < 2:
+                self._compaction_idle_until = time.monotonic() + self.memory_config['compaction_retry_interval']
+                return 0
+
+            # Earlier centroids take part weighted by how many memories they stand for
+            vectors = np.stack([vector for _, vector in stored if vector is not None])
+            weights = np.array([doc.get('metadata', {}).get('member_count', 1) for doc in aged], dtype=np.float64)
+            cluster_centroids, assignments = await asyncio.to_thread(
+                self._cluster, vectors, weights, math.ceil(len(aged) / self.memory_config['compaction_ratio'])
+            )
+
+            centroids, absorbed, absorbed_docs = [], [], []
+            for cluster in np.unique(assignments):
+                members = np.flatnonzero(assignments == cluster)
+                if len(members) < 2:
+                    continue
+                centroids.append(self._centroid_memory(
+                    [aged[i] for i in members], vectors[members], cluster_centroids[cluster]
+                ))
+                absorbed.extend(aged[i]['_id'] for i in members)
+                absorbed_docs.extend(aged[i] for i in members)
+            if not centroids:
+                self._compaction_idle_until = time.monotonic() + self.memory_config['compaction_retry_interval']
+                return 0
+
+            # Insert before deleting so a failure never loses the members' history
+            await self.db_executor.run(self.backend.insert_many, 'memories', centroids)
+            await self.db_executor.run(self.backend.delete_ids, 'memories', absorbed)
+            self.memory_counters.add(centroids)
+            self.memory_counters.remove(absorbed_docs)
+            self.memory_lexicon.remove(absorbed)
+            self.result_cache.invalidate_where(lambda key, _: key[0] == 'memories')
+            for doc in centroids:
+                self.memory_lexicon.add(doc['_id'], self._memory_text(doc))
+            self.memory_matrix.remove(absorbed)
+            self.memory_index.remove(absorbed)
+            if self.memory_config['retrieval_mode'] == 'resident':
+                ids = [doc['_id'] for doc in centroids]
+                embeddings = np.stack([self._stored_embedding(doc) for doc in centroids])
+                self.memory_matrix.add(
+                    ids, embeddings, [doc['importance'] for doc in centroids],
+                    [doc['timestamp'] for doc in centroids]
+                )
+                self.memory_index.add(ids, embeddings)
+
+            logger.info(f"Compacted {len(absorbed)} aged memories into {len(centroids)} centroids")
+            return len(absorbed) - len(centroids)
+
+        except Exception as e:
+            logger.error(f"Error compacting memories: {e}", exc_info=True)
+            return 0
+        finally:
+            self._compacting = False
+
+    @staticmethod
+    def _cluster(vectors: np.ndarray, weights: np.ndarray, k: int):
+        """Cluster centroids and each vector's cluster, CPU-bound so it runs off the event loop"""
+        kmeans = OnlineKMeans(k)
+        for _ in range(3):
+            kmeans.partial_fit(vectors, weights)
+        return kmeans.centroids, kmeans.predict(vectors)
+
+    def _centroid_memory(self, members: List[Dict], vectors: np.ndarray, centroid: np.ndarray) -> Dict:
+        """Summary memory standing in for a cluster of aged memories"""
+        decay = self.memory_config['importance_decay']
+        timestamps = [self._parse_timestamp(doc['timestamp']) for doc in members]
+        newest = max(timestamps)
+        # Members' importance decayed to the newest member's time, so the
+        # centroid keeps decaying from there exactly as its members would have
+        keys = np.array([
+            doc['decay_key'] if 'decay_key' in doc else decay_key(doc.get('importance', 1.0), ts, decay)
+            for doc, ts in zip(members, timestamps)
+        ])
+        importance = float(decayed_importance(keys, decay, newest).sum())
+        embedding = normalize(vectors.mean(axis=0))
+        representative = members[int(np.argmax(vectors @ centroid))]
+
+        references, member_types = [], {}
+        for doc in members:
+            references.append(str(doc['_id']))
+            references.extend(doc.get('references', []))
+            metadata = doc.get('metadata', {})
+            for memory_type, count in metadata.get('member_types', {doc.get('type', 'general'): 1}).items():
+                member_types[memory_type] = member_types.get(memory_type, 0) + count
+        references = list(dict.fromkeys(references))[:self.memory_config['compaction_max_references']]
+
+        return {
+            '_id': ObjectId(),
+            'content': representative['content'],
+            'type': 'centroid',
+            **self._embedding_fields(embedding),
+            'timestamp': newest,
+            'importance': importance,
+            'decay_key': decay_key(importance, newest, decay),
+            'context': {},
+            'metadata': {
+                'member_count': int(sum(doc.get('metadata', {}).get('member_count', 1) for doc in members)),
+                'member_types': member_types,
+                'first_timestamp': min(
+                    self._parse_timestamp(doc.get('metadata', {}).get('first_timestamp', ts))
+                    for doc, ts in zip(members, timestamps)
+                ),
+                'last_timestamp': newest,
+                'excerpts': [
+                    doc['content'] for doc in
+                    sorted(members, key=lambda doc: doc.get('importance', 1.0), reverse=True)[:3]
+                ]
+            },
+            'references': references,
+            'engagement': {}
+        }
+
     async def get_memory_statistics(self) -> Dict:
         """Get statistics about stored memories"""
         try:
-            total_memories = self.memories.count_documents({})
-            recent_memories = self.memories.count_documents({
-                'timestamp': {'$gte': datetime.now() - self.memory_config['short_term_window']}
-            })
-            
             return {
-                'total_memories': total_memories,
-                'recent_memories': recent_memories,
+                'total_memories': self.memory_counters.total,
+                'recent_memories': self.memory_counters.recent(),
                 'memory_types': await self._get_memory_type_distribution()
             }
         except Exception as e:
@@ -314,15 +797,42 @@ class MemorySystem:
 
     async def _get_memory_type_distribution(self) -> Dict:
         """Get distribution of memory types"""
+        return dict(self.memory_counters.by_type)
+
+    def _count_memories(self):
+        """Totals, type distribution and recent buckets read from the database"""
+        bucket_seconds = self.memory_config['stats_bucket_seconds']
+        since = datetime.now() - self.memory_config['short_term_window'] - timedelta(seconds=bucket_seconds)
+        return (
+            self.backend.count('memories'),
+            self.backend.count_by_type('memories'),
+            self.backend.count_by_bucket('memories', since, bucket_seconds)
+        )
+
+    async def reconcile_statistics(self):
+        """Correct drift in the running counters against the database, run periodically"""
         try:
-            pipeline = [
-                {'$group': {'_id': '$type', 'count': {'$sum': 1}}}
-            ]
-            result = self.memories.aggregate(pipeline)
-            return {doc['_id']: doc['count'] for doc in result}
+            await self.memory_writer.flush()
+            self.memory_counters.reset(*await self.db_executor.run(self._count_memories))
         except Exception as e:
-            logger.error(f"Error getting memory type distribution: {e}", exc_info=True)
-            return {}
+            logger.error(f"Error reconciling memory statistics: {e}", exc_info=True)
+
+    async def flush(self):
+        """Write every buffered memory, conversation and trend now"""
+        await self.memory_writer.flush()
+        await self.conversation_writer.flush()
+        await self.trend_writer.flush()
+
+    async def close(self):
+        """Flush buffered writes and release the backend, called at shutdown; safe to call twice"""
+        if self._closed:
+            return
+        self._closed = True
+        await self.memory_writer.close()
+        await self.conversation_writer.close()
+        await self.trend_writer.close()
+        await self.db_executor.run(self.backend.close)
+        self.db_executor.shutdown(wait=False)
 
     async def store_tweet_interaction(self, tweet: Dict, response: Dict):
         """Store tweet interaction in memory"""
@@ -343,31 +853,78 @@ class MemorySystem:
         except Exception as e:
             logger.error(f"Error storing tweet interaction: {e}", exc_info=True)
 
-    async def get_relevant_tweet_context(self, tweet: Dict) -> List[Dict]:
+    async def get_relevant_tweet_context(self, tweet: Dict, limit: int = 5, mode: Optional[str] = None) -> List[Dict]:
         """Get relevant memories for tweet context"""
         try:
-            query = tweet['text']
-            query_embedding = await self.encode_memory(query)
-
-            # Calculate similarities
-            # similarities = [
-            #     self._calculate_similarity(query_embedding, m['embedding'])
-            #     for m in self.memories if m['type'] == 'tweet_interaction'
-            # ]
-            similarities = []
-            # we have embeddings array in conversations collection
-            # its an array of embeddings 768 dim
-            for m in self.conversations.find(
-                # {'original.author': tweet['original']['author']},
-                {'embedding': 1}
-            ):
-                similarity = self.calculate_similarity(query_embedding, m['embedding'])
-                similarities.append((m, similarity))
-            # Get top 5 relevant memories
-            top_indices = np.argsort(similarities)[-5:]
-            return [self.memories[i] for i in top_indices]
+            mode = mode or self.memory_config['search_mode']
+            key = ('context', mode, limit, self._query_key(tweet['text']))
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return [dict(conversation) for conversation in cached]
+
+            query_embedding = None
+            if mode == 'lexical':
+                top_ids = [item_id for item_id, _ in self.conversation_lexicon.search(tweet['text'], limit)]
+            else:
+                rows = None
+                if mode == 'hybrid':
+                    # Re-rank only the lexical candidates, fall back to a full scan without any
+                    hits = self.conversation_lexicon.search(
+                        tweet['text'], limit * self.memory_config['hybrid_candidates']
+                    )
+                    if hits:
+                        rows = self.conversation_matrix.rows([item_id for item_id, _ in hits])
+                if not len(self.conversation_matrix):
+                    return []
+                # Tweets from monitor_target_accounts carry their embedding already
+                query_embedding = normalize(
+                    tweet['embedding'] if tweet.get('embedding') is not None else await self._aencode(tweet['text'])
+                )
+
+                # One matrix-vector product over all stored (or candidate) conversation embeddings
+                similarities = self.conversation_matrix.similarities(query_embedding, rows)
+                top_ids = self.conversation_matrix.top_k(similarities, limit, rows)
+            context = await self.db_executor.run(
+                self._find_in_order, 'conversations', top_ids, {k: 0 for k in EMBEDDING_FIELDS},
+                self.conversation_writer
+            )
+            self.result_cache.put(key, context, self._result_guard(
+                tweet['text'], query_embedding, context, limit, mode, self.conversation_matrix
+            ))
+            return [dict(conversation) for conversation in context]
             
         except Exception as e:
             logger.error(f"Error getting tweet context: {e}", exc_info=True)
             return []
 
+
+_shared: Dict[Tuple[str, str], MemorySystem] = {}
+_shared_lock = threading.Lock()
+
+
+def get_memory_system(mongodb_uri: str = "localhost") -> MemorySystem:
+    """Process-wide MemorySystem for a storage URI, created once.
+
+    Resident matrices, lexicons and caches only see writes made through
+    their own instance, so every component shares this one. Instances are
+    keyed by the store actually opened, after env overrides, so different
+    arguments naming the same database get the same instance.
+    """
+    key = resolve_backend(mongodb_uri=mongodb_uri)
+    with _shared_lock:
+        memory = _shared.get(key)
+        if memory is None:
+            memory = _shared[key] = MemorySystem(mongodb_uri)
+        return memory
+
+
+async def close_memory_systems():
+    """Flush and close every shared MemorySystem, called once at process shutdown"""
+    with _shared_lock:
+        memories = list(_shared.values())
+        _shared.clear()
+    for memory in memories:
+        try:
+            await memory.close()
+        except Exception as e:
+            logger.error(f"Error closing memory system: {e}", exc_info=True)
@@ -0,0 +1,82 @@
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def approximate_tokens(text: str) -> int:
+    """Cheap stand-in for the tokenizer's length, good enough to group similar lengths"""
+    return len(text.split())
+
+
+class MicroBatcher:
+    """Coalesces concurrent encode requests into one model call.
+
+    Requests wait until ``max_batch`` texts are pending or ``max_wait`` seconds
+    have passed since the first of them, whichever comes first. Each group is
+    sorted by length before encoding so similarly sized texts share padded
+    batches, and every caller gets back exactly its own vectors.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], Awaitable[np.ndarray]],
+                 max_batch: int = 64, max_wait: float = 0.005,
+                 length: Callable[[str], int] = approximate_tokens):
+        self.encode_batch = encode_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.length = length
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # The event loop only holds weak references to tasks
+        self._batch_tasks = set()
+        self.requests = 0
+        self.batches = 0
+
+    async def submit(self, texts: Sequence[str]) -> np.ndarray:
+        """Vectors for texts, encoded together with whatever else is in flight"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures and timers belong to the loop that created them
+            self._pending, self._timer, self._loop = [], None, loop
+            self._batch_tasks = set()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return np.stack(await asyncio.gather(*futures))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch):
+            task = asyncio.ensure_future(self._run(pending[start:start + self.max_batch]))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run(self, group: List[Tuple[str, asyncio.Future]]):
+        order = sorted(range(len(group)), key=lambda i: self.length(group[i][0]))
+        self.batches += 1
+        try:
+            vectors = await self.encode_batch([group[i][0] for i in order])
+        except Exception as e:
+            logger.error(f"Error encoding batch of {len(group)} texts: {e}", exc_info=True)
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for position, i in enumerate(order):
+            future = group[i][1]
+            if not future.done():
+                future.set_result(vectors[position])
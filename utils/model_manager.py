@@ -1,62 +1,314 @@
-from sentence_transformers import SentenceTransformer
-from typing import Dict, List
+from typing import Dict, List, Optional
+import importlib.util
 import numpy as np
-from functools import lru_cache
 import logging
+import os
+import threading
+import time
+
+from utils.db_executor import BoundedExecutor
+from utils.embedding_cache import EmbeddingCache
+from utils.micro_batcher import MicroBatcher
+from utils.projection import Projection, load_projection
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = 'all-mpnet-base-v2'
+# torch: fp32 PyTorch; onnx: exported ONNX Runtime graph; onnx-int8: dynamically quantized ONNX
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+# Texts whose embeddings stand for each theme in relevance scoring
+THEME_DESCRIPTIONS = {
+    'technological': 'AI technology digital innovation future',
+    'spiritual': 'consciousness spirit soul awakening metaphysical',
+    'philosophical': 'reality truth existence meaning perception'
+}
+
+
+def _sentence_transformer(*args, **kwargs):
+    # Imported on first load: sentence_transformers pulls in torch and transformers, seconds of startup
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(*args, **kwargs)
+
+
 class ModelManager:
     _instance = None
     _model = None
     _theme_embeddings = None
-    
+    _cache: Optional[EmbeddingCache] = None
+    _executor: Optional[BoundedExecutor] = None
+    _batcher: Optional[MicroBatcher] = None
+    # False until EMBEDDING_PROJECTION_PATH has been read, then the projection or None
+    _projection = False
+    backend = 'torch'
+    _load_lock = threading.Lock()
+    # Encoder invocations and texts encoded since startup, across all callers
+    encode_calls = 0
+    encoded_texts = 0
+
     def __new__(cls):
+        # Construction is cheap; the model loads on first use or through warm_up()
         if cls._instance is None:
             logger.info("Initializing ModelManager singleton")
             cls._instance = super(ModelManager, cls).__new__(cls)
-            # Load model once
-            cls._model = SentenceTransformer('all-mpnet-base-v2')
-            cls._theme_embeddings = cls._initialize_theme_embeddings()
         return cls._instance
 
+    @classmethod
+    def load(cls):
+        """Load the model, embedding cache and theme embeddings once; safe to call from any thread"""
+        if cls._theme_embeddings is not None:
+            return
+        with cls._load_lock:
+            if cls._theme_embeddings is not None:
+                return
+            started = time.perf_counter()
+            # Load model once, or once per worker process when ENCODER_PROCESSES is set
+            processes = int(os.environ.get('ENCODER_PROCESSES', 0))
+            cls._model = cls._start_pool(processes) if processes > 0 else cls._load_model()
+            cls._cache = cls._open_cache()
+            cls._check_projection()
+            cls._theme_embeddings = cls._initialize_theme_embeddings()
+            logger.info(f"Encoder ready in {time.perf_counter() - started:.1f}s ({cls.backend})")
+
+    @classmethod
+    async def warm_up(cls):
+        """Load the model on the encoder thread while the event loop keeps running"""
+        await cls._encoder_executor().run(cls.load)
+
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._theme_embeddings is not None
+
+    @classmethod
+    def _load_model(cls):
+        """Load the encoder for ENCODER_BACKEND, exporting the ONNX variants on first use"""
+        backend = os.environ.get('ENCODER_BACKEND', 'torch')
+        if backend not in BACKENDS:
+            logger.error(f"Unknown encoder backend {backend!r}, expected one of {BACKENDS}")
+            backend = 'torch'
+        if backend != 'torch' and not all(importlib.util.find_spec(name) for name in ('onnxruntime', 'optimum')):
+            logger.warning(f"Encoder backend {backend} needs optimum[onnxruntime], falling back to torch")
+            backend = 'torch'
+        if backend != 'torch':
+            try:
+                model = cls._load_onnx(quantized=backend == 'onnx-int8')
+                cls.backend = backend
+                return model
+            except Exception as e:
+                logger.error(f"Error loading {backend} encoder, falling back to torch: {e}", exc_info=True)
+        cls.backend = 'torch'
+        return _sentence_transformer(MODEL_NAME)
+
+    @classmethod
+    def projection(cls) -> Optional[Projection]:
+        """Dimensionality reduction applied to every vector encode returns, read without loading the model"""
+        if cls._projection is False:
+            cls._projection = load_projection()
+        return cls._projection
+
+    @classmethod
+    def _model_dimension(cls) -> Optional[int]:
+        return getattr(cls._model, 'get_sentence_embedding_dimension', lambda: None)()
+
+    @classmethod
+    def _check_projection(cls):
+        projection = cls.projection()
+        dimension = cls._model_dimension()
+        if projection is not None and dimension is not None and projection.source_dim != dimension:
+            raise ValueError(
+                f"Embedding projection {projection.version} expects {projection.source_dim}-dim vectors, "
+                f"{MODEL_NAME} produces {dimension}"
+            )
+
+    @classmethod
+    def _start_pool(cls, processes: int):
+        from utils.encoder_pool import EncoderPool
+
+        pool = EncoderPool(processes)
+        cls.backend = pool.backend
+        return pool
+
+    @classmethod
+    def _load_onnx(cls, quantized: bool):
+        """ONNX Runtime encoder, exported once into ENCODER_EXPORT_DIR and reused afterwards"""
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        export_dir = os.path.join(os.environ.get('ENCODER_EXPORT_DIR', 'models'), f'{MODEL_NAME}-onnx')
+        if not os.path.exists(os.path.join(export_dir, 'onnx', 'model.onnx')):
+            logger.info(f"Exporting {MODEL_NAME} to ONNX in {export_dir}")
+            _sentence_transformer(MODEL_NAME, backend='onnx').save_pretrained(export_dir)
+        if not quantized:
+            return _sentence_transformer(export_dir, backend='onnx')
+
+        config = cls._quantization()
+        file_name = f'model_qint8_{config}.onnx'
+        if not os.path.exists(os.path.join(export_dir, 'onnx', file_name)):
+            logger.info(f"Quantizing {MODEL_NAME} to int8 for {config}")
+            export_dynamic_quantized_onnx_model(_sentence_transformer(export_dir, backend='onnx'), config, export_dir)
+        return _sentence_transformer(export_dir, backend='onnx', model_kwargs={'file_name': f'onnx/{file_name}'})
+
+    @staticmethod
+    def _quantization() -> str:
+        return os.environ.get('ENCODER_QUANTIZATION', 'avx2')
+
+    @classmethod
+    def model_tag(cls) -> str:
+        """Names the weights that produced a vector, so backends never share cached embeddings"""
+        if cls.backend == 'torch':
+            return MODEL_NAME
+        if cls.backend == 'onnx-int8':
+            return f'{MODEL_NAME}:{cls.backend}:{cls._quantization()}'
+        return f'{MODEL_NAME}:{cls.backend}'
+
+    @classmethod
+    def _open_cache(cls) -> Optional[EmbeddingCache]:
+        """Persistent embedding cache, EMBEDDING_CACHE_PATH='' disables it"""
+        path = os.environ.get('EMBEDDING_CACHE_PATH', 'embedding_cache.db')
+        if not path:
+            return None
+        dimension = cls._model_dimension()
+        return EmbeddingCache(
+            path, cls.model_tag(), dimension,
+            max_bytes=int(os.environ.get('EMBEDDING_CACHE_MB', 32)) * 1024 * 1024,
+            max_entries=int(os.environ.get('EMBEDDING_CACHE_MAX_ENTRIES', 100000))
+        )
+
     @classmethod
     def get_model(cls):
-        if cls._instance is None:
-            cls._instance = ModelManager()
+        cls.load()
         return cls._model
 
     @classmethod
-    @lru_cache(maxsize=1000)
     def encode_text(cls, text: str) -> np.ndarray:
-        """Cache encoded text to avoid repeated computations"""
-        if cls._instance is None:
-            cls._instance = ModelManager()
-        return cls._model.encode(text, convert_to_tensor=True)
+        """Encode one text, served from the embedding cache when seen before"""
+        return cls.encode(text)
+
+    @classmethod
+    def encode(cls, texts, batch_size: int = 32, full: bool = False, **kwargs):
+        """Encode a text or list of texts as NumPy arrays; only cache misses reach the model.
+
+        Vectors pass through the embedding projection when one is configured,
+        unless ``full`` asks for the model's own dimension.
+        """
+        cls.load()
+        return cls._encode(texts, batch_size=batch_size, full=full, **kwargs)
 
     @classmethod
-    def batch_encode(cls, texts: List[str], batch_size: int = 32) -> List[np.ndarray]:
+    def _encode(cls, texts, batch_size: int = 32, full: bool = False, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors = cls._encode_full(texts, batch_size, **kwargs)
+        # The cache holds full vectors, so changing the projection never invalidates it
+        if not full and cls.projection() is not None:
+            vectors = cls.projection().apply(vectors)
+        return vectors[0] if single else vectors
+
+    @classmethod
+    def _encode_full(cls, texts: List[str], batch_size: int, **kwargs) -> np.ndarray:
+        if not texts:
+            return cls._empty_vectors(full=True)
+        # Cached vectors are keyed by text alone, so encode options such as
+        # normalize_embeddings bypass the cache rather than mix with its vectors
+        if cls._cache is None or kwargs:
+            cls._count(len(texts))
+            return np.asarray(cls._model.encode(texts, batch_size=batch_size, **kwargs), dtype=np.float32)
+
+        cached = cls._cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if missing:
+            cls._count(len(missing))
+            encoded = np.asarray(cls._model.encode(missing, batch_size=batch_size, **kwargs), dtype=np.float32)
+            cls._cache.put_many(missing, encoded)
+            by_text = dict(zip(missing, encoded))
+            cached = [vector if vector is not None else by_text[text] for text, vector in zip(texts, cached)]
+        return np.stack(cached)
+
+    @classmethod
+    def _empty_vectors(cls, full: bool = False) -> np.ndarray:
+        """What encoding no texts returns, shaped like any other result"""
+        projection = None if full else cls.projection()
+        if projection is not None:
+            return np.empty((0, projection.dim), dtype=np.float32)
+        dimension = cls._model_dimension() or (cls._cache.dim if cls._cache is not None else None)
+        return np.empty((0, dimension or 0), dtype=np.float32)
+
+    @classmethod
+    def _encoder_executor(cls) -> BoundedExecutor:
+        """Inference pool for async callers; ENCODER_MAX_PENDING bounds the queue"""
+        if cls._executor is None:
+            cls._executor = BoundedExecutor(
+                max_workers=int(os.environ.get('ENCODER_THREADS', 1)),
+                max_pending=int(os.environ.get('ENCODER_MAX_PENDING', 16)),
+                thread_name_prefix='encoder'
+            )
+        return cls._executor
+
+    @classmethod
+    def _micro_batcher(cls) -> MicroBatcher:
+        """Groups concurrent small requests for up to ENCODER_MAX_BATCH texts or ENCODER_MAX_WAIT_MS"""
+        if cls._batcher is None:
+            cls._batcher = MicroBatcher(
+                lambda texts: cls._encoder_executor().run(cls.encode, texts),
+                max_batch=int(os.environ.get('ENCODER_MAX_BATCH', 64)),
+                max_wait=float(os.environ.get('ENCODER_MAX_WAIT_MS', 5)) / 1000
+            )
+        return cls._batcher
+
+    @classmethod
+    async def aencode(cls, texts, batch_size: int = 32, **kwargs):
+        """Awaitable encode that runs inference off the event loop.
+
+        Small requests are coalesced with concurrent ones into a single model
+        call; full batches and calls with extra encode options go straight to
+        the encoder pool.
+        """
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return cls._empty_vectors(kwargs.get('full', False))
+        batcher = cls._micro_batcher()
+        if kwargs or len(batch) >= batcher.max_batch:
+            return await cls._encoder_executor().run(cls.encode, texts, batch_size=batch_size, **kwargs)
+        vectors = await batcher.submit(batch)
+        return vectors[0] if single else vectors
+
+    @classmethod
+    async def abatch_encode(cls, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return await cls.aencode(list(texts), batch_size=batch_size)
+
+    @classmethod
+    def _count(cls, texts: int):
+        cls.encode_calls += 1
+        cls.encoded_texts += texts
+
+    @classmethod
+    def batch_encode(cls, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """Encode multiple texts in batches efficiently"""
-        if cls._instance is None:
-            cls._instance = ModelManager()
-        return cls._model.encode(texts, batch_size=batch_size, convert_to_tensor=True)
+        return cls.encode(texts, batch_size=batch_size)
+
+    @classmethod
+    def cache_stats(cls) -> Dict:
+        """Hit rate of the persistent embedding cache"""
+        return cls._cache.stats() if cls._cache is not None else {}
+
+    @classmethod
+    def batching_stats(cls) -> Dict:
+        """Requests served per model call by the micro-batcher"""
+        if cls._batcher is None:
+            return {}
+        return {
+            'requests': cls._batcher.requests,
+            'batches': cls._batcher.batches,
+            'requests_per_batch': cls._batcher.requests / cls._batcher.batches if cls._batcher.batches else 0.0
+        }
 
     @classmethod
     def get_theme_embeddings(cls):
-        if cls._instance is None:
-            cls._instance = ModelManager()
+        cls.load()
         return cls._theme_embeddings
 
     @classmethod
     def _initialize_theme_embeddings(cls) -> Dict[str, np.ndarray]:
         """Initialize theme embeddings once"""
-        themes = {
-            'technological': 'AI technology digital innovation future',
-            'spiritual': 'consciousness spirit soul awakening metaphysical',
-            'philosophical': 'reality truth existence meaning perception'
-        }
-        return {
-            theme: cls._model.encode(desc, convert_to_tensor=True)
-            for theme, desc in themes.items()
-        } 
\ No newline at end of file
+        vectors = cls._encode(list(THEME_DESCRIPTIONS.values()))
+        return dict(zip(THEME_DESCRIPTIONS, vectors))
@@ -0,0 +1,115 @@
+from typing import Dict, Optional
+import logging
+import os
+import threading
+import time
+from pymongo import monitoring
+from pymongo.mongo_client import MongoClient
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionCounter(monitoring.ConnectionPoolListener):
+    """Counts sockets opened and closed by every registered client's pools"""
+
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+
+    @property
+    def open(self) -> int:
+        return self.created - self.closed
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def connection_closed(self, event):
+        self.closed += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+connection_counter = ConnectionCounter()
+_clients: Dict[str, MongoClient] = {}
+_startup_seconds: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def get_client(uri: Optional[str] = None, max_pool_size: Optional[int] = None,
+               min_pool_size: Optional[int] = None) -> MongoClient:
+    """Process-wide pooled client for a URI, created and health-checked once.
+
+    Pool sizes come from the arguments or MONGODB_MAX_POOL_SIZE /
+    MONGODB_MIN_POOL_SIZE; the first caller for a URI decides them.
+    """
+    uri = uri or os.environ.get('MONGODB_URI', 'localhost')
+    with _lock:
+        client = _clients.get(uri)
+        if client is not None:
+            return client
+
+        started = time.perf_counter()
+        client = MongoClient(
+            uri,
+            maxPoolSize=max_pool_size or int(os.environ.get('MONGODB_MAX_POOL_SIZE', 50)),
+            minPoolSize=min_pool_size or int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0)),
+            event_listeners=[connection_counter]
+        )
+        # Send a ping to confirm a successful connection
+        try:
+            client.admin.command('ping')
+            logger.info("Pinged your deployment. You successfully connected to MongoDB!")
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}", exc_info=True)
+        _startup_seconds[uri] = time.perf_counter() - started
+        _clients[uri] = client
+        return client
+
+
+def get_database(uri: Optional[str] = None, name: str = 'oracle'):
+    return get_client(uri)[name]
+
+
+def connection_stats() -> Dict:
+    """Registered clients, open sockets across their pools and per-client startup time"""
+    with _lock:
+        return {
+            'clients': len(_clients),
+            'open_connections': connection_counter.open,
+            'connections_created': connection_counter.created,
+            'startup_seconds': sum(_startup_seconds.values())
+        }
+
+
+def close_clients():
+    """Close every registered client, called once at process shutdown"""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _startup_seconds.clear()
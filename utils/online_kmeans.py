@@ -0,0 +1,61 @@
+from typing import Optional
+import numpy as np
+
+
+class OnlineKMeans:
+    """Mini-batch spherical k-means over normalized embeddings.
+
+    Centroids are updated with a per-centroid learning rate of
+    ``weight / count`` (Sculley's mini-batch k-means), so each batch costs
+    O(batch x k x dim) no matter how many points were seen before.
+    The first ``k`` distinct points seed the centroids.
+    """
+
+    def __init__(self, k: int, dim: Optional[int] = None, seed: int = 0):
+        self.k = k
+        self.dim = dim
+        self._rng = np.random.default_rng(seed)
+        self.centroids = np.zeros((0, dim or 0), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.float64)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _seed(self, vectors: np.ndarray) -> np.ndarray:
+        """Use the first points of the stream as initial centroids"""
+        if self.centroids.shape[1] != vectors.shape[1]:
+            self.dim = vectors.shape[1]
+            self.centroids = np.zeros((0, self.dim), dtype=np.float32)
+        missing = self.k - len(self.centroids)
+        if missing <= 0:
+            return vectors
+        picks = self._rng.permutation(len(vectors))[:missing]
+        self.centroids = np.vstack([self.centroids, vectors[picks]])
+        self.counts = np.concatenate([self.counts, np.zeros(len(picks))])
+        return vectors
+
+    def predict(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(self._normalize(vectors) @ self.centroids.T, axis=1)
+
+    def partial_fit(self, vectors: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Update centroids with one batch, returns the batch's cluster assignments"""
+        vectors = self._seed(self._normalize(vectors))
+        weights = np.ones(len(vectors)) if weights is None else np.asarray(weights, dtype=np.float64)
+        assignments = self.predict(vectors)
+
+        for cluster in np.unique(assignments):
+            members = assignments == cluster
+            batch_weight = weights[members].sum()
+            self.counts[cluster] += batch_weight
+            rate = batch_weight / self.counts[cluster]
+            batch_mean = np.average(vectors[members], axis=0, weights=weights[members])
+            self.centroids[cluster] = (1 - rate) * self.centroids[cluster] + rate * batch_mean
+
+        self.centroids = self._normalize(self.centroids)
+        return assignments
@@ -0,0 +1,160 @@
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import numpy as np
+from pymongo import UpdateOne
+
+from utils.embedding_codec import EMBEDDING_FIELDS, decode_embedding, encode_embedding
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_METHODS = ('pca', 'random')
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class Projection:
+    """Linear map from the encoder's space to a smaller one, fitted on the stored corpus.
+
+    ``version`` names the exact map. Stored vectors carry it in
+    ``embedding_projection`` so vectors produced by different maps are never
+    compared with each other.
+    """
+
+    def __init__(self, method: str, mean: np.ndarray, components: np.ndarray,
+                 explained_variance: Optional[float] = None):
+        self.method = method
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.explained_variance = explained_variance
+        digest = hashlib.sha1(self.mean.tobytes() + self.components.tobytes()).hexdigest()[:10]
+        self.version = f"{method}{self.dim}-{digest}"
+
+    @property
+    def source_dim(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dim: int, method: str = 'pca', seed: int = 0) -> 'Projection':
+        """PCA keeps the corpus's principal directions; random is an orthonormal Gaussian map"""
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Unsupported projection method: {method}")
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        source_dim = vectors.shape[1]
+        if not 0 < dim < source_dim:
+            raise ValueError(f"Projection dim must be between 1 and {source_dim - 1}, got {dim}")
+
+        if method == 'random':
+            gaussian = np.random.default_rng(seed).standard_normal((source_dim, dim))
+            components, _ = np.linalg.qr(gaussian)
+            return cls(method, np.zeros(source_dim), components)
+
+        if len(vectors) < dim:
+            raise ValueError(f"PCA to {dim} dims needs at least {dim} vectors, got {len(vectors)}")
+        mean = vectors.mean(axis=0)
+        _, singular, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        variance = singular ** 2
+        return cls(method, mean, vt[:dim].T, float(variance[:dim].sum() / variance.sum()))
+
+    def apply(self, vectors: np.ndarray) -> np.ndarray:
+        """Project one vector or a batch; outputs are unit length like the stored embeddings"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return _normalize((vectors - self.mean) @ self.components).astype(np.float32)
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            np.savez(f, method=self.method, mean=self.mean, components=self.components,
+                     explained_variance=np.nan if self.explained_variance is None else self.explained_variance)
+
+    @classmethod
+    def load(cls, path: str) -> 'Projection':
+        with np.load(path) as data:
+            explained = float(data['explained_variance'])
+            return cls(str(data['method']), data['mean'], data['components'],
+                       None if np.isnan(explained) else explained)
+
+
+def load_projection(path: Optional[str] = None) -> Optional[Projection]:
+    """The projection at EMBEDDING_PROJECTION_PATH, None when unset or missing"""
+    path = os.environ.get('EMBEDDING_PROJECTION_PATH', '') if path is None else path
+    if not path:
+        return None
+    if not os.path.exists(path):
+        logger.warning(f"Embedding projection {path} not found, using full-dimension embeddings")
+        return None
+    projection = Projection.load(path)
+    logger.info(f"Using embedding projection {projection.version} ({projection.source_dim} -> {projection.dim} dims)")
+    return projection
+
+
+def ranking_agreement(queries: np.ndarray, corpus: np.ndarray, projection: Projection, k: int = 10) -> Dict:
+    """How closely projected cosine ranking reproduces the full-dimension ranking of corpus for each query"""
+    queries, corpus = _normalize(queries), _normalize(corpus)
+    full = queries @ corpus.T
+    reduced = projection.apply(queries) @ projection.apply(corpus).T
+    k = min(k, corpus.shape[0])
+    full_top = np.argsort(-full, axis=1)[:, :k]
+    reduced_top = np.argsort(-reduced, axis=1)[:, :k]
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(full_top, reduced_top)]
+    correlation = [np.corrcoef(a, b)[0, 1] for a, b in zip(full, reduced)]
+    return {
+        'queries': len(queries),
+        'corpus': len(corpus),
+        'recall_at_1': float(np.mean(full_top[:, 0] == reduced_top[:, 0])),
+        f'recall_at_{k}': float(np.mean(overlap)),
+        'score_correlation': float(np.nanmean(correlation)),
+        'size_reduction': projection.source_dim / projection.dim
+    }
+
+
+def sample_full_vectors(collections, size: int) -> np.ndarray:
+    """Random unprojected embeddings from MongoDB collections, the corpus a projection is fitted on"""
+    vectors: List[np.ndarray] = []
+    for collection in collections:
+        pipeline = [
+            {'$match': {'embedding': {'$exists': True}, 'embedding_projection': {'$exists': False}}},
+            {'$sample': {'size': size}},
+            {'$project': EMBEDDING_FIELDS}
+        ]
+        vectors += [decode_embedding(doc) for doc in collection.aggregate(pipeline)]
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    dims = {len(vector) for vector in vectors}
+    if len(dims) > 1:
+        raise ValueError(f"Stored embeddings have mixed dimensions {sorted(dims)}")
+    return np.stack(vectors)[:size]
+
+
+def project_collection(collection, projection: Projection, batch_size: int = 500) -> Tuple[int, int]:
+    """Rewrite full-dimension embeddings in place through projection.
+
+    Returns (projected, skipped); skipped documents were written under another
+    projection and cannot be converted without re-encoding their text.
+    """
+    projected = skipped = 0
+    updates: List[UpdateOne] = []
+    query = {'embedding': {'$exists': True}, 'embedding_projection': {'$ne': projection.version}}
+    for doc in collection.find(query, EMBEDDING_FIELDS):
+        vector = decode_embedding(doc)
+        if doc.get('embedding_projection') is not None or len(vector) != projection.source_dim:
+            skipped += 1
+            continue
+        fields = encode_embedding(projection.apply(vector), doc.get('embedding_dtype', 'float32'))
+        fields['embedding_projection'] = projection.version
+        updates.append(UpdateOne({'_id': doc['_id']}, {'$set': fields}))
+        if len(updates) >= batch_size:
+            projected += collection.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        projected += collection.bulk_write(updates, ordered=False).modified_count
+    logger.info(f"Projected {projected} embeddings in {collection.name} to {projection.version}, skipped {skipped}")
+    return projected, skipped
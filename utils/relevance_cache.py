@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
+import logging
+import sqlite3
+import threading
+import time
+import numpy as np
+
+from utils.embedding_cache import content_key
+from utils.sqlite_lru import SQLiteRowCap
+from utils.types import RelevanceScore
+
+logger = logging.getLogger(__name__)
+
+
+class RelevanceCache:
+    """Relevance scores and embeddings of tweets already analyzed, persisted in SQLite.
+
+    Entries are keyed by tweet id, the SHA-256 of the tweet text and
+    ``version``, which names the themes, keywords, weights and embedding space
+    that produced the score. An edited tweet or a changed theme config misses.
+    The table keeps roughly the ``max_entries`` most recently seen tweets.
+    """
+
+    def __init__(self, path: str, version: str, max_entries: int = 10000):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.row_cap = SQLiteRowCap('relevance', 'seen', max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS relevance ("
+                "version TEXT NOT NULL, tweet_id TEXT NOT NULL, text_key TEXT NOT NULL, "
+                "relevance TEXT NOT NULL, vector BLOB NOT NULL, seen REAL NOT NULL, "
+                "PRIMARY KEY (version, tweet_id, text_key))"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS relevance_seen ON relevance (seen)")
+
+    def get_many(self, tweets: Sequence[Tuple[str, str]]) -> List[Optional[Tuple[RelevanceScore, np.ndarray]]]:
+        """(relevance, embedding) per (tweet id, text) in order, None where the tweet still has to be scored"""
+        keys = [(str(tweet_id), content_key(text)) for tweet_id, text in tweets]
+        found: Dict[Tuple[str, str], Tuple[RelevanceScore, np.ndarray]] = {}
+        with self._lock, self.conn:
+            distinct = list(dict.fromkeys(keys))
+            for start in range(0, len(distinct), 400):
+                chunk = distinct[start:start + 400]
+                clause = ' OR '.join(['(tweet_id = ? AND text_key = ?)'] * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT tweet_id, text_key, relevance, vector FROM relevance WHERE version = ? AND ({clause})",
+                    (self.version, *[part for key in chunk for part in key])
+                ).fetchall()
+                for tweet_id, text_key, relevance, blob in rows:
+                    found[(tweet_id, text_key)] = (json.loads(relevance), np.frombuffer(blob, dtype=np.float32))
+            if found:
+                # Refresh recency so tweets still being fetched are the last to be evicted
+                self.conn.executemany(
+                    "UPDATE relevance SET seen = ? WHERE version = ? AND tweet_id = ? AND text_key = ?",
+                    [(time.time(), self.version, *key) for key in found]
+                )
+        self.hits += sum(key in found for key in keys)
+        self.misses += sum(key not in found for key in keys)
+        return [found.get(key) for key in keys]
+
+    def put_many(self, tweets: Sequence[Tuple[str, str]], relevance: Sequence[RelevanceScore], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(tweets), -1)
+        now = time.time()
+        rows = [
+            (self.version, str(tweet_id), content_key(text), json.dumps(score), vector.tobytes(), now)
+            for (tweet_id, text), score, vector in zip(tweets, relevance, vectors)
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO relevance VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.row_cap.inserted(self.conn, len(rows))
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,99 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+from collections import OrderedDict
+import sys
+import time
+import numpy as np
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size in bytes of cached query results"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class ResultCache:
+    """LRU cache bounded by an approximate byte budget rather than an entry count.
+
+    Every entry carries ``meta``, which the owner inspects in
+    ``invalidate_where`` to drop exactly the entries a write can affect.
+    With ``ttl`` set, entries also expire that many seconds after being
+    stored, bounding staleness from writes the owner never sees.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = estimate_size,
+                 ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any, int, float]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[3] <= self.clock():
+            self._drop(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, meta: Any = None):
+        size = self.sizeof(value) + self.sizeof(meta)
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        expires = self.clock() + self.ttl if self.ttl is not None else float('inf')
+        self._entries[key] = (value, meta, size, expires)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[2]
+        return True
+
+    def invalidate(self, keys: Iterable):
+        for key in keys:
+            self.invalidations += self._drop(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]):
+        """Drop every entry for which predicate(key, meta) is true"""
+        self.invalidate([key for key, (_, meta, _, _) in self._entries.items() if predicate(key, meta)])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'expirations': self.expirations
+        }
@@ -0,0 +1,38 @@
+from typing import Optional
+import sqlite3
+
+
+class SQLiteRowCap:
+    """Bounds a SQLite cache table, evicting the rows least recently used first.
+
+    ``order_column`` holds each row's last-use time. Counting rows scans the
+    table, so the count runs once per ``slack`` inserted rows rather than on
+    every insert; between checks the table may exceed ``max_rows`` by up to
+    ``slack`` rows.
+    """
+
+    def __init__(self, table: str, order_column: str, max_rows: int, slack: Optional[int] = None):
+        self.table = table
+        self.order_column = order_column
+        self.max_rows = max_rows
+        self.slack = slack if slack is not None else max(1, max_rows // 10)
+        # The first insert checks, trimming files written under a larger cap
+        self._inserted = self.slack
+        self.evictions = 0
+
+    def inserted(self, conn: sqlite3.Connection, rows: int) -> int:
+        """Record rows just written on conn, evicting past the cap when a check is due; returns rows evicted"""
+        self._inserted += rows
+        if self._inserted < self.slack:
+            return 0
+        self._inserted = 0
+        excess = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_rows
+        if excess <= 0:
+            return 0
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE rowid IN "
+            f"(SELECT rowid FROM {self.table} ORDER BY {self.order_column} LIMIT ?)",
+            (excess,)
+        )
+        self.evictions += excess
+        return excess
@@ -0,0 +1,519 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import numpy as np
+from bson import ObjectId, json_util
+from bson.json_util import JSONMode, JSONOptions
+from pymongo import ASCENDING, DESCENDING
+
+from utils.embedding_codec import decode_embedding
+from utils.memory_ranking import EPOCH, decay_key, ensure_ranking_indexes, epoch_days, prefilter_candidates
+from utils.mongo_registry import get_client
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ('memories', 'conversations', 'trends', 'engagement')
+
+
+class StorageBackend(ABC):
+    """Persistence operations MemorySystem relies on.
+
+    Methods are blocking; MemorySystem runs them on its DatabaseExecutor.
+    Documents are plain dicts keyed by ``_id`` as they would be in MongoDB,
+    and every "recent" query returns newest first.
+    """
+
+    supports_vector_search = False
+    # manage.py's maintenance commands rewrite MongoDB collections only
+    supports_maintenance_commands = False
+
+    def ensure_indexes(self):
+        pass
+
+    @abstractmethod
+    def insert_many(self, collection: str, docs: List[Dict]):
+        ...
+
+    @abstractmethod
+    def find_by_ids(self, collection: str, ids: List, projection: Optional[Dict] = None) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def find_recent(self, collection: str, since: Optional[datetime] = None,
+                    limit: Optional[int] = None, author: Optional[str] = None,
+                    until: Optional[datetime] = None) -> List[Dict]:
+        """Documents between since and until (and by author, for conversations), newest first"""
+
+    @abstractmethod
+    def iter_documents(self, collection: str, projection: Optional[Dict] = None) -> Iterable[Dict]:
+        ...
+
+    @abstractmethod
+    def update_importance(self, collection: str, doc_id, importance: float, decay: float):
+        """Set importance and recompute decay_key from the stored timestamp"""
+
+    @abstractmethod
+    def count(self, collection: str, since: Optional[datetime] = None) -> int:
+        ...
+
+    @abstractmethod
+    def count_by_type(self, collection: str) -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    def count_by_bucket(self, collection: str, since: datetime, bucket_seconds: int) -> Dict[int, int]:
+        """Counts of documents newer than since, keyed by epoch seconds // bucket_seconds"""
+
+    @abstractmethod
+    def lowest_ranked_ids(self, collection: str, limit: int) -> List:
+        """Ids of the least important, then oldest, documents"""
+
+    @abstractmethod
+    def delete_ids(self, collection: str, ids: List) -> int:
+        ...
+
+    @abstractmethod
+    def prefilter_candidates(self, collection: str, since: datetime,
+                             recent_limit: int, top_limit: int) -> List[Dict]:
+        ...
+
+    def vector_search(self, collection: str, query: np.ndarray, k: int) -> List[Tuple[object, float]]:
+        """Nearest neighbours by cosine similarity, only where supports_vector_search is set"""
+        raise NotImplementedError(f"{type(self).__name__} has no vector search")
+
+    def close(self):
+        pass
+
+
+def apply_projection(doc: Dict, projection: Optional[Dict]) -> Dict:
+    """Apply a MongoDB-style inclusion or exclusion projection in Python"""
+    if not projection:
+        return doc
+    if any(projection.values()):
+        return {k: v for k, v in doc.items() if k == '_id' or projection.get(k)}
+    return {k: v for k, v in doc.items() if k not in projection}
+
+
+class MongoBackend(StorageBackend):
+    """MongoDB storage, the default for multi-node deployments.
+
+    The client comes from the process-wide registry, so every MemorySystem
+    talking to the same URI shares one connection pool.
+    """
+
+    supports_maintenance_commands = True
+
+    def __init__(self, mongo_uri: str):
+        self.client = get_client(mongo_uri)
+        self.db = self.client.oracle
+
+    def ensure_indexes(self):
+        ensure_ranking_indexes(self.db.memories)
+        self.db.conversations.create_index([('original.author', ASCENDING), ('timestamp', DESCENDING)])
+        self.db.conversations.create_index([('timestamp', DESCENDING)])
+        self.db.trends.create_index([('timestamp', DESCENDING)])
+
+    def insert_many(self, collection: str, docs: List[Dict]):
+        self.db[collection].insert_many(docs, ordered=False)
+
+    def find_by_ids(self, collection: str, ids: List, projection: Optional[Dict] = None) -> List[Dict]:
+        return list(self.db[collection].find({'_id': {'$in': ids}}, projection))
+
+    def find_recent(self, collection: str, since: Optional[datetime] = None,
+                    limit: Optional[int] = None, author: Optional[str] = None,
+                    until: Optional[datetime] = None) -> List[Dict]:
+        query = {}
+        if since is not None:
+            query.setdefault('timestamp', {})['$gte'] = since
+        if until is not None:
+            query.setdefault('timestamp', {})['$lt'] = until
+        if author is not None:
+            query['original.author'] = author
+        cursor = self.db[collection].find(query).sort('timestamp', -1)
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def iter_documents(self, collection: str, projection: Optional[Dict] = None) -> Iterable[Dict]:
+        return self.db[collection].find({}, projection)
+
+    def update_importance(self, collection: str, doc_id, importance: float, decay: float):
+        # Pipeline update so decay_key is recomputed from the stored timestamp
+        epoch_days = {'$divide': [{'$toLong': {'$toDate': '$timestamp'}}, 86400000]}
+        self.db[collection].update_one(
+            {'_id': doc_id},
+            [{'$set': {
+                'importance': importance,
+                'decay_key': {'$subtract': [
+                    math.log(max(importance, 1e-9)),
+                    {'$multiply': [epoch_days, math.log(decay)]}
+                ]}
+            }}]
+        )
+
+    def count(self, collection: str, since: Optional[datetime] = None) -> int:
+        query = {} if since is None else {'timestamp': {'$gte': since}}
+        return self.db[collection].count_documents(query)
+
+    def count_by_type(self, collection: str) -> Dict[str, int]:
+        pipeline = [
+            {'$group': {'_id': '$type', 'count': {'$sum': 1}}}
+        ]
+        return {doc['_id']: doc['count'] for doc in self.db[collection].aggregate(pipeline)}
+
+    def count_by_bucket(self, collection: str, since: datetime, bucket_seconds: int) -> Dict[int, int]:
+        epoch_ms = {'$toLong': {'$toDate': '$timestamp'}}
+        pipeline = [
+            {'$match': {'timestamp': {'$gte': since}}},
+            {'$group': {
+                '_id': {'$floor': {'$divide': [epoch_ms, bucket_seconds * 1000]}},
+                'count': {'$sum': 1}
+            }}
+        ]
+        return {int(doc['_id']): doc['count'] for doc in self.db[collection].aggregate(pipeline)}
+
+    def lowest_ranked_ids(self, collection: str, limit: int) -> List:
+        cursor = self.db[collection].find({}, {'_id': 1}).sort([
+            ('importance', 1),
+            ('timestamp', 1)
+        ]).limit(limit)
+        return [doc['_id'] for doc in cursor]
+
+    def delete_ids(self, collection: str, ids: List) -> int:
+        return self.db[collection].delete_many({'_id': {'$in': ids}}).deleted_count
+
+    def prefilter_candidates(self, collection: str, since: datetime,
+                             recent_limit: int, top_limit: int) -> List[Dict]:
+        return prefilter_candidates(self.db[collection], since, recent_limit, top_limit)
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded single-node storage in one SQLite file (WAL mode).
+
+    Each collection is a table with the ranking inputs as indexed columns,
+    the embedding as a BLOB and the rest of the document as extended JSON.
+    When the sqlite-vec extension can be loaded, embeddings are mirrored into
+    ``vec0`` tables keyed by the document's rowid and ``vector_search``
+    answers KNN queries in SQL; otherwise MemorySystem's resident NumPy
+    matrices do the scoring. A ``vec0`` table's dimension is fixed, so when
+    new vectors arrive with another dimension (e.g. after enabling the
+    embedding projection) the table is rebuilt from the stored vectors of
+    that dimension.
+    """
+
+    _json_options = JSONOptions(json_mode=JSONMode.RELAXED, tz_aware=False)
+
+    def __init__(self, path: str = 'memory.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.supports_vector_search = self._load_vector_extension()
+        with self._lock, self.conn:
+            for name in COLLECTIONS:
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} ("
+                    "rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, "
+                    "timestamp REAL, type TEXT, importance REAL, decay_key REAL, author TEXT, "
+                    "embedding BLOB, doc TEXT NOT NULL)"
+                )
+            # vec0 table name -> dimension, including tables created by earlier runs
+            self._vector_tables: Dict[str, int] = self._existing_vector_tables() if self.supports_vector_search else {}
+
+    def _load_vector_extension(self) -> bool:
+        try:
+            import sqlite_vec
+            self.conn.enable_load_extension(True)
+            sqlite_vec.load(self.conn)
+            self.conn.enable_load_extension(False)
+            return True
+        except (ImportError, AttributeError, sqlite3.Error) as e:
+            logger.info(f"sqlite-vec unavailable, using NumPy scoring: {e}")
+            return False
+
+    def _existing_vector_tables(self) -> Dict[str, int]:
+        tables = {}
+        for name, sql in self.conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE sql LIKE 'CREATE VIRTUAL TABLE%vec0%'"
+        ):
+            dimension = re.search(r'float\[(\d+)\]', sql)
+            if name in {f"vec_{collection}" for collection in COLLECTIONS} and dimension:
+                tables[name] = int(dimension.group(1))
+        return tables
+
+    def ensure_indexes(self):
+        with self._lock, self.conn:
+            for name in COLLECTIONS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_timestamp ON {name} (timestamp DESC)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS memories_decay_key ON memories (decay_key DESC)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS memories_rank ON memories (importance, timestamp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS conversations_author ON conversations (author, timestamp DESC)")
+
+    @staticmethod
+    def _key(doc_id) -> str:
+        return str(doc_id)
+
+    @staticmethod
+    def _restore_id(key: str):
+        return ObjectId(key) if ObjectId.is_valid(key) else key
+
+    def _row(self, doc: Dict) -> Tuple:
+        body = {k: v for k, v in doc.items() if k not in ('_id', 'embedding')}
+        embedding = doc.get('embedding')
+        if isinstance(embedding, list):
+            body['embedding'] = embedding
+            embedding = None
+        timestamp = doc.get('timestamp')
+        original = doc.get('original')
+        return (
+            self._key(doc['_id']),
+            epoch_days(timestamp) * 86400.0 if timestamp is not None else None,
+            doc.get('type'),
+            doc.get('importance'),
+            doc.get('decay_key'),
+            original.get('author') if isinstance(original, dict) else None,
+            bytes(embedding) if embedding is not None else None,
+            json_util.dumps(body, json_options=self._json_options)
+        )
+
+    def _doc(self, key: str, embedding: Optional[bytes], body: str, projection: Optional[Dict] = None) -> Dict:
+        doc = {'_id': self._restore_id(key), **json_util.loads(body, json_options=self._json_options)}
+        if embedding is not None:
+            doc['embedding'] = embedding
+        return apply_projection(doc, projection)
+
+    def _select(self, sql: str, params: Tuple = (), projection: Optional[Dict] = None) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._doc(key, embedding, body, projection) for key, embedding, body in rows]
+
+    def _rows_after(self, collection: str, rowid: int, limit: int) -> List[Tuple]:
+        """Next batch of (rowid, id, embedding, doc) rows in rowid order, the caller holds the lock"""
+        return self.conn.execute(
+            f"SELECT rowid, id, embedding, doc FROM {collection} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (rowid, limit)
+        ).fetchall()
+
+    def insert_many(self, collection: str, docs: List[Dict]):
+        rows = [self._row(doc) for doc in docs]
+        with self._lock, self.conn:
+            # An upsert keeps the rowid the vec0 mirror is keyed by
+            self.conn.executemany(
+                f"INSERT INTO {collection} "
+                "(id, timestamp, type, importance, decay_key, author, embedding, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "timestamp = excluded.timestamp, type = excluded.type, importance = excluded.importance, "
+                "decay_key = excluded.decay_key, author = excluded.author, embedding = excluded.embedding, "
+                "doc = excluded.doc",
+                rows
+            )
+            if self.supports_vector_search:
+                self._index_vectors(collection, docs)
+
+    def _index_vectors(self, collection: str, docs: List[Dict]):
+        table = f"vec_{collection}"
+        vectors = {self._key(doc['_id']): decode_embedding(doc) for doc in docs if doc.get('embedding') is not None}
+        if vectors:
+            dimension = len(next(iter(vectors.values())))
+            if self._vector_tables.get(table) != dimension:
+                self._create_vector_table(collection, dimension)
+        if table not in self._vector_tables:
+            return
+        dimension = self._vector_tables[table]
+        for doc in docs:
+            key = self._key(doc['_id'])
+            rowid = self.conn.execute(f"SELECT rowid FROM {collection} WHERE id = ?", (key,)).fetchone()[0]
+            # Replaced documents drop their old vector, even when the new version has none
+            self.conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+            vector = vectors.get(key)
+            if vector is not None and len(vector) == dimension:
+                self.conn.execute(
+                    f"INSERT INTO {table} (rowid, embedding) VALUES (?, ?)",
+                    (rowid, vector.astype(np.float32).tobytes())
+                )
+
+    def _create_vector_table(self, collection: str, dimension: int):
+        """(Re)create a collection's vec0 mirror and fill it with the stored vectors of that dimension"""
+        table = f"vec_{collection}"
+        if table in self._vector_tables:
+            logger.warning(
+                f"Rebuilding {table} for {dimension}-dim vectors, it held {self._vector_tables[table]}-dim ones"
+            )
+            self.conn.execute(f"DROP TABLE {table}")
+        self.conn.execute(
+            f"CREATE VIRTUAL TABLE {table} USING vec0(embedding float[{dimension}] distance_metric=cosine)"
+        )
+        self._vector_tables[table] = dimension
+        rowid = 0
+        while True:
+            rows = self._rows_after(collection, rowid, 1000)
+            for rowid, key, embedding, body in rows:
+                doc = self._doc(key, embedding, body)
+                if doc.get('embedding') is None:
+                    continue
+                vector = decode_embedding(doc)
+                if len(vector) == dimension:
+                    self.conn.execute(
+                        f"INSERT INTO {table} (rowid, embedding) VALUES (?, ?)",
+                        (rowid, vector.astype(np.float32).tobytes())
+                    )
+            if len(rows) < 1000:
+                return
+
+    def vector_search(self, collection: str, query: np.ndarray, k: int) -> List[Tuple[object, float]]:
+        if not self.supports_vector_search:
+            raise NotImplementedError("sqlite-vec extension is not loaded")
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if self._vector_tables.get(f"vec_{collection}") != len(query):
+            return []
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT c.id, v.distance FROM vec_{collection} v JOIN {collection} c ON c.rowid = v.rowid "
+                "WHERE v.embedding MATCH ? AND k = ? ORDER BY v.distance",
+                (query.tobytes(), k)
+            ).fetchall()
+        return [(self._restore_id(key), 1.0 - distance) for key, distance in rows]
+
+    def find_by_ids(self, collection: str, ids: List, projection: Optional[Dict] = None) -> List[Dict]:
+        if not ids:
+            return []
+        placeholders = ','.join('?' * len(ids))
+        return self._select(
+            f"SELECT id, embedding, doc FROM {collection} WHERE id IN ({placeholders})",
+            tuple(self._key(i) for i in ids), projection
+        )
+
+    def find_recent(self, collection: str, since: Optional[datetime] = None,
+                    limit: Optional[int] = None, author: Optional[str] = None,
+                    until: Optional[datetime] = None) -> List[Dict]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append('timestamp >= ?')
+            params.append(epoch_days(since) * 86400.0)
+        if until is not None:
+            clauses.append('timestamp < ?')
+            params.append(epoch_days(until) * 86400.0)
+        if author is not None:
+            clauses.append('author = ?')
+            params.append(author)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        params.append(limit or -1)
+        return self._select(
+            f"SELECT id, embedding, doc FROM {collection} {where} ORDER BY timestamp DESC LIMIT ?",
+            tuple(params)
+        )
+
+    def iter_documents(self, collection: str, projection: Optional[Dict] = None,
+                       batch_size: int = 1000) -> Iterable[Dict]:
+        """Every document in insertion order, read one batch at a time"""
+        rowid = 0
+        while True:
+            with self._lock:
+                rows = self._rows_after(collection, rowid, batch_size)
+            for rowid, key, embedding, body in rows:
+                yield self._doc(key, embedding, body, projection)
+            if len(rows) < batch_size:
+                return
+
+    def update_importance(self, collection: str, doc_id, importance: float, decay: float):
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                f"SELECT timestamp FROM {collection} WHERE id = ?", (self._key(doc_id),)
+            ).fetchone()
+            if row is None:
+                return
+            key = decay_key(importance, EPOCH + timedelta(seconds=row[0] or 0), decay)
+            self.conn.execute(
+                f"UPDATE {collection} SET importance = ?, decay_key = ?, "
+                "doc = json_set(json_set(doc, '$.importance', ?), '$.decay_key', ?) WHERE id = ?",
+                (importance, key, importance, key, self._key(doc_id))
+            )
+
+    def count(self, collection: str, since: Optional[datetime] = None) -> int:
+        with self._lock:
+            if since is None:
+                return self.conn.execute(f"SELECT COUNT(*) FROM {collection}").fetchone()[0]
+            return self.conn.execute(
+                f"SELECT COUNT(*) FROM {collection} WHERE timestamp >= ?", (epoch_days(since) * 86400.0,)
+            ).fetchone()[0]
+
+    def count_by_type(self, collection: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute(f"SELECT type, COUNT(*) FROM {collection} GROUP BY type").fetchall()
+        return dict(rows)
+
+    def count_by_bucket(self, collection: str, since: datetime, bucket_seconds: int) -> Dict[int, int]:
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT CAST(timestamp / ? AS INTEGER), COUNT(*) FROM {collection} "
+                "WHERE timestamp >= ? GROUP BY 1",
+                (bucket_seconds, epoch_days(since) * 86400.0)
+            ).fetchall()
+        return dict(rows)
+
+    def lowest_ranked_ids(self, collection: str, limit: int) -> List:
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id FROM {collection} ORDER BY importance ASC, timestamp ASC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._restore_id(key) for key, in rows]
+
+    def delete_ids(self, collection: str, ids: List) -> int:
+        if not ids:
+            return 0
+        keys = tuple(self._key(i) for i in ids)
+        placeholders = ','.join('?' * len(keys))
+        with self._lock, self.conn:
+            if f"vec_{collection}" in self._vector_tables:
+                self.conn.execute(
+                    f"DELETE FROM vec_{collection} WHERE rowid IN "
+                    f"(SELECT rowid FROM {collection} WHERE id IN ({placeholders}))", keys
+                )
+            return self.conn.execute(f"DELETE FROM {collection} WHERE id IN ({placeholders})", keys).rowcount
+
+    def prefilter_candidates(self, collection: str, since: datetime,
+                             recent_limit: int, top_limit: int) -> List[Dict]:
+        recent = self._select(
+            f"SELECT id, embedding, doc FROM {collection} WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?",
+            (epoch_days(since) * 86400.0, recent_limit)
+        )
+        important = self._select(
+            f"SELECT id, embedding, doc FROM {collection} WHERE decay_key IS NOT NULL "
+            "ORDER BY decay_key DESC LIMIT ?",
+            (top_limit,)
+        )
+        candidates = {doc['_id']: doc for doc in recent}
+        for doc in important:
+            candidates.setdefault(doc['_id'], doc)
+        return list(candidates.values())
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def resolve_backend(kind: Optional[str] = None, mongodb_uri: str = 'localhost',
+                    sqlite_path: Optional[str] = None) -> Tuple[str, str]:
+    """(kind, location) create_backend would open, after env overrides"""
+    kind = kind or os.environ.get('MEMORY_BACKEND', 'mongodb')
+    if kind == 'mongodb':
+        return kind, os.environ.get('MONGODB_URI') or mongodb_uri
+    if kind == 'sqlite':
+        return kind, os.path.abspath(sqlite_path or os.environ.get('MEMORY_SQLITE_PATH', 'memory.db'))
+    raise ValueError(f"Unknown memory backend: {kind}")
+
+
+def create_backend(kind: Optional[str] = None, mongodb_uri: str = 'localhost',
+                   sqlite_path: Optional[str] = None) -> StorageBackend:
+    """Backend selected by argument or the MEMORY_BACKEND env var ('mongodb' or 'sqlite')"""
+    kind, location = resolve_backend(kind, mongodb_uri, sqlite_path)
+    if kind == 'mongodb':
+        return MongoBackend(location)
+    return SQLiteBackend(location)
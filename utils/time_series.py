@@ -0,0 +1,294 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from datetime import datetime
+import logging
+import math
+import os
+import time
+import uuid
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rollup name -> (bucket seconds, buckets kept): a day of minutes, a month of hours, two years of days
+ROLLUPS = {
+    'minute': (60, 1440),
+    'hour': (3600, 720),
+    'day': (86400, 730)
+}
+
+Timestamp = Union[float, datetime]
+
+
+def _seconds(value: Optional[Timestamp]) -> Optional[float]:
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+class _Ring:
+    """Fixed-capacity columns written in a circle; rows stay in time order starting at the oldest"""
+
+    def __init__(self, capacity: int, columns: Dict[str, Tuple[Tuple[int, ...], Any]]):
+        self.capacity = capacity
+        self.columns = {
+            name: np.full((capacity, *shape), np.nan if dtype == np.float64 else None, dtype=dtype)
+            for name, (shape, dtype) in columns.items()
+        }
+        self.start = 0
+        self.size = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def append(self, **row):
+        position = (self.start + self.size) % self.capacity
+        for name, value in row.items():
+            self.columns[name][position] = value
+        if self.size == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.size += 1
+
+    def _segments(self) -> List[Tuple[int, int]]:
+        """Index ranges holding rows, oldest first"""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return [(self.start, end)]
+        return [(self.start, self.capacity), (0, end - self.capacity)]
+
+    def oldest(self, column: str) -> Optional[float]:
+        return float(self.columns[column][self.start]) if self.size else None
+
+    def pop_oldest(self, count: int) -> Dict[str, np.ndarray]:
+        rows = self.take(column=None, start=None, end=None, limit=count)
+        count = min(count, self.size)
+        self.start = (self.start + count) % self.capacity
+        self.size -= count
+        return rows
+
+    def take(self, column: Optional[str], start: Optional[float], end: Optional[float],
+             limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Rows whose ``column`` lies in [start, end), found by binary search within each segment"""
+        pieces: Dict[str, List[np.ndarray]] = {name: [] for name in self.columns}
+        remaining = self.size if limit is None else limit
+        for low, high in self._segments():
+            if column is not None:
+                keys = self.columns[column][low:high]
+                first = low + (np.searchsorted(keys, start, side='left') if start is not None else 0)
+                last = low + (np.searchsorted(keys, end, side='left') if end is not None else high - low)
+            else:
+                first, last = low, high
+            last = min(last, first + remaining)
+            remaining -= last - first
+            for name, values in self.columns.items():
+                pieces[name].append(values[first:last])
+        return {name: np.concatenate(parts) for name, parts in pieces.items()}
+
+
+class _Rollup:
+    """Count, sum, min, max and last value of every field per fixed-length time bucket"""
+
+    def __init__(self, seconds: int, capacity: int, fields: int):
+        self.seconds = seconds
+        shape = (fields,)
+        self.ring = _Ring(capacity, {
+            'time': ((), np.float64), 'count': (shape, np.float64), 'sum': (shape, np.float64),
+            'min': (shape, np.float64), 'max': (shape, np.float64), 'last': (shape, np.float64)
+        })
+        self.fields = fields
+        self.bucket: Optional[float] = None
+        self._reset()
+
+    def _reset(self):
+        self.count = np.zeros(self.fields)
+        self.sum = np.zeros(self.fields)
+        self.min = np.full(self.fields, np.nan)
+        self.max = np.full(self.fields, np.nan)
+        self.last = np.full(self.fields, np.nan)
+
+    def add(self, timestamp: float, values: np.ndarray):
+        bucket = math.floor(timestamp / self.seconds) * self.seconds
+        if self.bucket is not None and bucket > self.bucket:
+            self._close()
+        if self.bucket is None or bucket > self.bucket:
+            self.bucket = bucket
+        present = ~np.isnan(values)
+        self.count += present
+        self.sum += np.where(present, values, 0.0)
+        self.min = np.fmin(self.min, values)
+        self.max = np.fmax(self.max, values)
+        self.last = np.where(present, values, self.last)
+
+    def _close(self):
+        self.ring.append(time=self.bucket, count=self.count, sum=self.sum, min=self.min, max=self.max, last=self.last)
+        self._reset()
+
+    def take(self, start: Optional[float], end: Optional[float]) -> Dict[str, np.ndarray]:
+        rows = self.ring.take('time', start, end)
+        # The open bucket is partial but already answers queries
+        if self.bucket is not None and (start is None or self.bucket >= start) and (end is None or self.bucket < end):
+            current = {'time': self.bucket, 'count': self.count, 'sum': self.sum,
+                       'min': self.min, 'max': self.max, 'last': self.last}
+            rows = {name: np.concatenate([values, np.asarray(current[name])[None]]) for name, values in rows.items()}
+        return rows
+
+    def oldest(self) -> Optional[float]:
+        return self.ring.oldest('time') if self.ring.size else self.bucket
+
+
+class TimeSeries:
+    """Bounded numeric history with rollups, for state sampled over long agent runs.
+
+    The latest ``capacity`` points sit in a ring buffer at full resolution,
+    each optionally carrying a ``record`` (the original dict) for inspection.
+    Every point also updates minute, hour and day aggregates, each kept in
+    its own fixed-size ring, so memory stays flat however long the run.
+    With ``spill_dir`` set, points leaving the raw ring are appended to one
+    float64 file per column there instead of being dropped; records are
+    memory-only. Each instance spills into its own ``<name>-<started>-<id>``
+    directory, so runs reusing a name never interleave. Points are expected
+    in time order; range queries binary-search the time column.
+    """
+
+    def __init__(self, name: str, fields: Sequence[str], capacity: int = 2880,
+                 rollups: Optional[Dict[str, Tuple[int, int]]] = None, spill_dir: Optional[str] = None,
+                 spill_chunk: int = 256):
+        self.name = name
+        self.fields = list(fields)
+        self.capacity = capacity
+        self.raw = _Ring(capacity, {
+            'time': ((), np.float64), 'values': ((len(self.fields),), np.float64), 'record': ((), object)
+        })
+        self.rollups = {
+            resolution: _Rollup(seconds, buckets, len(self.fields))
+            for resolution, (seconds, buckets) in (rollups or ROLLUPS).items()
+        }
+        if spill_dir is None:
+            spill_dir = os.environ.get('TIME_SERIES_SPILL_DIR', '')
+        # One directory per instance keeps each set of column files sorted by time
+        run = f"{name}-{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.spill_path = os.path.join(spill_dir, run) if spill_dir else None
+        self.spill_chunk = min(spill_chunk, capacity)
+        if self.spill_path:
+            os.makedirs(self.spill_path, exist_ok=True)
+        self.appended = 0
+        self._newest = -math.inf
+
+    def __len__(self) -> int:
+        return self.raw.size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the numeric buffers; records are counted only as references"""
+        return self.raw.nbytes + sum(rollup.ring.nbytes for rollup in self.rollups.values())
+
+    def append(self, values: Dict[str, float], timestamp: Optional[Timestamp] = None, record: Any = None):
+        """Add one point; fields missing from values are stored as NaN and ignored by rollups"""
+        timestamp = time.time() if timestamp is None else _seconds(timestamp)
+        # Buffers are searched by time, so a late point is filed at the newest time seen
+        timestamp = max(timestamp, self._newest)
+        self._newest = timestamp
+        row = np.array([float(values.get(field, np.nan)) for field in self.fields])
+        if self.raw.size == self.capacity and self.spill_path:
+            self._spill(self.raw.pop_oldest(self.spill_chunk))
+        self.raw.append(time=timestamp, values=row, record=record)
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, row)
+        self.appended += 1
+
+    def _spill(self, rows: Dict[str, np.ndarray]):
+        """Append rows to every column file or, on failure, to none of them"""
+        columns = {'time': rows['time'], **{field: rows['values'][:, i] for i, field in enumerate(self.fields)}}
+        sizes = {}
+        try:
+            for column, values in columns.items():
+                path = os.path.join(self.spill_path, f'{column}.f8')
+                sizes[path] = os.path.getsize(path) if os.path.exists(path) else 0
+                with open(path, 'ab') as f:
+                    f.write(np.ascontiguousarray(values, dtype='<f8').tobytes())
+        except OSError as e:
+            logger.error(f"Error spilling {self.name} time series, dropping {len(rows['time'])} points: {e}",
+                         exc_info=True)
+            for path, size in sizes.items():
+                try:
+                    if os.path.exists(path):
+                        os.truncate(path, size)
+                except OSError as truncate_error:
+                    logger.error(f"Error truncating {path}: {truncate_error}", exc_info=True)
+
+    def _spilled(self, start: Optional[float], end: Optional[float]) -> Dict[str, np.ndarray]:
+        empty = {'time': np.zeros(0), 'values': np.zeros((0, len(self.fields)))}
+        path = os.path.join(self.spill_path, 'time.f8') if self.spill_path else None
+        if path is None or not os.path.exists(path) or os.path.getsize(path) == 0:
+            return empty
+        files = [np.memmap(path, dtype='<f8', mode='r')] + [
+            np.memmap(os.path.join(self.spill_path, f'{field}.f8'), dtype='<f8', mode='r') for field in self.fields
+        ]
+        # Rows every column holds, should a failed spill have left one longer
+        rows = min(len(values) for values in files)
+        times = files[0][:rows]
+        first = np.searchsorted(times, start, side='left') if start is not None else 0
+        last = np.searchsorted(times, end, side='left') if end is not None else rows
+        columns = [values[first:last] for values in files[1:]]
+        return {'time': np.array(times[first:last]), 'values': np.stack(columns, axis=1) if columns else empty['values']}
+
+    def _oldest(self, resolution: str) -> Optional[float]:
+        if resolution != 'raw':
+            return self.rollups[resolution].oldest()
+        path = os.path.join(self.spill_path, 'time.f8') if self.spill_path else None
+        if path is not None and os.path.exists(path) and os.path.getsize(path) > 0:
+            return float(np.memmap(path, dtype='<f8', mode='r')[0])
+        return self.raw.oldest('time')
+
+    def resolution_for(self, start: Optional[Timestamp]) -> str:
+        """Finest resolution that still covers start"""
+        start = _seconds(start)
+        for resolution in ['raw', *sorted(self.rollups, key=lambda name: self.rollups[name].seconds)]:
+            oldest = self._oldest(resolution)
+            if oldest is not None and (start is None or oldest <= start):
+                return resolution
+        return 'raw'
+
+    def range(self, start: Optional[Timestamp] = None, end: Optional[Timestamp] = None,
+              resolution: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Points with start <= time < end.
+
+        Raw results map 'time' and each field to an array. Rollup results give,
+        per bucket, 'time' (bucket start), 'count' and '<field>_mean',
+        '<field>_min', '<field>_max' and '<field>_last'. Without a resolution,
+        the finest one reaching back to start is used.
+        """
+        start, end = _seconds(start), _seconds(end)
+        resolution = resolution or self.resolution_for(start)
+        if resolution == 'raw':
+            rows = self.raw.take('time', start, end)
+            if self.spill_path and (start is None or (self.raw.oldest('time') or math.inf) > start):
+                spilled = self._spilled(start, end)
+                rows = {'time': np.concatenate([spilled['time'], rows['time']]),
+                        'values': np.concatenate([spilled['values'], rows['values']])}
+            result = {'time': rows['time']}
+            result.update({field: rows['values'][:, i] for i, field in enumerate(self.fields)})
+            return result
+
+        rows = self.rollups[resolution].take(start, end)
+        # Points per bucket; a field's own count differs only where it was missing
+        result = {'time': rows['time'], 'count': rows['count'].max(axis=1, initial=0)}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = rows['sum'] / rows['count']
+        for i, field in enumerate(self.fields):
+            result[f'{field}_mean'] = mean[:, i]
+            result[f'{field}_min'] = rows['min'][:, i]
+            result[f'{field}_max'] = rows['max'][:, i]
+            result[f'{field}_last'] = rows['last'][:, i]
+        return result
+
+    def records(self, start: Optional[Timestamp] = None, end: Optional[Timestamp] = None) -> List[Tuple[float, Any]]:
+        """(timestamp, record) pairs still in the raw ring"""
+        rows = self.raw.take('time', _seconds(start), _seconds(end))
+        return [(float(t), record) for t, record in zip(rows['time'], rows['record']) if record is not None]
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        if not self.raw.size:
+            return None
+        position = (self.raw.start + self.raw.size - 1) % self.raw.capacity
+        values = self.raw.columns['values'][position]
+        return {'time': float(self.raw.columns['time'][position]), **dict(zip(self.fields, values.tolist()))}
@@ -0,0 +1,167 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from collections import Counter, OrderedDict
+import math
+import time
+import numpy as np
+
+from utils.online_kmeans import OnlineKMeans
+from utils.trend_engine import extract_terms
+
+
+class TopicClusterer:
+    """Streaming topic discovery over the tweet embeddings the trend analyzer already computes.
+
+    Each batch goes through ``OnlineKMeans.partial_fit``. Cluster weights and
+    term counts decay with ``size_half_life`` so centroids keep following the
+    conversation. A tweet whose best centroid similarity is under
+    ``spawn_similarity`` starts a new cluster, in the slot of one that has
+    decayed below ``min_weight`` or, as in CluStream, freed by merging the two
+    closest clusters when they are closer to each other than the tweet is to
+    either. Velocity is a time-decayed arrival count with
+    ``velocity_half_life``, reported in tweets per hour. Labels are a
+    cluster's most distinctive terms, from term tables capped at
+    ``max_terms`` per cluster. A batch costs O(batch x k x dim), plus up to k
+    merges of O(k^2 x dim), however many tweets came before.
+    """
+
+    def __init__(self, k: int = 16, size_half_life: float = 86400, velocity_half_life: float = 3600,
+                 min_weight: float = 0.5, spawn_similarity: float = 0.35,
+                 max_terms: int = 200, seen_capacity: int = 10000,
+                 seed: int = 0, now: Optional[float] = None):
+        self.k = k
+        self.size_half_life = size_half_life
+        self.velocity_half_life = velocity_half_life
+        self.min_weight = min_weight
+        self.spawn_similarity = spawn_similarity
+        self.max_terms = max_terms
+        self.seen_capacity = seen_capacity
+        self.kmeans = OnlineKMeans(k, seed=seed)
+        self.velocity = np.zeros(k)
+        self.terms: List[Counter] = [Counter() for _ in range(k)]
+        self.reseeded = 0
+        self.merged = 0
+        self._last = time.time() if now is None else now
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+    def update(self, tweets: Sequence[Tuple[str, str]], embeddings: np.ndarray, now: Optional[float] = None) -> int:
+        """Cluster (tweet id, text) pairs not seen before with their embeddings, returns how many were new"""
+        now = time.time() if now is None else now
+        new = []
+        for i, (tweet_id, _) in enumerate(tweets):
+            tweet_id = str(tweet_id)
+            if tweet_id in self._seen:
+                continue
+            self._seen[tweet_id] = None
+            if len(self._seen) > self.seen_capacity:
+                self._seen.popitem(last=False)
+            new.append(i)
+        self._decay(now)
+        if not new:
+            return 0
+
+        vectors = OnlineKMeans._normalize(np.asarray(embeddings)[new])
+        self._rebalance(vectors)
+        assignments = self.kmeans.partial_fit(vectors)
+        np.add.at(self.velocity, assignments, 1.0)
+        for cluster, i in zip(assignments.tolist(), new):
+            self.terms[cluster].update(extract_terms(tweets[i][1], max_ngram=1))
+        for cluster in set(assignments.tolist()):
+            self._trim(cluster)
+        return len(new)
+
+    def _decay(self, now: float):
+        elapsed = max(0.0, now - self._last)
+        self._last = max(self._last, now)
+        if elapsed == 0:
+            return
+        self.velocity *= 0.5 ** (elapsed / self.velocity_half_life)
+        factor = 0.5 ** (elapsed / self.size_half_life)
+        self.kmeans.counts *= factor
+        for counts in self.terms:
+            for term in counts:
+                counts[term] *= factor
+
+    def _rebalance(self, vectors: np.ndarray):
+        """Give tweets no centroid fits a cluster of their own, in the slot of a faded or merged cluster"""
+        centroids = self.kmeans.centroids
+        if len(centroids) < self.k or centroids.shape[1] != vectors.shape[1]:
+            return
+        fit = (vectors @ centroids.T).max(axis=1)
+        outliers = [point for point in np.argsort(fit).tolist() if fit[point] < self.spawn_similarity]
+        free = np.flatnonzero(self.kmeans.counts < self.min_weight).tolist() if outliers else []
+        merges = 0
+
+        for point in outliers:
+            # An earlier outlier from the same new topic may already have opened a cluster for this one
+            best = float((centroids @ vectors[point]).max())
+            if best >= self.spawn_similarity:
+                continue
+            if not free:
+                # Room comes from the two closest clusters, unless they are further apart than this tweet is from any
+                a, b, similarity = self._closest_pair()
+                if similarity <= best or merges == self.k:
+                    break
+                free.append(self._merge(a, b))
+                merges += 1
+            cluster = free.pop()
+            centroids[cluster] = vectors[point]
+            self.kmeans.counts[cluster] = 0.0
+            self.velocity[cluster] = 0.0
+            self.terms[cluster] = Counter()
+            self.reseeded += 1
+
+    def _closest_pair(self) -> Tuple[int, int, float]:
+        similarity = self.kmeans.centroids @ self.kmeans.centroids.T
+        np.fill_diagonal(similarity, -np.inf)
+        a, b = np.unravel_index(np.argmax(similarity), similarity.shape)
+        return int(a), int(b), float(similarity[a, b])
+
+    def _merge(self, a: int, b: int) -> int:
+        """Fold the lighter of two clusters into the heavier, returns the slot freed"""
+        centroids, counts = self.kmeans.centroids, self.kmeans.counts
+        keep, drop = (a, b) if counts[a] >= counts[b] else (b, a)
+        total = counts[keep] + counts[drop]
+        if total > 0:
+            merged = (counts[keep] * centroids[keep] + counts[drop] * centroids[drop]) / total
+            centroids[keep] = merged / (np.linalg.norm(merged) or 1.0)
+        counts[keep] = total
+        self.velocity[keep] += self.velocity[drop]
+        self.terms[keep].update(self.terms[drop])
+        self._trim(keep)
+        self.merged += 1
+        return drop
+
+    def _trim(self, cluster: int):
+        counts = self.terms[cluster]
+        if len(counts) > self.max_terms:
+            self.terms[cluster] = Counter(dict(counts.most_common(self.max_terms)))
+
+    def _label_terms(self, cluster: int, spread: Counter, count: int) -> List[str]:
+        """Terms frequent in this cluster and rare in the others"""
+        scored = {
+            term: weight * math.log(1 + self.k / spread[term])
+            for term, weight in self.terms[cluster].items()
+        }
+        return sorted(scored, key=scored.get, reverse=True)[:count]
+
+    def topics(self, limit: Optional[int] = None, min_size: float = 1.0, label_terms: int = 3) -> List[Dict]:
+        """Live clusters, fastest growing first"""
+        per_hour = math.log(2) / (self.velocity_half_life / 3600)
+        # How many clusters use each term
+        spread = Counter()
+        for counts in self.terms:
+            spread.update(counts.keys())
+        topics = []
+        for cluster, size in enumerate(self.kmeans.counts.tolist()):
+            if size < min_size:
+                continue
+            terms = self._label_terms(cluster, spread, label_terms)
+            topics.append({
+                'cluster': cluster,
+                'label': ' / '.join(terms),
+                'terms': terms,
+                'size': size,
+                'velocity': float(self.velocity[cluster] * per_hour)
+            })
+        topics.sort(key=lambda topic: (topic['velocity'], topic['size']), reverse=True)
+        return topics[:limit] if limit is not None else topics
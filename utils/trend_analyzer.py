@@ -1,8 +1,16 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from collections import Counter
+import asyncio
+import hashlib
+import json
+import os
 import aiohttp
-from utils.model_manager import ModelManager
+from utils.keyword_matcher import KeywordMatcher
+from utils.model_manager import THEME_DESCRIPTIONS, ModelManager
+from utils.relevance_cache import RelevanceCache
+from utils.topic_clusterer import TopicClusterer
+from utils.trend_engine import TrendEngine
 from utils.types import TweetData, RelevanceScore
 import numpy as np
 import logging
@@ -10,10 +18,13 @@ import logging
 logger = logging.getLogger(__name__)
 
 class TrendAnalyzer:
-    def __init__(self):
+    # Share of a theme score from embedding similarity; the rest is keyword coverage
+    SEMANTIC_WEIGHT = 0.7
+    KEYWORD_WEIGHT = 0.3
+
+    def __init__(self, trend_engine: Optional[TrendEngine] = None, topic_clusterer: Optional[TopicClusterer] = None):
         self.base_url = 'http://localhost:3000'
         self.model_manager = ModelManager()
-        self.theme_embeddings = self.model_manager.get_theme_embeddings()
         
         self.theme_keywords = {
             'technological': [
@@ -29,26 +40,26 @@ class TrendAnalyzer:
                 'metaphysical', 'ontological'
             ]
         }
-    async def get_meme_trends(self) -> List[Dict]:
-        """Get trending meme topics"""
-        # call /trends endpoint
-        # twitter_manager = TwitterManager()
-        
-        print("fetching trends get_meme_trends")
-        # response = [
-        #     "Madam President","Thanks Joe","Let's Go Brandon","Nikki Haley","Rick Steves","Allentown","Over 75,000",
-        #     "Wikipedia","Ellipse","Flyers","Finch","Ant Man","Mr. October","Mavericks","Kuminga","Sleepy Joe","McAvoy","Naji","Politico","#ALLCAPS"
-        # ]
-        response = [
-            "Digital Rapture", "Neural Collapse", "Quantum Delusion", "Reality Bleed", 
-            # "Cheating","Jennifer Aniston","Shapiro","#TheFive","SCOTUS","Bucks County",
-            # "Screw Your Freedom","#LoveForKelly","Billy Zane","Destiny","Refunded",
-            # "Tornado Watch","Halle","WOOLYTOOZ","#BabyMaga","Mookie","Juve","Cubs",
+        self.keyword_matcher = KeywordMatcher(self.theme_keywords)
+        self.relevance_cache: Optional[RelevanceCache] = None
+        # Fed with every tweet monitor_target_accounts collects
+        self.trend_engine = trend_engine or TrendEngine(
+            bucket_seconds=float(os.environ.get('TREND_BUCKET_SECONDS', 300)),
+            buckets=int(os.environ.get('TREND_WINDOW_BUCKETS', 12)),
+            alpha=float(os.environ.get('TREND_BASELINE_ALPHA', 0.05))
+        )
+        # Clusters the embeddings score_tweets returns for those same tweets
+        self.topic_clusterer = topic_clusterer or TopicClusterer(k=int(os.environ.get('TOPIC_CLUSTERS', 16)))
+    async def get_meme_trends(self) -> List[str]:
+        """Terms currently bursting in monitored tweets, a fixed list until enough tweets have been seen"""
+        trends = [trend['term'] for trend in self.trend_engine.trends(limit=15)]
+        if trends:
+            return trends
+        return [
+            "Digital Rapture", "Neural Collapse", "Quantum Delusion", "Reality Bleed",
             "Binary Dawn", "Silicon Dreams", "Void Whispers", "Glitch Prophecy", "Tech Occult",
             "Cyber Gnosis", "Data Demons", "Algorithm Gods", "Machine Spirits", "Code Shamans"
         ]
-        # response = await self.fetch_trends()
-        return response
 
     async def fetch_trends(self) -> List[Dict]:
         """Fetch current trends from local API endpoint"""
@@ -67,44 +78,97 @@ class TrendAnalyzer:
                 return []
 
 
-    async def analyze_tweets_batch(self, tweets: List[str], batch_size: int = 32) -> List[RelevanceScore]:
-        """Analyze multiple tweets in one batch"""
+    @property
+    def theme_embeddings(self) -> Dict[str, np.ndarray]:
+        # Resolved on use so constructing the analyzer never waits for the model
+        return self.model_manager.get_theme_embeddings()
+
+    async def encode_tweets(self, tweets: List[str], batch_size: int = 32) -> np.ndarray:
+        """Normalized embeddings for a batch of tweets in one encoder call, run off the event loop"""
+        embeddings = np.asarray(await self.model_manager.abatch_encode(tweets, batch_size=batch_size), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+
+    def theme_version(self) -> str:
+        """Names everything a relevance score depends on: themes, keywords, weights and embedding space"""
+        projection = self.model_manager.projection()
+        config = {
+            'themes': THEME_DESCRIPTIONS,
+            'keywords': self.theme_keywords,
+            'weights': [self.SEMANTIC_WEIGHT, self.KEYWORD_WEIGHT],
+            'model': self.model_manager.model_tag(),
+            'projection': projection.version if projection is not None else None
+        }
+        return hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+    def _relevance_cache(self) -> Optional[RelevanceCache]:
+        """Persistent relevance cache, RELEVANCE_CACHE_PATH='' disables it"""
+        path = os.environ.get('RELEVANCE_CACHE_PATH', 'relevance_cache.db')
+        if not path:
+            return None
+        if self.relevance_cache is None:
+            self.relevance_cache = RelevanceCache(
+                path, self.theme_version(), int(os.environ.get('RELEVANCE_CACHE_MAX_ENTRIES', 10000))
+            )
+        else:
+            self.relevance_cache.version = self.theme_version()
+        return self.relevance_cache
+
+    async def score_tweets(self, tweets: List[Dict], batch_size: int = 32) -> Tuple[List[RelevanceScore], np.ndarray]:
+        """Relevance and embedding per tweet; only tweets not yet scored under the current themes reach the encoder"""
+        if not tweets:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        # The model backend and projection are part of the theme version
+        if not self.model_manager.is_loaded():
+            await self.model_manager.warm_up()
+        cache = self._relevance_cache()
+        keys = [(tweet['id'], tweet['text']) for tweet in tweets]
+        results = await asyncio.to_thread(cache.get_many, keys) if cache is not None else [None] * len(tweets)
+
+        missing = [i for i, hit in enumerate(results) if hit is None]
+        if missing:
+            texts = [tweets[i]['text'] for i in missing]
+            embeddings = await self.encode_tweets(texts, batch_size=batch_size)
+            scores = await self.analyze_tweets_batch(texts, embeddings=embeddings)
+            for i, score, embedding in zip(missing, scores, embeddings):
+                results[i] = (score, embedding)
+            # A failed analysis has no theme scores and is retried next cycle
+            scored = [j for j, score in enumerate(scores) if score['theme_scores']]
+            if cache is not None and scored:
+                await asyncio.to_thread(
+                    cache.put_many, [keys[missing[j]] for j in scored], [scores[j] for j in scored], embeddings[scored]
+                )
+        return [score for score, _ in results], np.stack([embedding for _, embedding in results])
+
+    async def analyze_tweets_batch(self, tweets: List[str], batch_size: int = 32,
+                                   embeddings: Optional[np.ndarray] = None) -> List[RelevanceScore]:
+        """Analyze multiple tweets in one batch, reusing embeddings when the caller has them"""
         try:
-            embeddings = self.model_manager.batch_encode(tweets, batch_size=batch_size)
-            
-            results = []
-            for tweet, embedding in zip(tweets, embeddings):
-                theme_scores = {}
-                for theme, theme_embedding in self.theme_embeddings.items():
-                    similarity = np.dot(embedding, theme_embedding) / (
-                        np.linalg.norm(embedding) * np.linalg.norm(theme_embedding)
-                    )
-                    theme_scores[theme] = float(similarity)
-                
-                # Calculate keyword relevance
-                keyword_scores = {}
-                for theme, keywords in self.theme_keywords.items():
-                    keyword_scores[theme] = self._calculate_keyword_relevance(tweet, keywords)
-                
-                # Combine scores
-                final_scores = {
-                    theme: 0.7 * theme_scores[theme] + 0.3 * keyword_scores[theme]
-                    for theme in theme_scores.keys()
-                }
-                
-                results.append({
-                    'score': max(final_scores.values()),
-                    'theme_scores': final_scores
-                })
+            if embeddings is None:
+                embeddings = await self.encode_tweets(tweets, batch_size=batch_size)
             
+            # One (tweets x themes) product of unit vectors gives every cosine similarity
+            themes = list(self.theme_embeddings)
+            theme_matrix = self._unit_rows(np.stack([self.theme_embeddings[theme] for theme in themes]))
+            semantic = self._unit_rows(np.asarray(embeddings, dtype=np.float32)) @ theme_matrix.T
+
+            keyword = self.keyword_matcher.scores(tweets)
+            columns = [self.keyword_matcher.groups.index(theme) for theme in themes]
+            final = self.SEMANTIC_WEIGHT * semantic + self.KEYWORD_WEIGHT * keyword[:, columns]
+
+            results = [
+                {'score': best, 'theme_scores': dict(zip(themes, row))}
+                for best, row in zip(final.max(axis=1).tolist(), final.tolist())
+            ]
             return results
             
         except Exception as e:
             logger.error(f"Error in batch analysis: {e}", exc_info=True)
             return [{'score': 0, 'theme_scores': {}} for _ in tweets]
 
-    def _calculate_keyword_relevance(self, text: str, keywords: List[str]) -> float:
-        """Calculate relevance based on keyword presence"""
-        text = text.lower()
-        keyword_count = sum(1 for keyword in keywords if keyword.lower() in text)
-        return keyword_count / len(keywords) if keywords else 0
\ No newline at end of file
+    @staticmethod
+    def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
\ No newline at end of file
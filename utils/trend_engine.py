@@ -0,0 +1,246 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import Counter, OrderedDict
+import re
+import time
+import zlib
+import numpy as np
+
+from utils.inverted_index import TOKEN_PATTERN
+
+URL_PATTERN = re.compile(r"https?://\S+")
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just let me more most my no nor not now of off on once only or other our ours out over
+own same she should so some such than that the their theirs them then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your yours rt amp via
+get got gonna im its dont cant thats like one new
+""".split())
+
+# Mersenne prime modulus for the sketch's pairwise-independent row hashes
+_PRIME = (1 << 31) - 1
+
+
+def extract_terms(text: str, max_ngram: int = 2) -> List[str]:
+    """Distinct words and n-grams of a tweet; URLs, @mentions and stopword-edged n-grams are dropped"""
+    tokens = TOKEN_PATTERN.findall(URL_PATTERN.sub(' ', text.lower()))
+    terms = set()
+    for n in range(1, max_ngram + 1):
+        for start in range(len(tokens) - n + 1):
+            gram = tokens[start:start + n]
+            if any(token[0] == '@' for token in gram):
+                continue
+            if not (_content(gram[0]) and _content(gram[-1])):
+                continue
+            terms.add(' '.join(gram))
+    return list(terms)
+
+
+def _content(token: str) -> bool:
+    return len(token) > 2 and token not in STOPWORDS and not token.isdigit()
+
+
+def hash_terms(terms: Sequence[str]) -> np.ndarray:
+    return np.array([zlib.crc32(term.encode('utf-8')) for term in terms], dtype=np.int64)
+
+
+class CountMinSketch:
+    """Fixed-size approximate counter: ``depth`` rows of ``width`` float32 cells.
+
+    Estimates never undercount; with probability 1 - e^-depth they overcount
+    by at most e/width of the total added. Sketches with the same shape and
+    seed are linear, so they can be added, subtracted and scaled cell-wise.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=(depth, 1), dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, size=(depth, 1), dtype=np.int64)
+        self._rows = np.arange(depth)[:, None]
+        self.table = np.zeros((depth, width), dtype=np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def columns(self, hashes: np.ndarray) -> np.ndarray:
+        """(depth x len(hashes)) cell index of each hashed key in each row"""
+        return (self._a * (hashes[None, :] % _PRIME) + self._b) % _PRIME % self.width
+
+    def add(self, columns: np.ndarray, counts: np.ndarray):
+        np.add.at(self.table, (self._rows, columns), counts)
+
+    def estimate(self, columns: np.ndarray) -> np.ndarray:
+        return self.table[self._rows, columns].min(axis=0)
+
+
+class TrendEngine:
+    """Streaming trend detection over tweet terms in constant memory.
+
+    Time is split into buckets of ``bucket_seconds``. Each bucket counts the
+    tweets that contain each word or n-gram in its own Count-Min sketch, and
+    the sliding window is the running sum of the last ``buckets`` of them.
+    When a bucket closes it is folded into an exponentially decayed baseline
+    (weight ``alpha``), the per-bucket rate a term usually has. A term's burst
+    is how far its window rate exceeds that baseline, in Poisson standard
+    deviations. Candidate terms for ranking are kept in a bounded heavy-hitter
+    set, and tweet ids already counted are remembered so re-fetched tweets
+    are not counted twice.
+    """
+
+    def __init__(self, bucket_seconds: float = 300, buckets: int = 12, alpha: float = 0.05,
+                 width: int = 4096, depth: int = 4, capacity: int = 512, max_ngram: int = 2,
+                 min_count: int = 3, seen_capacity: int = 10000, now: Optional[float] = None):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.alpha = alpha
+        self.capacity = capacity
+        self.max_ngram = max_ngram
+        self.min_count = min_count
+        self.seen_capacity = seen_capacity
+        self.window = CountMinSketch(width, depth)
+        self.baseline = CountMinSketch(width, depth)
+        self._buckets = [CountMinSketch(width, depth) for _ in range(buckets)]
+        self._current = 0
+        self._bucket_start = time.time() if now is None else now
+        self.closed_buckets = 0
+        # Heavy-hitter candidates: term -> window count when last updated
+        self.candidates: Dict[str, float] = {}
+        self._floor = 0.0
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self.tweets = 0
+        self.terms = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.window.nbytes + self.baseline.nbytes + sum(bucket.nbytes for bucket in self._buckets)
+
+    def ingest(self, tweets: Iterable[Tuple[str, str]], now: Optional[float] = None) -> int:
+        """Count (tweet id, text) pairs not seen before, returns how many were new"""
+        self._advance(time.time() if now is None else now)
+        counts: Counter = Counter()
+        new = 0
+        for tweet_id, text in tweets:
+            tweet_id = str(tweet_id)
+            if tweet_id in self._seen:
+                continue
+            self._seen[tweet_id] = None
+            if len(self._seen) > self.seen_capacity:
+                self._seen.popitem(last=False)
+            counts.update(extract_terms(text, self.max_ngram))
+            new += 1
+        if counts:
+            terms = list(counts)
+            columns = self.window.columns(hash_terms(terms))
+            increments = np.array([counts[term] for term in terms], dtype=np.float32)
+            self._buckets[self._current].add(columns, increments)
+            self.window.add(columns, increments)
+            self._track(terms, self.window.estimate(columns))
+        self.tweets += new
+        self.terms += sum(counts.values())
+        return new
+
+    def _track(self, terms: List[str], estimates: np.ndarray):
+        """Space-Saving style admission: once the set is full a term enters only by beating its smallest count"""
+        for term, estimate in zip(terms, estimates.tolist()):
+            if term in self.candidates:
+                # Counts only grow within a bucket, so a stale floor is merely conservative
+                self.candidates[term] = estimate
+            elif len(self.candidates) < self.capacity:
+                self.candidates[term] = estimate
+                if len(self.candidates) == self.capacity:
+                    self._floor = min(self.candidates.values())
+            elif estimate > self._floor:
+                smallest = min(self.candidates, key=self.candidates.get)
+                if estimate > self.candidates[smallest]:
+                    del self.candidates[smallest]
+                    self.candidates[term] = estimate
+                self._floor = min(self.candidates.values())
+
+    def _advance(self, now: float):
+        elapsed = int((now - self._bucket_start) // self.bucket_seconds)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, self.buckets)):
+            self._close_bucket()
+        # Past a full window every further bucket is empty and only the baseline decays
+        if elapsed > self.buckets:
+            self.baseline.table *= (1 - self.alpha) ** (elapsed - self.buckets)
+            self.closed_buckets += elapsed - self.buckets
+        self._bucket_start += elapsed * self.bucket_seconds
+        self._refresh_candidates()
+
+    def _close_bucket(self):
+        closed = self._buckets[self._current].table
+        self.baseline.table *= 1 - self.alpha
+        self.baseline.table += self.alpha * closed
+        self.closed_buckets += 1
+        # The oldest bucket leaves the window and is reused for the next interval
+        self._current = (self._current + 1) % self.buckets
+        oldest = self._buckets[self._current].table
+        self.window.table -= oldest
+        oldest[:] = 0
+
+    def _refresh_candidates(self):
+        if not self.candidates:
+            return
+        terms = list(self.candidates)
+        estimates = self.window.estimate(self.window.columns(hash_terms(terms))).tolist()
+        self.candidates = {term: estimate for term, estimate in zip(terms, estimates) if estimate > 0}
+        self._floor = min(self.candidates.values()) if len(self.candidates) >= self.capacity else 0.0
+
+    def _scored(self) -> List[Dict]:
+        terms = [term for term, count in self.candidates.items() if count >= self.min_count]
+        if not terms:
+            return []
+        columns = self.window.columns(hash_terms(terms))
+        counts = self.window.estimate(columns)
+        # Bias-corrected EWMA: early on the baseline has seen only a few buckets
+        correction = 1 - (1 - self.alpha) ** self.closed_buckets
+        expected = self.baseline.estimate(columns) / correction if correction > 0 else np.zeros(len(terms))
+        rate = counts / min(self.closed_buckets + 1, self.buckets)
+        burst = (rate - expected) / np.sqrt(expected + 1)
+        return [
+            {'term': term, 'count': count, 'rate': r, 'baseline': base, 'burst': b}
+            for term, count, r, base, b in zip(
+                terms, counts.tolist(), rate.tolist(), expected.tolist(), burst.tolist()
+            )
+        ]
+
+    def trends(self, limit: int = 10, now: Optional[float] = None) -> List[Dict]:
+        """Terms rising fastest above their baseline, most bursting first"""
+        self._advance(time.time() if now is None else now)
+        scored = [trend for trend in self._scored() if trend['burst'] > 0]
+        # Among equally bursting terms the longer phrase is the more specific label
+        scored.sort(key=lambda trend: (trend['burst'], trend['count'], trend['term'].count(' ')), reverse=True)
+        return self._distinct(scored, limit)
+
+    def heavy_hitters(self, limit: int = 10, now: Optional[float] = None) -> List[Dict]:
+        """Most frequent terms in the current window, whether or not they are rising"""
+        self._advance(time.time() if now is None else now)
+        scored = sorted(self._scored(), key=lambda trend: (trend['count'], trend['term'].count(' ')), reverse=True)
+        return self._distinct(scored, limit)
+
+    @staticmethod
+    def _distinct(ranked: List[Dict], limit: int) -> List[Dict]:
+        """Drop terms that overlap, word for word, a term ranked above them"""
+        chosen: List[Dict] = []
+        for trend in ranked:
+            words = f" {trend['term']} "
+            if any(words in f" {other['term']} " or f" {other['term']} " in words for other in chosen):
+                continue
+            chosen.append(trend)
+            if len(chosen) == limit:
+                break
+        return chosen
+
+    def stats(self) -> Dict:
+        return {
+            'tweets': self.tweets,
+            'terms': self.terms,
+            'candidates': len(self.candidates),
+            'closed_buckets': self.closed_buckets,
+            'sketch_bytes': self.nbytes
+        }
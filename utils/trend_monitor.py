@@ -2,7 +2,8 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 from agent.twitter_manager import TwitterManager
-from utils.model_manager import ModelManager
+from utils.model_manager import THEME_DESCRIPTIONS, ModelManager
+from utils.time_series import TimeSeries
 import asyncio
 
 logger = logging.getLogger(__name__)
@@ -13,33 +14,45 @@ class TrendMonitor:
         self.model_manager = ModelManager()
         self.twitter_manager = TwitterManager(config)
         self.current_trends: Dict = {
-            'digital_culture': [],
-            'philosophy': [],
-            'technology': [],
-            'society': []
+            'primary_trends': [],
+            'philosophical_trends': [],
+            'cultural_impact': [],
+            'tech_philosophy': [],
+            'emerging_topics': [],
+            'relevance_scores': {}
         }
-        self.trend_history = []
+        # Embedding clusters behind emerging_topics, with their size and velocity
+        self.topics: List[Dict] = []
+        # Per-cycle trend counts and theme relevance; the raw ring also keeps each cycle's trends
+        self.trend_history = TimeSeries(
+            'trend_history', ['primary_trends', 'emerging_topics', 'top_burst', *THEME_DESCRIPTIONS]
+        )
         
     async def monitor_trends(self) -> Dict:
         """Monitor and analyze trends from various sources"""
         try:
-            # Get tweets from configured sources
-            tweets = await self._fetch_relevant_tweets()
+            # Collecting tweets also feeds them to the trend engine
+            await self._fetch_relevant_tweets()
 
-            # Analyze trends from tweets
-            tweet_trends = await self._analyze_tweet_trends(tweets)
+            # Terms bursting above their baseline, scored against the themes
+            tweet_trends = await self._analyze_tweet_trends()
             
-            # Get broader cultural trends
+            # Highest-volume terms in the current window
             cultural_trends = await self._analyze_cultural_trends()
             
+            # Topics discovered by clustering tweet embeddings, fastest growing first
+            self.topics = self.twitter_manager.trend_analyzer.topic_clusterer.topics(limit=10)
+            
             # Combine and categorize trends
             combined_trends = await self._categorize_trends(tweet_trends, cultural_trends)
             
             # Store in history
             self.trend_history.append({
-                'timestamp': datetime.now(),
-                'trends': combined_trends
-            })
+                'primary_trends': len(combined_trends['primary_trends']),
+                'emerging_topics': len(combined_trends['emerging_topics']),
+                'top_burst': tweet_trends[0]['burst'] if tweet_trends else 0.0,
+                **combined_trends['relevance_scores']
+            }, timestamp=datetime.now(), record=combined_trends)
             
             self.current_trends = combined_trends
             return combined_trends
@@ -48,6 +61,10 @@ class TrendMonitor:
             logger.error(f"Error monitoring trends: {e}")
             return self.current_trends
 
+    async def close(self):
+        """Release resources held by the twitter manager"""
+        await self.twitter_manager.close()
+
     async def _fetch_relevant_tweets(self) -> List[Dict]:
         """Fetch relevant tweets from configured sources"""
         tweets = await self.twitter_manager.monitor_target_accounts()
@@ -55,70 +72,41 @@ class TrendMonitor:
         # twitter_manager = TwitterManager(self.config)
         # return twitter_manager.fetch_tweets()
 
-    async def _analyze_tweet_trends(self, tweets: List[Dict]) -> Dict:
-        """Analyze trends from tweets"""
-        trends = {
-            'digital_culture': [
-                'AI Ethics in Creative Fields',
-                'Digital Identity Evolution',
-                'Virtual Reality Philosophy'
-            ],
-            'philosophy': [
-                'Modern Existentialism',
-                'Digital Consciousness',
-                'Tech-Human Integration'
-            ],
-            'technology': [
-                'AI Development Ethics',
-                'Digital Art Evolution',
-                'Metaverse Culture'
-            ],
-            'society': [
-                'Digital Social Dynamics',
-                'Online Community Evolution',
-                'Cultural Tech Impact'
-            ]
-        }
+    async def _analyze_tweet_trends(self, limit: int = 10) -> List[Dict]:
+        """Bursting terms from the trend engine, each tagged with its closest theme"""
+        analyzer = self.twitter_manager.trend_analyzer
+        trends = analyzer.trend_engine.trends(limit=limit)
+        if not trends:
+            return []
+        scores = await analyzer.analyze_tweets_batch([trend['term'] for trend in trends])
+        for trend, relevance in zip(trends, scores):
+            theme_scores = relevance['theme_scores']
+            trend['theme'] = max(theme_scores, key=theme_scores.get) if theme_scores else None
+            trend['relevance'] = relevance['score']
+            trend['theme_scores'] = theme_scores
         return trends
 
-    async def _analyze_cultural_trends(self) -> Dict:
-        """Analyze broader cultural trends"""
-        return {
-            'emerging_philosophies': [
-                'Digital Stoicism',
-                'Tech-Augmented Consciousness',
-                'Virtual Reality Ethics'
-            ],
-            'cultural_shifts': [
-                'Digital Native Philosophy',
-                'AI-Human Coexistence',
-                'Virtual Identity Formation'
-            ]
-        }
+    async def _analyze_cultural_trends(self, limit: int = 10) -> List[Dict]:
+        """Most talked-about terms in the current window, rising or not"""
+        return self.twitter_manager.trend_analyzer.trend_engine.heavy_hitters(limit=limit)
 
-    async def _categorize_trends(self, tweet_trends: Dict, cultural_trends: Dict) -> Dict:
+    async def _categorize_trends(self, tweet_trends: List[Dict], cultural_trends: List[Dict]) -> Dict:
         """Categorize and combine trends"""
+        def by_theme(*themes: str) -> List[str]:
+            return [trend['term'] for trend in tweet_trends if trend['theme'] in themes]
+
         return {
-            'primary_trends': self._get_primary_trends(tweet_trends),
-            'philosophical_trends': tweet_trends['philosophy'] + cultural_trends['emerging_philosophies'],
-            'cultural_impact': tweet_trends['society'] + cultural_trends['cultural_shifts'],
-            'tech_philosophy': tweet_trends['technology'],
-            'relevance_scores': self._calculate_trend_relevance()
+            'primary_trends': [trend['term'] for trend in tweet_trends[:5]],
+            'philosophical_trends': by_theme('philosophical', 'spiritual'),
+            'cultural_impact': [trend['term'] for trend in cultural_trends],
+            'tech_philosophy': by_theme('technological'),
+            'emerging_topics': [topic['label'] for topic in self.topics if topic['label']],
+            'relevance_scores': self._calculate_trend_relevance(tweet_trends)
         }
 
-    def _get_primary_trends(self, tweet_trends: Dict) -> List[str]:
-        """Get primary trends based on configuration"""
-        primary_trends = []
-        for category in self.config.get('content_themes', {}).get('primary', []):
-            if category in tweet_trends:
-                primary_trends.extend(tweet_trends[category][:2])
-        return primary_trends
-
-    def _calculate_trend_relevance(self) -> Dict:
-        """Calculate relevance scores for trends"""
-        return {
-            'philosophical_depth': 0.85,
-            'cultural_relevance': 0.92,
-            'tech_alignment': 0.78,
-            'societal_impact': 0.88
-        } 
\ No newline at end of file
+    def _calculate_trend_relevance(self, tweet_trends: List[Dict]) -> Dict:
+        """Mean theme score of the bursting trends, per theme"""
+        scored = [trend['theme_scores'] for trend in tweet_trends if trend['theme_scores']]
+        if not scored:
+            return {}
+        return {theme: sum(scores[theme] for scores in scored) / len(scored) for theme in scored[0]}
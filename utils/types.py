@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 from typing_extensions import TypedDict
 from datetime import datetime
+import numpy as np
 
 class TweetData(TypedDict):
     id: str
@@ -11,4 +12,10 @@ class TweetData(TypedDict):
 
 class RelevanceScore(TypedDict):
     score: float
-    theme_scores: Dict[str, float] 
\ No newline at end of file
+    theme_scores: Dict[str, float] 
+
+class TweetRecord(TweetData, total=False):
+    """Tweet flowing through the pipeline, embedded once when it is analyzed"""
+    username: str
+    relevance: RelevanceScore
+    embedding: np.ndarray
@@ -0,0 +1,268 @@
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+from abc import ABC, abstractmethod
+import numpy as np
+import logging
+
+from utils.embedding_matrix import EmbeddingMatrix
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so that dot products are cosine similarities"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _IdList:
+    """Ids of one inverted list with O(1) swap-remove; the vectors live in the store"""
+
+    def __init__(self):
+        self.ids: List[Hashable] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, item_id: Hashable) -> int:
+        self.ids.append(item_id)
+        return len(self.ids) - 1
+
+    def remove_at(self, position: int) -> Optional[Hashable]:
+        """Remove the id at position, returns the id that moved into its slot"""
+        last = len(self.ids) - 1
+        moved = None
+        if position != last:
+            self.ids[position] = self.ids[last]
+            moved = self.ids[position]
+        self.ids.pop()
+        return moved
+
+
+class VectorIndex(ABC):
+    """Top-k cosine similarity index keyed by document id"""
+
+    @abstractmethod
+    def add(self, ids: Sequence[Hashable], vectors: np.ndarray) -> None:
+        ...
+
+    @abstractmethod
+    def remove(self, ids: Sequence[Hashable]) -> None:
+        ...
+
+    @abstractmethod
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def __contains__(self, item_id: Hashable) -> bool:
+        ...
+
+
+def _top_k(ids: List[Hashable], scores: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+    """Select the k best scores without sorting the whole array"""
+    if len(ids) == 0 or k <= 0:
+        return []
+    if k < len(ids):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(ids))
+    top = top[np.argsort(-scores[top])]
+    return [(ids[i], float(scores[i])) for i in top]
+
+
+def _score(store: EmbeddingMatrix, ids: List[Hashable], query: np.ndarray) -> Tuple[List[Hashable], np.ndarray]:
+    """Cosine similarity of the store's vectors for ids, dropping ids the store no longer holds"""
+    rows = store.rows(ids)
+    if len(rows) != len(ids):
+        ids = [item_id for item_id in ids if item_id in store]
+    return ids, store.similarities(query, rows)
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force index, exact results with one matrix-vector product per query.
+
+    Vectors are read from ``store``, an EmbeddingMatrix that must already
+    hold every added id. Without one the index keeps its own.
+    """
+
+    def __init__(self, dim: Optional[int] = None, store: Optional[EmbeddingMatrix] = None):
+        self.dim = dim
+        self._owns_store = store is None
+        self.store = EmbeddingMatrix(dim) if store is None else store
+        self._list = _IdList()
+        self._positions: Dict[Hashable, int] = {}
+
+    def add(self, ids: Sequence[Hashable], vectors: np.ndarray) -> None:
+        if self._owns_store:
+            self.store.add(ids, vectors)
+        self.dim = self.store.dim
+        for item_id in ids:
+            if item_id not in self._positions:
+                self._positions[item_id] = self._list.add(item_id)
+
+    def remove(self, ids: Sequence[Hashable]) -> None:
+        for item_id in ids:
+            position = self._positions.pop(item_id, None)
+            if position is None:
+                continue
+            moved = self._list.remove_at(position)
+            if moved is not None:
+                self._positions[moved] = position
+        if self._owns_store:
+            self.store.remove(ids)
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+        if not self._positions:
+            return []
+        ids, scores = _score(self.store, self._list.ids, query)
+        return _top_k(ids, scores, k)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._positions
+
+
+class IVFFlatIndex(VectorIndex):
+    """Inverted-file index: k-means coarse quantizer over uncompressed vectors.
+
+    Until the corpus reaches ``exact_threshold`` vectors every query is an
+    exact scan. Past that point the centroids are trained and a query only
+    scans the ``nprobe`` closest lists. The quantizer is retrained when the
+    corpus has grown by ``retrain_factor`` since the last training.
+
+    The lists hold ids only; vectors are read from ``store``, an
+    EmbeddingMatrix that must already hold every added id, so the index
+    costs no second copy of the embeddings. Without one the index keeps its own.
+    """
+
+    def __init__(self, dim: Optional[int] = None, nlist: Optional[int] = None,
+                 nprobe: int = 8, exact_threshold: int = 2048,
+                 retrain_factor: float = 4.0, seed: int = 0,
+                 store: Optional[EmbeddingMatrix] = None):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.exact_threshold = exact_threshold
+        self.retrain_factor = retrain_factor
+        self._rng = np.random.default_rng(seed)
+        self._owns_store = store is None
+        self.store = EmbeddingMatrix(dim) if store is None else store
+        self.centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._lists: List[_IdList] = [_IdList()]
+        self._positions: Dict[Hashable, Tuple[int, int]] = {}
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def add(self, ids: Sequence[Hashable], vectors: np.ndarray) -> None:
+        if self._owns_store:
+            self.store.add(ids, vectors)
+        self.dim = self.store.dim
+        # Re-adding an id moves it to the list of its new vector
+        self._unlist([item_id for item_id in ids if item_id in self._positions])
+        if self.is_trained:
+            assignments = self._assign(_normalize(vectors))
+        else:
+            assignments = np.zeros(len(ids), dtype=np.int64)
+        for item_id, list_no in zip(ids, assignments):
+            self._positions[item_id] = (int(list_no), self._lists[list_no].add(item_id))
+
+        size = len(self._positions)
+        if size >= self.exact_threshold and (
+            not self.is_trained or size >= self._trained_size * self.retrain_factor
+        ):
+            self.train()
+
+    def remove(self, ids: Sequence[Hashable]) -> None:
+        self._unlist(ids)
+        if self._owns_store:
+            self.store.remove(ids)
+
+    def _unlist(self, ids: Sequence[Hashable]):
+        for item_id in ids:
+            location = self._positions.pop(item_id, None)
+            if location is None:
+                continue
+            list_no, position = location
+            moved = self._lists[list_no].remove_at(position)
+            if moved is not None:
+                self._positions[moved] = (list_no, position)
+
+    def train(self) -> None:
+        """Fit the coarse quantizer on the current corpus and rebuild the lists"""
+        ids = [item_id for id_list in self._lists for item_id in id_list.ids]
+        ids = [item_id for item_id in ids if item_id in self.store]
+        # Gathered for training only, the resident copy stays in the store
+        vectors = self.store.vectors[self.store.rows(ids)]
+        nlist = self.nlist or max(1, int(np.sqrt(len(ids))))
+        self.centroids = _spherical_kmeans(vectors, nlist, self._rng)
+        self._trained_size = len(ids)
+
+        self._lists = [_IdList() for _ in range(len(self.centroids))]
+        self._positions = {}
+        for item_id, list_no in zip(ids, self._assign(vectors)):
+            self._positions[item_id] = (int(list_no), self._lists[list_no].add(item_id))
+        logger.info(f"Trained IVF index: {len(ids)} vectors in {len(self.centroids)} lists")
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+        if not self._positions:
+            return []
+        if self.is_trained and len(self._positions) >= self.exact_threshold:
+            nprobe = min(self.nprobe, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ _normalize(query)[0]), nprobe - 1)[:nprobe]
+            lists = [self._lists[i] for i in probe]
+        else:
+            lists = self._lists
+
+        candidates = [item_id for id_list in lists for item_id in id_list.ids]
+        if not candidates:
+            return []
+        ids, scores = _score(self.store, candidates, query)
+        return _top_k(ids, scores, k)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._positions
+
+
+def _spherical_kmeans(vectors: np.ndarray, k: int, rng: np.random.Generator,
+                      iterations: int = 10) -> np.ndarray:
+    """Cosine k-means on normalized vectors, returns normalized centroids"""
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            # Reseed empty clusters with random points
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def build_vector_index(index_type: str = 'ivf', **kwargs) -> VectorIndex:
+    """Create a vector index by name ('exact' or 'ivf')"""
+    if index_type == 'exact':
+        return ExactIndex(kwargs.get('dim'), kwargs.get('store'))
+    if index_type == 'ivf':
+        return IVFFlatIndex(**kwargs)
+    raise ValueError(f"Unknown vector index type: {index_type}")
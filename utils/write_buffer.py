@@ -0,0 +1,110 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+from bson import ObjectId
+
+from utils.db_executor import DatabaseExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Groups single-document inserts into insert_many batches.
+
+    Documents get their ``_id`` assigned client-side when queued, so callers
+    know the id immediately; the returned future resolves to that id once the
+    batch holding it is written (or raises if the write failed). A batch is
+    flushed when it reaches ``max_batch`` documents, when its oldest document
+    is ``max_age`` seconds old, or on ``close``. With ``durable=True`` every
+    ``add`` waits for its own write before returning. A failed batch is
+    dropped and handed to ``on_failure`` so the owner can roll back any
+    state it derived from the queued documents.
+    """
+
+    def __init__(self, insert_many: Callable[[List[Dict]], Any], db_executor: DatabaseExecutor, max_batch: int = 100,
+                 max_age: float = 1.0, durable: bool = False,
+                 on_flush: Optional[Callable[[List[Dict]], Awaitable[None]]] = None,
+                 on_failure: Optional[Callable[[List[Dict]], None]] = None):
+        self.insert_many = insert_many
+        self.db_executor = db_executor
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.durable = durable
+        self.on_flush = on_flush
+        self.on_failure = on_failure
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._pending_by_id: Dict[ObjectId, Dict] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks = set()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def get_pending(self, doc_id) -> Optional[Dict]:
+        """Document queued but not yet written, for read-your-writes lookups"""
+        return self._pending_by_id.get(doc_id)
+
+    async def add(self, doc: Dict) -> asyncio.Future:
+        """Queue a document, returns a future resolving to its inserted id"""
+        loop = asyncio.get_running_loop()
+        doc.setdefault('_id', ObjectId())
+        future = loop.create_future()
+        # Failures are logged in flush, don't warn about unretrieved exceptions
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending.append((doc, future))
+        self._pending_by_id[doc['_id']] = doc
+
+        if self.durable or len(self._pending) >= self.max_batch:
+            await self.flush()
+            if self.durable:
+                await future
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_age, self._flush_on_age)
+        return future
+
+    def _flush_on_age(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        """Write all queued documents in one insert_many round-trip"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            docs = [doc for doc, _ in batch]
+            try:
+                await self.db_executor.run(self.insert_many, docs)
+            except Exception as e:
+                logger.error(f"Error flushing {len(docs)} buffered writes: {e}", exc_info=True)
+                for doc, future in batch:
+                    self._pending_by_id.pop(doc['_id'], None)
+                    if not future.done():
+                        future.set_exception(e)
+                if self.on_failure:
+                    try:
+                        self.on_failure(docs)
+                    except Exception as rollback_error:
+                        logger.error(f"Error rolling back failed writes: {rollback_error}", exc_info=True)
+                return
+
+            for doc, future in batch:
+                self._pending_by_id.pop(doc['_id'], None)
+                if not future.done():
+                    future.set_result(doc['_id'])
+        if self.on_flush:
+            await self.on_flush(docs)
+
+    async def close(self):
+        """Flush remaining documents, used at shutdown"""
+        await self.flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)